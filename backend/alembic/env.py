@@ -14,10 +14,13 @@ if str(ROOT) not in sys.path:
 from app.database import Base
 from app import models  # noqa: F401
 from app.config import get_settings
+from app.database import engine_options
 
 config = context.config
 
-if config.config_file_name is not None:
+# Called from app.migrations at startup with a live connection: leave the app's logging alone.
+shared_connection = config.attributes.get("connection")
+if config.config_file_name is not None and shared_connection is None:
     fileConfig(config.config_file_name)
 
 settings = get_settings()
@@ -41,10 +44,17 @@ def run_migrations_offline() -> None:
 
 
 def run_migrations_online() -> None:
+    if shared_connection is not None:
+        context.configure(connection=shared_connection, target_metadata=target_metadata, compare_type=True)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
     connectable = engine_from_config(
         config.get_section(config.config_ini_section, {}),
         prefix="sqlalchemy.",
         poolclass=pool.NullPool,
+        connect_args=engine_options(settings).get("connect_args", {}),
     )
 
     with connectable.connect() as connection:
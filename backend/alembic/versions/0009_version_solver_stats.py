@@ -0,0 +1,26 @@
+"""add solver stats to schedule versions
+
+Revision ID: 0009_version_solver_stats
+Revises: 0008_pre_approved_flags
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009_version_solver_stats"
+down_revision = "0008_pre_approved_flags"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases built by the old startup create_all may already have it.
+    columns = sa.inspect(op.get_bind()).get_columns("schedule_versions")
+    if "solver_stats" in {column["name"] for column in columns}:
+        return
+    op.add_column("schedule_versions", sa.Column("solver_stats", sa.JSON(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("schedule_versions", "solver_stats")
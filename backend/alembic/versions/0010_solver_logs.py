@@ -0,0 +1,36 @@
+"""add solver search logs
+
+Revision ID: 0010_solver_logs
+Revises: 0009_version_solver_stats
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0010_solver_logs"
+down_revision = "0009_version_solver_stats"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Databases built by the old startup create_all may already have it.
+    if sa.inspect(op.get_bind()).has_table("solver_logs"):
+        return
+    op.create_table(
+        "solver_logs",
+        sa.Column("id", sa.Integer(), primary_key=True),
+        sa.Column("version_id", sa.Integer(), sa.ForeignKey("schedule_versions.id"), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("log", sa.LargeBinary(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.Column("summary", sa.JSON(), nullable=False),
+        sa.UniqueConstraint("version_id"),
+    )
+    op.create_index("ix_solver_logs_id", "solver_logs", ["id"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_solver_logs_id", table_name="solver_logs")
+    op.drop_table("solver_logs")
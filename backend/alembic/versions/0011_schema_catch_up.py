@@ -0,0 +1,35 @@
+"""solver constraints table and hospital holiday flag
+
+Revision ID: 0011_schema_catch_up
+Revises: 0010_solver_logs
+Create Date: 2026-10-19 00:00:00.000000
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011_schema_catch_up"
+down_revision = "0010_solver_logs"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Both used to be created at API startup, so existing databases may already have them.
+    inspector = sa.inspect(op.get_bind())
+    if not inspector.has_table("solver_constraints"):
+        op.create_table(
+            "solver_constraints",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("config", sa.JSON(), nullable=False),
+            sa.Column("updated_at", sa.DateTime(), nullable=True),
+        )
+        op.create_index("ix_solver_constraints_id", "solver_constraints", ["id"])
+    if "hospital_holiday" not in {column["name"] for column in inspector.get_columns("holidays")}:
+        op.add_column("holidays", sa.Column("hospital_holiday", sa.Boolean(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column("holidays", "hospital_holiday")
+    op.drop_index("ix_solver_constraints_id", table_name="solver_constraints")
+    op.drop_table("solver_constraints")
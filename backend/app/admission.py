@@ -0,0 +1,257 @@
+from __future__ import annotations
+
+import json
+import math
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Future
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, Callable, Hashable
+
+from .config import get_settings
+
+BATCH_TTL_SECONDS = 24 * 60 * 60
+# A running job renews its period claim for this long, a third of it at a time.
+CLAIM_LEASE_SECONDS = 60
+# Registry owners that are synchronous solves rather than Celery task ids.
+SYNC_JOB_PREFIX = "sync:"
+# Celery states of a job that still owns its period.
+ACTIVE_JOB_STATES = frozenset({"PENDING", "RECEIVED", "STARTED", "RETRY"})
+
+
+class SolveAdmission:
+    """Bounds concurrent in-process solves and coalesces requests per key.
+
+    Generation and continuation use the period id as the key; other solves
+    use a ``(kind, id)`` tuple. ``enter`` returns one of:
+    - ``("lead", future)``: the caller holds a slot and must call ``finish``;
+    - ``("follow", future)``: a solve for the key is already running in this
+      process and ``future`` resolves to its result;
+    - ``("reject", None)``: every slot is busy and the caller should hand off.
+    """
+
+    def __init__(self, limit: int) -> None:
+        self.limit = limit
+        self._slots = threading.BoundedSemaphore(limit)
+        self._lock = threading.Lock()
+        self._inflight: dict[Hashable, Future] = {}
+
+    def enter(self, key: Hashable) -> tuple[str, Future | None]:
+        with self._lock:
+            future = self._inflight.get(key)
+            if future is not None:
+                return "follow", future
+            if not self._slots.acquire(blocking=False):
+                return "reject", None
+            future = Future()
+            self._inflight[key] = future
+            return "lead", future
+
+    def finish(self, key: Hashable, result: Any = None, error: BaseException | None = None) -> None:
+        with self._lock:
+            future = self._inflight.pop(key)
+            self._slots.release()
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return len(self._inflight)
+
+
+class LocalJobStore:
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._jobs: dict[str, tuple[str, float]] = {}
+        self._lock = threading.Lock()
+        self._clock = clock
+
+    def _get(self, key: str) -> str | None:
+        # Callers hold the lock.
+        entry = self._jobs.get(key)
+        if entry is None:
+            return None
+        value, expires = entry
+        if expires <= self._clock():
+            del self._jobs[key]
+            return None
+        return value
+
+    def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        with self._lock:
+            if self._get(key) is not None:
+                return False
+            self._jobs[key] = (value, self._clock() + ttl)
+            return True
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            return self._get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        with self._lock:
+            self._jobs[key] = (value, self._clock() + ttl)
+
+    def replace_if_equal(self, key: str, expected: str, value: str, ttl: int) -> bool:
+        with self._lock:
+            if self._get(key) != expected:
+                return False
+            self._jobs[key] = (value, self._clock() + ttl)
+            return True
+
+    def delete_if_equal(self, key: str, value: str) -> None:
+        with self._lock:
+            if self._get(key) == value:
+                del self._jobs[key]
+
+
+class RedisJobStore:
+    def __init__(self, url: str) -> None:
+        import redis
+
+        self._client = redis.Redis.from_url(url, decode_responses=True)
+        self._watch_error = redis.WatchError
+
+    def set_if_absent(self, key: str, value: str, ttl: int) -> bool:
+        return bool(self._client.set(key, value, nx=True, ex=ttl))
+
+    def get(self, key: str) -> str | None:
+        return self._client.get(key)
+
+    def set(self, key: str, value: str, ttl: int) -> None:
+        self._client.set(key, value, ex=ttl)
+
+    def replace_if_equal(self, key: str, expected: str, value: str, ttl: int) -> bool:
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if pipe.get(key) != expected:
+                    return False
+                pipe.multi()
+                pipe.set(key, value, ex=ttl)
+                pipe.execute()
+                return True
+            except self._watch_error:
+                # Changed between WATCH and EXEC: someone else replaced it.
+                return False
+
+    def delete_if_equal(self, key: str, value: str) -> None:
+        with self._client.pipeline() as pipe:
+            pipe.watch(key)
+            if pipe.get(key) == value:
+                pipe.multi()
+                pipe.delete(key)
+                pipe.execute()
+
+
+class PeriodJobRegistry:
+    """Tracks the queued or running Celery generation job for each period.
+
+    Shared through Redis so every API replica coalesces onto the same job.
+    A claim lasts ``ttl`` seconds, which covers the wait in the queue; the
+    job holds it with ``hold`` once it runs.
+    """
+
+    def __init__(self, store, ttl: int) -> None:
+        self.store = store
+        self.ttl = ttl
+
+    @staticmethod
+    def _key(period_id: int) -> str:
+        return f"generation-job:period:{period_id}"
+
+    def claim(self, period_id: int, job_id: str, is_active: Callable[[str], bool]) -> str:
+        """Register ``job_id`` for the period unless an active job already owns it.
+
+        Returns the id of the job that owns the period afterwards. A stale
+        owner is only replaced if it is still the owner, so of two callers
+        that both find it stale exactly one wins.
+        """
+        key = self._key(period_id)
+        while True:
+            if self.store.set_if_absent(key, job_id, self.ttl):
+                return job_id
+            existing = self.store.get(key)
+            if existing is None:
+                # Expired or released since set_if_absent.
+                continue
+            if is_active(existing):
+                return existing
+            if self.store.replace_if_equal(key, existing, job_id, self.ttl):
+                return job_id
+
+    def active_job(self, period_id: int, is_active: Callable[[str], bool]) -> str | None:
+        existing = self.store.get(self._key(period_id))
+        if existing and is_active(existing):
+            return existing
+        return None
+
+    def release(self, period_id: int, job_id: str) -> None:
+        self.store.delete_if_equal(self._key(period_id), job_id)
+
+    @contextmanager
+    def hold(self, period_id: int, job_id: str, lease: float = CLAIM_LEASE_SECONDS) -> Iterator[None]:
+        """Keep ``job_id``'s claim while the block runs, then release it.
+
+        The claim is renewed for ``lease`` seconds every third of a lease, so
+        it outlives any solve, and a process that dies mid-solve frees the
+        period within one lease.
+        """
+        key = self._key(period_id)
+        stop = threading.Event()
+
+        def renew() -> None:
+            while self.store.replace_if_equal(key, job_id, job_id, math.ceil(lease)) and not stop.wait(lease / 3):
+                pass
+
+        renewer = threading.Thread(target=renew, name=f"claim-{period_id}", daemon=True)
+        renewer.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            renewer.join()
+            self.release(period_id, job_id)
+
+    def remember(self, key: str, value: dict) -> None:
+        self.store.set(key, json.dumps(value), BATCH_TTL_SECONDS)
+
+    def recall(self, key: str) -> dict | None:
+        raw = self.store.get(key)
+        return None if raw is None else json.loads(raw)
+
+    def remember_batch(self, batch_id: str, jobs: dict[int, str]) -> None:
+        """Record which job generates each period of a batch."""
+        self.remember(f"generation-batch:{batch_id}", jobs)
+
+    def batch_jobs(self, batch_id: str) -> dict[int, str] | None:
+        jobs = self.recall(f"generation-batch:{batch_id}")
+        if jobs is None:
+            return None
+        return {int(period_id): job_id for period_id, job_id in jobs.items()}
+
+    def remember_scenarios(self, run_id: str, period_id: int, jobs: dict[str, str]) -> None:
+        """Record the job solving each named scenario of a sweep."""
+        self.remember(f"scenario-run:{run_id}", {"period_id": period_id, "jobs": jobs})
+
+    def scenario_run(self, run_id: str) -> dict | None:
+        return self.recall(f"scenario-run:{run_id}")
+
+
+@lru_cache
+def get_solve_admission() -> SolveAdmission:
+    return SolveAdmission(get_settings().sync_solve_concurrency)
+
+
+@lru_cache
+def get_job_registry() -> PeriodJobRegistry:
+    settings = get_settings()
+    if settings.redis_url.startswith(("redis://", "rediss://")):
+        store = RedisJobStore(settings.redis_url)
+    else:
+        store = LocalJobStore()
+    return PeriodJobRegistry(store, settings.generation_job_ttl_seconds)
@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import json
+from datetime import date, timedelta
+from functools import lru_cache
+
+from sqlalchemy.orm import Session
+
+from solver.calendar import CalendarDay, build_day_table
+
+from . import metrics, models
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    first = date(year, month, 1)
+    return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+
+
+def last_weekday(year: int, month: int, weekday: int) -> date:
+    last = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
+    return last - timedelta(days=(last.weekday() - weekday) % 7)
+
+
+def observed_date(holiday_date: date) -> date:
+    if holiday_date.weekday() == 5:
+        return holiday_date - timedelta(days=1)
+    if holiday_date.weekday() == 6:
+        return holiday_date + timedelta(days=1)
+    return holiday_date
+
+
+@lru_cache(maxsize=64)
+def _federal_holidays_for_year(year: int) -> tuple[tuple[date, str], ...]:
+    holidays: list[tuple[date, str]] = []
+
+    def add_fixed(name: str, month: int, day: int):
+        actual = date(year, month, day)
+        observed = observed_date(actual)
+        label = name if observed == actual else f"{name} (Observed)"
+        holidays.append((observed, label))
+
+    add_fixed("New Year's Day", 1, 1)
+    holidays.append((nth_weekday(year, 1, 0, 3), "Martin Luther King Jr. Day"))
+    holidays.append((nth_weekday(year, 2, 0, 3), "Washington's Birthday"))
+    holidays.append((last_weekday(year, 5, 0), "Memorial Day"))
+    add_fixed("Juneteenth National Independence Day", 6, 19)
+    add_fixed("Independence Day", 7, 4)
+    holidays.append((nth_weekday(year, 9, 0, 1), "Labor Day"))
+    holidays.append((nth_weekday(year, 10, 0, 2), "Columbus Day"))
+    add_fixed("Veterans Day", 11, 11)
+    holidays.append((nth_weekday(year, 11, 3, 4), "Thanksgiving Day"))
+    add_fixed("Christmas Day", 12, 25)
+
+    return tuple(holidays)
+
+
+def federal_holidays_for_year(year: int) -> list[tuple[date, str]]:
+    return list(_federal_holidays_for_year(year))
+
+
+def federal_holidays_in_range(start: date, end: date) -> list[tuple[date, str]]:
+    holiday_map: dict[date, str] = {}
+    for year in range(start.year, end.year + 1):
+        for holiday_date, name in _federal_holidays_for_year(year):
+            if start <= holiday_date <= end:
+                holiday_map[holiday_date] = name
+    return sorted(holiday_map.items(), key=lambda item: item[0])
+
+
+def hospital_holidays_in_range(db: Session, start: date, end: date) -> dict[date, str]:
+    holidays = (
+        db.query(models.Holiday)
+        .filter(
+            models.Holiday.date >= start,
+            models.Holiday.date <= end,
+            models.Holiday.hospital_holiday.is_(True),
+        )
+        .all()
+    )
+    return {holiday.date: holiday.name for holiday in holidays}
+
+
+@lru_cache(maxsize=128)
+def _cached_day_table(
+    start: date,
+    end: date,
+    holidays: tuple[tuple[date, str], ...],
+    constraints_key: str,
+) -> tuple[CalendarDay, ...]:
+    return tuple(build_day_table(start, end, dict(holidays), json.loads(constraints_key)))
+
+
+def day_table(
+    start: date,
+    end: date,
+    holidays: dict[date, str],
+    constraints: dict,
+) -> list[CalendarDay]:
+    """Return the classified day table, reusing a cached copy when the
+    period, hospital holidays and constraints are unchanged."""
+    key = json.dumps(constraints, sort_keys=True, default=str)
+    return list(_cached_day_table(start, end, tuple(sorted(holidays.items())), key))
+
+
+def calendar_for_range(db: Session, start: date, end: date, constraints: dict) -> list[CalendarDay]:
+    return day_table(start, end, hospital_holidays_in_range(db, start, end), constraints)
+
+
+metrics.caches.register("federal_holidays", _federal_holidays_for_year)
+metrics.caches.register("day_table", _cached_day_table)
+
+
+def get_period_calendar(
+    db: Session, period: models.SchedulePeriod, constraints: dict
+) -> list[CalendarDay]:
+    return calendar_for_range(db, period.start_date, period.end_date, constraints)
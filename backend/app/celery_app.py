@@ -1,14 +1,66 @@
+import os
+
 from celery import Celery
 
-from .config import get_settings
+from . import metrics
+from .config import Settings, get_settings
+from .queues import DEFAULT_QUEUE, PRIORITY_BATCH, PRIORITY_INTERACTIVE, PRIORITY_STEPS, SOLVER_QUEUE  # noqa: F401
 
 settings = get_settings()
 
+
+def solver_worker_concurrency(settings: Settings) -> int:
+    """Run as many solves in parallel as there are cores for their CP-SAT workers."""
+    if settings.solver_num_workers <= 0:
+        return 1
+    return max(1, (os.cpu_count() or 1) // settings.solver_num_workers)
+
+
+def solver_task_time_limits(settings: Settings) -> tuple[float, float]:
+    """Soft and hard Celery time limits for one solve task."""
+    solve_limit = settings.solver_time_limit_seconds
+    if settings.solver_adaptive_time_limit:
+        solve_limit = max(solve_limit, settings.solver_max_time_limit_seconds)
+    soft = solve_limit + settings.solver_task_overhead_seconds
+    return soft, soft + settings.solver_task_overhead_seconds
+
+
 celery_app = Celery(
     "ob_scheduler",
     broker=settings.celery_broker_url,
     backend=settings.celery_result_backend,
 )
+celery_app.conf.update(
+    task_default_queue=DEFAULT_QUEUE,
+    task_routes={
+        "app.tasks.generate_schedule_for_period": {"queue": SOLVER_QUEUE},
+        "app.tasks.solve_scenario": {"queue": SOLVER_QUEUE},
+        "app.tasks.generate_alternatives_for_period": {"queue": SOLVER_QUEUE},
+    },
+    broker_transport_options={
+        "queue_order_strategy": "priority",
+        "priority_steps": PRIORITY_STEPS,
+        "sep": ":",
+    },
+)
+if settings.worker_role == "solver":
+    # Long CP-SAT tasks: size the pool by cores per solve and never prefetch
+    # a second solve behind a running one.
+    celery_app.conf.update(
+        worker_concurrency=solver_worker_concurrency(settings),
+        worker_prefetch_multiplier=1,
+        task_acks_late=True,
+    )
+
+metrics.connect_celery_signals(settings.worker_metrics_port)
+metrics.register_collector(
+    metrics.QueueDepthCollector(
+        settings.celery_broker_url,
+        lambda: [DEFAULT_QUEUE, SOLVER_QUEUE],
+        priority_steps=PRIORITY_STEPS,
+        sep=":",
+    )
+)
 
 # Ensure task modules are imported so Celery registers them.
 from . import tasks  # noqa: E402,F401
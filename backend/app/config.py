@@ -8,6 +8,11 @@ class Settings(BaseSettings):
         default="postgresql+psycopg://postgres:postgres@db:5432/ob_scheduler",
         validation_alias="DATABASE_URL",
     )
+    db_pool_size: int = Field(default=5, validation_alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(default=10, validation_alias="DB_MAX_OVERFLOW")
+    db_pool_recycle_seconds: int = Field(default=1800, validation_alias="DB_POOL_RECYCLE_SECONDS")
+    db_pool_timeout_seconds: float = Field(default=30.0, validation_alias="DB_POOL_TIMEOUT_SECONDS")
+    db_pgbouncer: bool = Field(default=False, validation_alias="DB_PGBOUNCER")
     redis_url: str = Field(default="redis://redis:6379/0", validation_alias="REDIS_URL")
     celery_broker_url: str = Field(
         default="redis://redis:6379/0", validation_alias="CELERY_BROKER_URL"
@@ -15,6 +20,31 @@ class Settings(BaseSettings):
     celery_result_backend: str = Field(
         default="redis://redis:6379/0", validation_alias="CELERY_RESULT_BACKEND"
     )
+    solver_time_limit_seconds: float = Field(default=10.0, validation_alias="SOLVER_TIME_LIMIT_SECONDS")
+    solver_num_workers: int = Field(default=8, validation_alias="SOLVER_NUM_WORKERS")
+    solver_rolling_window_days: int = Field(default=35, validation_alias="SOLVER_ROLLING_WINDOW_DAYS")
+    solver_rolling_step_days: int = Field(default=28, validation_alias="SOLVER_ROLLING_STEP_DAYS")
+    solver_symmetry_breaking: bool = Field(default=False, validation_alias="SOLVER_SYMMETRY_BREAKING")
+    solver_objective_mode: str = Field(default="weighted", validation_alias="SOLVER_OBJECTIVE_MODE")
+    solver_stage_time_shares: tuple[float, ...] = Field(
+        default=(0.4, 0.3, 0.3), validation_alias="SOLVER_STAGE_TIME_SHARES"
+    )
+    solver_greedy_hint: bool = Field(default=True, validation_alias="SOLVER_GREEDY_HINT")
+    solver_relative_gap_limit: float = Field(default=0.005, validation_alias="SOLVER_RELATIVE_GAP_LIMIT")
+    solver_plateau_seconds: float = Field(default=2.0, validation_alias="SOLVER_PLATEAU_SECONDS")
+    solver_adaptive_time_limit: bool = Field(default=True, validation_alias="SOLVER_ADAPTIVE_TIME_LIMIT")
+    solver_min_time_limit_seconds: float = Field(default=1.0, validation_alias="SOLVER_MIN_TIME_LIMIT_SECONDS")
+    solver_max_time_limit_seconds: float = Field(default=60.0, validation_alias="SOLVER_MAX_TIME_LIMIT_SECONDS")
+    solver_artifact_dir: str = Field(default="", validation_alias="SOLVER_ARTIFACT_DIR")
+    solver_capture_log: bool = Field(default=False, validation_alias="SOLVER_CAPTURE_LOG")
+    solver_task_overhead_seconds: int = Field(default=30, validation_alias="SOLVER_TASK_OVERHEAD_SECONDS")
+    worker_role: str = Field(default="default", validation_alias="WORKER_ROLE")
+    sync_solve_concurrency: int = Field(default=2, validation_alias="SYNC_SOLVE_CONCURRENCY")
+    solver_process_pool: bool = Field(default=True, validation_alias="SOLVER_PROCESS_POOL")
+    solver_worker_max_rss_mb: int = Field(default=4096, validation_alias="SOLVER_WORKER_MAX_RSS_MB")
+    generation_job_ttl_seconds: int = Field(default=900, validation_alias="GENERATION_JOB_TTL_SECONDS")
+    debug_query_headers: bool = Field(default=False, validation_alias="DEBUG_QUERY_HEADERS")
+    worker_metrics_port: int = Field(default=9102, validation_alias="WORKER_METRICS_PORT")
 
     class Config:
         env_file = ".env"
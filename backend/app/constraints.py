@@ -24,6 +24,17 @@ DEFAULT_CONSTRAINTS: dict = {
 }
 
 
+def merge_constraints(base: dict, overrides: dict) -> dict:
+    """Return ``base`` with ``overrides`` applied; nested dicts merge key by key."""
+    merged = dict(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = merge_constraints(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
 def ensure_constraints(db: Session) -> models.SolverConstraints:
     constraints = db.query(models.SolverConstraints).first()
     if constraints:
@@ -1,7 +1,16 @@
+import gzip
+from datetime import date, datetime
+
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 
+from solver.search_log import summarize_search_log
+
 from . import models
 
+# Keyed by value: solver shift types are the same strings, and importing them would load ortools.
+SHIFT_TYPES = {shift.value: shift for shift in models.ShiftType}
+
 
 def create_period(db: Session, name: str, start_date, end_date) -> models.SchedulePeriod:
     period = models.SchedulePeriod(name=name, start_date=start_date, end_date=end_date)
@@ -28,8 +37,90 @@ def create_version(db: Session, period: models.SchedulePeriod) -> models.Schedul
 
 
 def add_assignments(db: Session, version: models.ScheduleVersion, assignments: list[models.Assignment]):
-    version.assignments.extend(assignments)
-    db.add(version)
+    # Set the foreign key directly so the existing collection is not loaded.
+    for assignment in assignments:
+        assignment.version_id = version.id
+    db.add_all(assignments)
     db.commit()
-    db.refresh(version)
     return version
+
+
+def list_version_assignments(db: Session, version_id: int) -> list[models.Assignment]:
+    return (
+        db.query(models.Assignment)
+        .filter(models.Assignment.version_id == version_id)
+        .order_by(models.Assignment.date)
+        .all()
+    )
+
+
+def json_safe(value):
+    if isinstance(value, dict):
+        return {key: json_safe(val) for key, val in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [json_safe(item) for item in value]
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    return value
+
+
+def store_generation_result(db: Session, version: models.ScheduleVersion, result) -> models.ScheduleVersion:
+    """Attach a solver ``GenerationOutput`` to a flushed ``version``; the caller commits.
+
+    Rows are written with one executemany per table instead of through the
+    relationship collections, which would load them and insert row by row.
+    """
+    if result.assignments:
+        from solver.solver import assignment_rows
+
+        # Rows come straight off the solver's arrays, never as Assignment objects.
+        db.execute(
+            insert(models.Assignment),
+            [
+                {
+                    "version_id": version.id,
+                    "resident_id": resident_id,
+                    "date": day,
+                    "shift_type": SHIFT_TYPES[shift.value],
+                }
+                for resident_id, day, shift in assignment_rows(result.assignments)
+            ],
+        )
+    if result.alerts:
+        db.execute(
+            insert(models.ScheduleAlert),
+            [
+                {
+                    "version_id": version.id,
+                    "date": alert["date"],
+                    "message": alert["message"],
+                    "severity": alert.get("severity", "HIGH"),
+                }
+                for alert in result.alerts
+            ],
+        )
+    version.fairness_report = json_safe(result.fairness)
+    version.unmet_requests = json_safe(result.unmet_requests)
+    version.solver_stats = json_safe(result.stats)
+    if result.search_log:
+        store_search_log(db, version, result.search_log)
+    return version
+
+
+def store_search_log(db: Session, version: models.ScheduleVersion, text: str) -> models.SolverLog:
+    encoded = text.encode()
+    log = models.SolverLog(
+        version_id=version.id,
+        log=gzip.compress(encoded),
+        size=len(encoded),
+        summary=summarize_search_log(text),
+    )
+    db.add(log)
+    return log
+
+
+def set_solver_stats(version: models.ScheduleVersion, stats: dict, phases: dict[str, float]) -> None:
+    """Store solver stats with the caller's phase timings merged into the solver's own."""
+    merged = dict(stats)
+    merged["phases"] = {**stats.get("phases", {}), **phases}
+    version.solver_stats = json_safe(merged)
@@ -1,17 +1,55 @@
+import os
+from functools import lru_cache
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import NullPool
 
-from .config import get_settings
+from .config import Settings, get_settings
 
 
 class Base(DeclarativeBase):
     pass
 
 
-def get_engine():
+def engine_options(settings: Settings) -> dict:
+    """``create_engine`` arguments for this process's connection pool."""
+    options = {"pool_pre_ping": True}
+    if make_url(settings.database_url).get_backend_name() == "sqlite":
+        return options
+    if settings.db_pool_size <= 0:
+        # Open a connection per checkout and leave pooling to PgBouncer.
+        options["poolclass"] = NullPool
+    else:
+        options.update(
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_recycle=settings.db_pool_recycle_seconds,
+            pool_timeout=settings.db_pool_timeout_seconds,
+        )
+    if settings.db_pgbouncer:
+        # Transaction pooling may run each statement on a different server
+        # connection, where a prepared statement would not exist.
+        options["connect_args"] = {"prepare_threshold": None}
+    return options
+
+
+@lru_cache
+def get_engine() -> Engine:
+    """The engine shared by everything in this process."""
     settings = get_settings()
-    return create_engine(settings.database_url, pool_pre_ping=True)
+    return create_engine(settings.database_url, **engine_options(settings))
+
+
+def _discard_inherited_pool() -> None:
+    # A forked child (a Celery prefork worker) must not reuse the parent's
+    # connections; close=False leaves them open for the parent.
+    if get_engine.cache_info().currsize:
+        get_engine().dispose(close=False)
+
 
+os.register_at_fork(after_in_child=_discard_inherited_pool)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=get_engine())
 
@@ -1,21 +1,34 @@
 import os
 import csv
+import gzip
 import io
+import math
+import time
+from dataclasses import replace
 from datetime import date, datetime, timedelta
+from uuid import uuid4
 
-from fastapi import Body, Depends, FastAPI, HTTPException
+from fastapi import Body, Depends, FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
-from celery.result import AsyncResult
-from sqlalchemy import func, text
-from sqlalchemy.orm import Session
-
-from . import crud, models, schemas
-from .constraints import DEFAULT_CONSTRAINTS, ensure_constraints, get_constraints
-from .database import Base, SessionLocal, get_db, get_engine
-from .database import Base, get_db, get_engine
-from .solver_client import build_schedule_input, run_solver
-from .celery_app import celery_app
-from .tasks import generate_schedule_for_period
+from fastapi.responses import JSONResponse, PlainTextResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, joinedload
+
+from solver.timing import PhaseTimer
+
+from . import crud, metrics, models, schemas
+from .admission import ACTIVE_JOB_STATES, SYNC_JOB_PREFIX, get_job_registry, get_solve_admission
+from .calendar_service import calendar_for_range, federal_holidays_in_range, get_period_calendar
+from .config import get_settings
+from .constraints import DEFAULT_CONSTRAINTS, ensure_constraints, get_constraints, merge_constraints
+from .database import SessionLocal, get_db, get_engine
+from .migrations import upgrade_to_head
+from .query_counter import query_count_middleware
+from .queues import PRIORITY_BATCH, PRIORITY_INTERACTIVE
+from .solver_pool import SolverPoolBusy, SolverWorkerError, get_solver_pool
+
+# The solver (ortools) and Celery are imported inside the handlers that use
+# them, so a web worker that never solves or queues a job never loads them.
 
 app = FastAPI(title="OB Resident Scheduler")
 
@@ -26,30 +39,23 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.middleware("http")(metrics.metrics_middleware)
+app.middleware("http")(query_count_middleware(get_settings().debug_query_headers))
 
 
 @app.on_event("startup")
 def startup():
+    # Start the solver processes now so the first solve does not wait for their imports.
+    get_solver_pool()
     if os.getenv("SKIP_DB_INIT") == "1":
         return
-    engine = get_engine()
-    Base.metadata.create_all(bind=engine)
-    with engine.connect() as connection:
-        connection.execute(
-            text("ALTER TABLE holidays ADD COLUMN IF NOT EXISTS hospital_holiday BOOLEAN")
-        )
-        connection.commit()
+    upgrade_to_head(get_engine())
     if os.getenv("AUTO_SEED") == "1":
         db = SessionLocal()
         try:
             seed_demo_data_for_startup(db)
         finally:
             db.close()
-    db = SessionLocal()
-    try:
-        ensure_constraints(db)
-    finally:
-        db.close()
 
 
 @app.get("/health")
@@ -57,6 +63,12 @@ def health():
     return {"status": "ok"}
 
 
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 @app.get("/periods", response_model=list[schemas.SchedulePeriodRead])
 def list_periods(db: Session = Depends(get_db)):
     return crud.list_periods(db)
@@ -144,14 +156,17 @@ def list_requests(db: Session = Depends(get_db)):
 
 @app.patch("/requests/{request_id}", response_model=schemas.ResidentRequestRead)
 def update_request(request_id: int, payload: schemas.RequestApprovalUpdate, db: Session = Depends(get_db)):
-    request = db.query(models.ResidentRequest).filter(models.ResidentRequest.id == request_id).first()
+    request = (
+        db.query(models.ResidentRequest)
+        .options(joinedload(models.ResidentRequest.resident))
+        .filter(models.ResidentRequest.id == request_id)
+        .first()
+    )
     if not request:
         raise HTTPException(status_code=404, detail="Request not found")
     request.approved = payload.approved
-    db.commit()
-    db.refresh(request)
-    resident = db.query(models.Resident).filter(models.Resident.id == request.resident_id).first()
-    return schemas.ResidentRequestRead(
+    # Build the response before commit expires the loaded attributes.
+    response = schemas.ResidentRequestRead(
         id=request.id,
         resident_id=request.resident_id,
         request_type=request.request_type.value,
@@ -159,8 +174,10 @@ def update_request(request_id: int, payload: schemas.RequestApprovalUpdate, db:
         end_date=request.end_date,
         approved=request.approved,
         pre_approved=request.pre_approved,
-        resident_name=resident.name if resident else "",
+        resident_name=request.resident.name if request.resident else "",
     )
+    db.commit()
+    return response
 
 
 @app.get("/time-off", response_model=list[schemas.TimeOffRead])
@@ -259,61 +276,6 @@ def create_holiday(payload: schemas.HolidayCreate, db: Session = Depends(get_db)
     return holiday
 
 
-def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
-    current = date(year, month, 1)
-    while current.weekday() != weekday:
-        current += timedelta(days=1)
-    return current + timedelta(days=7 * (n - 1))
-
-
-def last_weekday(year: int, month: int, weekday: int) -> date:
-    current = date(year, month + 1, 1) - timedelta(days=1) if month < 12 else date(year, 12, 31)
-    while current.weekday() != weekday:
-        current -= timedelta(days=1)
-    return current
-
-
-def observed_date(holiday_date: date) -> date:
-    if holiday_date.weekday() == 5:
-        return holiday_date - timedelta(days=1)
-    if holiday_date.weekday() == 6:
-        return holiday_date + timedelta(days=1)
-    return holiday_date
-
-
-def federal_holidays_for_year(year: int) -> list[tuple[date, str]]:
-    holidays: list[tuple[date, str]] = []
-
-    def add_fixed(name: str, month: int, day: int):
-        actual = date(year, month, day)
-        observed = observed_date(actual)
-        label = name if observed == actual else f"{name} (Observed)"
-        holidays.append((observed, label))
-
-    add_fixed("New Year's Day", 1, 1)
-    holidays.append((nth_weekday(year, 1, 0, 3), "Martin Luther King Jr. Day"))
-    holidays.append((nth_weekday(year, 2, 0, 3), "Washington's Birthday"))
-    holidays.append((last_weekday(year, 5, 0), "Memorial Day"))
-    add_fixed("Juneteenth National Independence Day", 6, 19)
-    add_fixed("Independence Day", 7, 4)
-    holidays.append((nth_weekday(year, 9, 0, 1), "Labor Day"))
-    holidays.append((nth_weekday(year, 10, 0, 2), "Columbus Day"))
-    add_fixed("Veterans Day", 11, 11)
-    holidays.append((nth_weekday(year, 11, 3, 4), "Thanksgiving Day"))
-    add_fixed("Christmas Day", 12, 25)
-
-    return holidays
-
-
-def federal_holidays_in_range(start: date, end: date) -> list[tuple[date, str]]:
-    holiday_map: dict[date, str] = {}
-    for year in range(start.year, end.year + 1):
-        for holiday_date, name in federal_holidays_for_year(year):
-            if start <= holiday_date <= end:
-                holiday_map[holiday_date] = name
-    return sorted(holiday_map.items(), key=lambda item: item[0])
-
-
 @app.post("/holidays/seed")
 def seed_federal_holidays(
     start_date: date,
@@ -667,64 +629,517 @@ def create_monthly_period(payload: schemas.SchedulePeriodMonthCreate, db: Sessio
     return crud.create_period(db, name, first_day, last_day)
 
 
-@app.post("/periods/{period_id}/generate", response_model=schemas.GenerationResult)
+def _job_result(job_id: str):
+    from celery.result import AsyncResult
+
+    from .celery_app import celery_app
+
+    return AsyncResult(job_id, app=celery_app)
+
+
+class _PeriodClaimed(Exception):
+    """Another job, queued or synchronous, already generates the period."""
+
+    def __init__(self, owner: str) -> None:
+        super().__init__(owner)
+        self.owner = owner
+
+
+def _job_is_active(job_id: str) -> bool:
+    if job_id.startswith(SYNC_JOB_PREFIX):
+        # Released when the solve finishes; its lease lapses if the replica dies mid-solve.
+        return True
+    return _job_result(job_id).state in ACTIVE_JOB_STATES
+
+
+def _claimed_response(owner: str) -> JSONResponse:
+    if owner.startswith(SYNC_JOB_PREFIX):
+        raise HTTPException(status_code=409, detail="A synchronous solve for this period is already running")
+    return _queued_response(owner, coalesced=True)
+
+
+def _enqueue_generation(period_id: int, priority: int = PRIORITY_INTERACTIVE) -> tuple[str, bool]:
+    """Queue a Celery generation unless one is already queued or running for the period.
+
+    Raises ``_PeriodClaimed`` when a synchronous solve owns the period.
+    """
+    from .tasks import generate_schedule_for_period
+
+    registry = get_job_registry()
+    job_id = str(uuid4())
+    owner = registry.claim(period_id, job_id, _job_is_active)
+    if owner.startswith(SYNC_JOB_PREFIX):
+        raise _PeriodClaimed(owner)
+    if owner != job_id:
+        return owner, True
+    try:
+        generate_schedule_for_period.apply_async(args=[period_id], task_id=job_id, priority=priority)
+    except Exception:
+        registry.release(period_id, job_id)
+        raise
+    return job_id, False
+
+
+def _queued_response(job_id: str, coalesced: bool) -> JSONResponse:
+    payload = schemas.GenerationJobRead(job_id=job_id, coalesced=coalesced)
+    return JSONResponse(status_code=202, content=payload.model_dump())
+
+
+def _solver_busy() -> HTTPException:
+    """429 for a solve that found every in-process slot taken and has no queue to go to."""
+    retry_after = math.ceil(get_settings().solver_time_limit_seconds)
+    return HTTPException(status_code=429, detail="Solver busy", headers={"Retry-After": str(retry_after)})
+
+
+def _solve_isolated(function, *args, time_limit: float):
+    """Run a synchronous solve in the solver process pool, or in-process when the pool is off.
+
+    Route handlers calling this are plain ``def``s, so FastAPI already runs
+    them in its threadpool and the event loop keeps serving while they wait.
+    """
+    pool = get_solver_pool()
+    if pool is None:
+        return function(*args)
+    timeout = time_limit + get_settings().solver_task_overhead_seconds
+    try:
+        return pool.run(function, *args, timeout=timeout)
+    except SolverPoolBusy as exc:
+        raise HTTPException(status_code=503, detail=str(exc), headers={"Retry-After": str(math.ceil(timeout))}) from exc
+    except SolverWorkerError as exc:
+        metrics.observe_solver({"status": "WORKER_LOST"}, "api")
+        raise HTTPException(status_code=503, detail=str(exc)) from exc
+
+
+def _generate_version(db: Session, period: models.SchedulePeriod) -> models.ScheduleVersion:
+    from .solver_client import artifact_options, load_schedule_input, run_solver
+    from .time_budget import budgeted_options
+
+    timer = PhaseTimer()
+    version = crud.create_version(db, period)
+    solver_input = load_schedule_input(db, period)
+    options, budget = budgeted_options(db, solver_input)
+    options = artifact_options(options, version.id)
+    timer.lap("load_inputs")
+    try:
+        result = _solve_isolated(run_solver, solver_input, options, time_limit=options.time_limit_seconds)
+    except HTTPException:
+        # Do not leave an empty draft behind a lost solve.
+        db.delete(version)
+        db.commit()
+        raise
+    result.stats["budget"] = budget
+    timer.lap("run_solver")
+
+    crud.store_generation_result(db, version, result)
+    timer.lap("persist")
+    crud.set_solver_stats(version, result.stats, timer.phases)
+    db.commit()
+    metrics.observe_solver(version.solver_stats, "api")
+    return version
+
+
+def _generation_response(db: Session, version_id: int) -> schemas.GenerationResult:
+    version = db.query(models.ScheduleVersion).filter(models.ScheduleVersion.id == version_id).one()
+    alerts = (
+        db.query(models.ScheduleAlert)
+        .filter(models.ScheduleAlert.version_id == version_id)
+        .order_by(models.ScheduleAlert.date)
+        .all()
+    )
+    return schemas.GenerationResult.model_validate(
+        {
+            "version": version,
+            "assignments": crud.list_version_assignments(db, version_id),
+            "alerts": alerts,
+            "fairness": version.fairness_report or {},
+            "unmet_requests": version.unmet_requests or [],
+        },
+        from_attributes=True,
+    )
+
+
+@app.post(
+    "/periods/{period_id}/generate",
+    response_model=schemas.GenerationResult,
+    responses={202: {"model": schemas.GenerationJobRead}},
+)
 def generate_schedule(period_id: int, db: Session = Depends(get_db)):
     period = crud.get_period(db, period_id)
     if not period:
         raise HTTPException(status_code=404, detail="Period not found")
 
-    version = crud.create_version(db, period)
-    constraints = get_constraints(db)
-    residents = db.query(models.Resident).all()
-    requests = db.query(models.ResidentRequest).filter(models.ResidentRequest.approved.is_(True)).all()
-    time_off = db.query(models.TimeOff).all()
-    holidays = db.query(models.Holiday).all()
+    admission = get_solve_admission()
+    role, future = admission.enter(period_id)
+    try:
+        if role == "reject":
+            # Every in-process slot is busy: hand the solve to the worker pool.
+            return _queued_response(*_enqueue_generation(period_id))
+        if role == "follow":
+            return _generation_response(db, future.result())
+    except _PeriodClaimed as claimed:
+        return _claimed_response(claimed.owner)
+
+    # Claim the period in the shared registry too, so neither a queued job nor
+    # a solve on another replica can start on it while this one runs.
+    registry = get_job_registry()
+    claim_id = f"{SYNC_JOB_PREFIX}{uuid4()}"
+    try:
+        owner = registry.claim(period_id, claim_id, _job_is_active)
+        if owner != claim_id:
+            raise _PeriodClaimed(owner)
+        with registry.hold(period_id, claim_id):
+            version = _generate_version(db, period)
+    except BaseException as exc:
+        admission.finish(period_id, error=exc)
+        if isinstance(exc, _PeriodClaimed):
+            return _claimed_response(exc.owner)
+        raise
+    admission.finish(period_id, version.id)
+    return _generation_response(db, version.id)
+
+
+@app.post("/schedule-versions/{version_id}/continue", response_model=schemas.ContinuationResult)
+def continue_version(version_id: int, payload: schemas.ContinueRequest | None = None, db: Session = Depends(get_db)):
+    version = db.get(models.ScheduleVersion, version_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
 
-    solver_input = build_schedule_input(
-        period.start_date, period.end_date, residents, requests, time_off, holidays, constraints
+    # Same slots and per-period dedup as generation. There is no queued
+    # continuation to hand off to, so a saturated process answers 429.
+    period_id = version.period_id
+    admission = get_solve_admission()
+    role, _ = admission.enter(period_id)
+    if role == "reject":
+        raise _solver_busy()
+    if role == "follow":
+        raise HTTPException(status_code=409, detail="A solve for this period is already running")
+
+    registry = get_job_registry()
+    claim_id = f"{SYNC_JOB_PREFIX}{uuid4()}"
+    try:
+        owner = registry.claim(period_id, claim_id, _job_is_active)
+        if owner != claim_id:
+            raise HTTPException(
+                status_code=409,
+                detail={"message": "A solve for this period is already running", "job_id": owner},
+            )
+        with registry.hold(period_id, claim_id):
+            result = _continue_version(db, version, payload)
+    except BaseException as exc:
+        admission.finish(period_id, error=exc)
+        raise
+    admission.finish(period_id, result.version_id)
+    return result
+
+
+def _continue_version(
+    db: Session, version: models.ScheduleVersion, payload: schemas.ContinueRequest | None
+) -> schemas.ContinuationResult:
+    from solver.replay import input_fingerprint
+    from solver.scoring import score_assignments
+
+    from .solver_client import continue_solver, load_assignment_table, load_schedule_input, solver_options
+
+    version_id = version.id
+
+    settings = get_settings()
+    timer = PhaseTimer()
+    previous = version.solver_stats or {}
+    solver_input = load_schedule_input(db, version.period)
+    incumbent = load_assignment_table(db, version_id)
+    incumbent_objective = score_assignments(solver_input, incumbent)["objective"]
+    fingerprint = input_fingerprint(solver_input)
+    # A bound proven on another input (edited residents, time off...) proves nothing here.
+    same_input = previous.get("input_fingerprint") == fingerprint
+    best_bound = previous.get("best_bound") if same_input else None
+    time_limit = payload.time_limit_seconds if payload and payload.time_limit_seconds else None
+    time_limit = min(time_limit or settings.solver_time_limit_seconds, settings.solver_max_time_limit_seconds)
+    timer.lap("load_inputs")
+
+    # No artifacts: the model is the one dumped with the version being continued.
+    options = replace(solver_options(), time_limit_seconds=time_limit)
+    result = _solve_isolated(continue_solver, solver_input, incumbent, best_bound, options, time_limit=time_limit)
+    timer.lap("run_solver")
+
+    # NO_RESIDENTS returns before any search, so its stats carry no wall time.
+    wall_time = result.stats.get("wall_time", 0.0)
+    earlier = previous.get("continuation") or {}
+    continuation = {
+        "from_version": version_id,
+        "previous_objective": incumbent_objective,
+        "previous_bound": previous.get("best_bound"),
+        "bound_reused": best_bound is not None,
+        "rounds": earlier.get("rounds", 0) + 1,
+        "search_time": earlier.get("search_time", previous.get("wall_time") or 0.0) + wall_time,
+    }
+    result.stats["continuation"] = continuation
+    objective = result.stats.get("objective")
+    improved = objective is not None and objective < incumbent_objective
+    if improved:
+        target = crud.create_version(db, version.period)
+        crud.store_generation_result(db, target, result)
+        crud.set_solver_stats(target, result.stats, timer.phases)
+    else:
+        # Nothing better: keep the schedule, but record the bound this search proved.
+        stats = dict(previous, objective=incumbent_objective, input_fingerprint=fingerprint, continuation=continuation)
+        bounds = [bound for bound in (best_bound, result.stats.get("best_bound")) if bound is not None]
+        stats["best_bound"] = max(bounds) if bounds else None
+        if stats["best_bound"] is not None:
+            stats["gap"] = abs(incumbent_objective - stats["best_bound"]) / max(1.0, abs(incumbent_objective))
+        version.solver_stats = crud.json_safe(stats)
+        target = version
+    db.commit()
+    metrics.observe_solver(dict(result.stats, phases=timer.phases), "api")
+    return schemas.ContinuationResult(
+        version_id=target.id,
+        continued_from=version_id,
+        improved=improved,
+        status=result.stats["status"],
+        stop_reason=result.stats.get("stop_reason"),
+        previous_objective=incumbent_objective,
+        objective=objective if improved else incumbent_objective,
+        best_bound=target.solver_stats.get("best_bound"),
+        gap=target.solver_stats.get("gap"),
+        bound_reused=best_bound is not None,
+        incumbent_hint=result.stats.get("incumbent_hint"),
+        wall_time=wall_time,
+        search_time=continuation["search_time"],
+        rounds=continuation["rounds"],
     )
-    result = run_solver(solver_input)
-
-    assignments = [
-        models.Assignment(
-            version_id=version.id,
-            resident_id=assignment.resident_id,
-            date=assignment.date,
-            shift_type=models.ShiftType(assignment.shift_type.value),
-        )
-        for assignment in result.assignments
-    ]
-    crud.add_assignments(db, version, assignments)
 
-    version.fairness_report = result.fairness
-    version.unmet_requests = result.unmet_requests
-    db.commit()
-    db.refresh(version)
 
-    return schemas.GenerationResult(
-        version=version,
-        assignments=version.assignments,
+@app.get("/periods/{period_id}/preview", response_model=schemas.SchedulePreview)
+def preview_schedule(period_id: int, db: Session = Depends(get_db)):
+    period = crud.get_period(db, period_id)
+    if not period:
+        raise HTTPException(status_code=404, detail="Period not found")
+    from solver.greedy import greedy_schedule
+
+    from .solver_client import load_schedule_input
+
+    result = greedy_schedule(load_schedule_input(db, period))
+    return schemas.SchedulePreview(
+        assignments=[
+            schemas.PreviewAssignment(resident_id=resident_id, date=day, shift_type=shift.value)
+            for resident_id, day, shift in result.assignments.rows()
+        ],
         alerts=result.alerts,
         fairness=result.fairness,
         unmet_requests=result.unmet_requests,
+        stats=result.stats,
     )
 
 
-@app.post("/schedule-periods/{period_id}/generate")
+@app.post("/schedule-periods/{period_id}/generate", response_model=schemas.GenerationJobRead)
 def generate_schedule_async(period_id: int):
-    job = generate_schedule_for_period.delay(period_id)
-    return {"job_id": job.id}
+    try:
+        job_id, coalesced = _enqueue_generation(period_id)
+    except _PeriodClaimed as claimed:
+        return _claimed_response(claimed.owner)
+    return schemas.GenerationJobRead(job_id=job_id, coalesced=coalesced)
 
 
 @app.get("/jobs/{job_id}")
 def get_job_status(job_id: str):
-    result = AsyncResult(job_id, app=celery_app)
+    result = _job_result(job_id)
     payload = {"job_id": job_id, "status": result.status}
     if result.ready():
         payload["result"] = result.result
     return payload
 
 
+@app.post("/schedule-periods/generate-batch", response_model=schemas.BatchGenerationRead, status_code=202)
+def generate_schedule_batch(payload: schemas.BatchGenerateRequest, db: Session = Depends(get_db)):
+    query = db.query(models.SchedulePeriod)
+    if payload.period_ids:
+        query = query.filter(models.SchedulePeriod.id.in_(payload.period_ids))
+    elif payload.start_date and payload.end_date:
+        query = query.filter(
+            models.SchedulePeriod.start_date <= payload.end_date,
+            models.SchedulePeriod.end_date >= payload.start_date,
+        )
+    else:
+        raise HTTPException(status_code=400, detail="Provide period_ids or start_date and end_date")
+    periods = query.order_by(models.SchedulePeriod.start_date).all()
+    if not periods:
+        raise HTTPException(status_code=404, detail="No schedule periods matched")
+
+    registry = get_job_registry()
+    batch_id = str(uuid4())
+    jobs: dict[int, str] = {}
+    new_jobs: dict[int, str] = {}
+    for period in periods:
+        job_id = str(uuid4())
+        owner = registry.claim(period.id, job_id, _job_is_active)
+        jobs[period.id] = owner
+        if owner == job_id:
+            new_jobs[period.id] = job_id
+    if new_jobs:
+        from .tasks import dispatch_generation_batch
+
+        try:
+            dispatch_generation_batch(batch_id, new_jobs, PRIORITY_BATCH)
+        except Exception:
+            for period_id, job_id in new_jobs.items():
+                registry.release(period_id, job_id)
+            raise
+    registry.remember_batch(batch_id, jobs)
+    return _batch_status(batch_id, jobs, set(new_jobs))
+
+
+def _batch_status(batch_id: str, jobs: dict[int, str], new_periods: set[int] | None = None) -> schemas.BatchGenerationRead:
+    entries = []
+    results = []
+    registry = get_job_registry()
+    for period_id, job_id in jobs.items():
+        if job_id.startswith(SYNC_JOB_PREFIX):
+            # Coalesced onto a synchronous solve, whose version lands under /periods/{id}/versions.
+            running = registry.active_job(period_id, _job_is_active) == job_id
+            entry = schemas.BatchJobRead(
+                period_id=period_id, job_id=job_id, status="STARTED" if running else "SUCCESS", coalesced=True
+            )
+            if not running:
+                entry.result = {"status": "synchronous", "period_id": period_id}
+                results.append(entry.result)
+            entries.append(entry)
+            continue
+        result = _job_result(job_id)
+        entry = schemas.BatchJobRead(
+            period_id=period_id,
+            job_id=job_id,
+            status=result.status,
+            coalesced=new_periods is not None and period_id not in new_periods,
+        )
+        if result.ready():
+            entry.result = result.result if isinstance(result.result, dict) else {"error": str(result.result)}
+            results.append(entry.result)
+        entries.append(entry)
+    completed = len(results)
+    summary = None
+    if completed == len(entries):
+        from .tasks import summarize_batch
+
+        summary = summarize_batch(results)
+    return schemas.BatchGenerationRead(
+        batch_id=batch_id,
+        status="complete" if summary is not None else ("running" if completed else "queued"),
+        total=len(entries),
+        completed=completed,
+        jobs=entries,
+        summary=summary,
+    )
+
+
+@app.get("/batch-jobs/{batch_id}", response_model=schemas.BatchGenerationRead)
+def get_batch_status(batch_id: str):
+    jobs = get_job_registry().batch_jobs(batch_id)
+    if jobs is None:
+        raise HTTPException(status_code=404, detail="Batch not found")
+    return _batch_status(batch_id, jobs)
+
+
+@app.post("/periods/{period_id}/alternatives", response_model=schemas.GenerationJobRead, status_code=202)
+def generate_alternatives(period_id: int, payload: schemas.AlternativesRequest, db: Session = Depends(get_db)):
+    if not crud.get_period(db, period_id):
+        raise HTTPException(status_code=404, detail="Period not found")
+    from .tasks import generate_alternatives_for_period
+
+    job_id = str(uuid4())
+    generate_alternatives_for_period.apply_async(
+        args=[period_id, payload.count, payload.min_distance], task_id=job_id, priority=PRIORITY_INTERACTIVE
+    )
+    return schemas.GenerationJobRead(job_id=job_id)
+
+
+@app.post("/periods/{period_id}/scenarios", response_model=schemas.ScenarioRunRead, status_code=202)
+def run_scenarios(period_id: int, payload: schemas.ScenarioSweepRequest, db: Session = Depends(get_db)):
+    period = crud.get_period(db, period_id)
+    if not period:
+        raise HTTPException(status_code=404, detail="Period not found")
+    overrides = {"base": {}}
+    for scenario in payload.scenarios:
+        if scenario.name in overrides:
+            raise HTTPException(status_code=400, detail=f"Duplicate or reserved scenario name: {scenario.name}")
+        overrides[scenario.name] = scenario.constraints
+
+    from .tasks import dispatch_scenarios
+
+    run_id = str(uuid4())
+    jobs = {name: str(uuid4()) for name in overrides}
+    dispatch_scenarios(period_id, jobs, overrides, payload.time_limit_seconds, PRIORITY_INTERACTIVE)
+    get_job_registry().remember_scenarios(run_id, period_id, jobs)
+    return _scenario_status(run_id, period_id, jobs, overrides)
+
+
+def _scenario_status(
+    run_id: str, period_id: int, jobs: dict[str, str], overrides: dict[str, dict] | None = None
+) -> schemas.ScenarioRunRead:
+    rows = []
+    for name, job_id in jobs.items():
+        result = _job_result(job_id)
+        row = schemas.ScenarioRow(name=name, job_id=job_id, status=result.status)
+        if overrides is not None:
+            row.overrides = overrides[name]
+        if result.ready():
+            summary = result.result if isinstance(result.result, dict) else {"status": "failed"}
+            fields = {key: value for key, value in summary.items() if key in schemas.ScenarioRow.model_fields}
+            row = row.model_copy(update={**fields, "name": name, "job_id": job_id})
+        rows.append(row)
+    return schemas.ScenarioRunRead(
+        run_id=run_id,
+        period_id=period_id,
+        total=len(rows),
+        completed=sum(row.status not in {"PENDING", "RECEIVED", "STARTED", "RETRY"} for row in rows),
+        scenarios=rows,
+    )
+
+
+@app.get("/scenario-runs/{run_id}", response_model=schemas.ScenarioRunRead)
+def get_scenario_run(run_id: str):
+    run = get_job_registry().scenario_run(run_id)
+    if run is None:
+        raise HTTPException(status_code=404, detail="Scenario run not found")
+    return _scenario_status(run_id, run["period_id"], run["jobs"])
+
+
+@app.post("/scenario-runs/{run_id}/choose", response_model=schemas.ScheduleVersionRead, status_code=201)
+def choose_scenario(run_id: str, payload: schemas.ScenarioChoice, db: Session = Depends(get_db)):
+    run = get_job_registry().scenario_run(run_id)
+    if run is None or payload.name not in run["jobs"]:
+        raise HTTPException(status_code=404, detail="Scenario not found")
+    result = _job_result(run["jobs"][payload.name])
+    summary = result.result if result.successful() else None
+    if not isinstance(summary, dict) or summary.get("status") != "ok":
+        raise HTTPException(status_code=409, detail="Scenario has not produced a schedule")
+    period = crud.get_period(db, run["period_id"])
+    if not period:
+        raise HTTPException(status_code=404, detail="Period not found")
+    from .scenarios import scenario_output
+
+    version = crud.create_version(db, period)
+    crud.store_generation_result(db, version, scenario_output(summary))
+    db.commit()
+    return version
+
+
+@app.get("/periods/{period_id}/calendar", response_model=list[schemas.CalendarDayRead])
+def get_calendar(period_id: int, db: Session = Depends(get_db)):
+    period = crud.get_period(db, period_id)
+    if not period:
+        raise HTTPException(status_code=404, detail="Period not found")
+    return [
+        schemas.CalendarDayRead(
+            date=entry.date,
+            day_class=entry.day_class.value,
+            coverage=dict(entry.coverage),
+            holiday_name=entry.holiday_name,
+            is_weekend=entry.is_weekend,
+            tier0_restricted=entry.tier0_restricted,
+        )
+        for entry in get_period_calendar(db, period, get_constraints(db))
+    ]
+
+
 @app.get("/schedule-periods/{period_id}/draft", response_model=schemas.ScheduleVersionRead | None)
 def get_latest_draft(period_id: int, db: Session = Depends(get_db)):
     return (
@@ -737,12 +1152,7 @@ def get_latest_draft(period_id: int, db: Session = Depends(get_db)):
 
 @app.get("/schedule-versions/{version_id}/assignments", response_model=list[schemas.AssignmentRead])
 def list_assignments(version_id: int, db: Session = Depends(get_db)):
-    return (
-        db.query(models.Assignment)
-        .filter(models.Assignment.version_id == version_id)
-        .order_by(models.Assignment.date)
-        .all()
-    )
+    return crud.list_version_assignments(db, version_id)
 
 
 @app.get("/schedule-versions/{version_id}/alerts", response_model=list[schemas.GenerationAlert])
@@ -759,6 +1169,140 @@ def list_alerts(version_id: int, db: Session = Depends(get_db)):
     ]
 
 
+@app.get(
+    "/schedule-versions/{version_id}/explain",
+    response_model=list[schemas.UnderstaffingExplanation],
+)
+def explain_version(version_id: int, db: Session = Depends(get_db)):
+    version = db.get(models.ScheduleVersion, version_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+    infeasible = any(alert.message == "Solver infeasible" for alert in version.alerts)
+    days = [alert.date for alert in version.alerts if alert.message.startswith("Understaffed")]
+    if not infeasible and not days:
+        return []
+
+    # The analysis runs CP-SAT, so it takes a solve slot; repeated requests for a version share one run.
+    key = ("explain", version_id)
+    admission = get_solve_admission()
+    role, future = admission.enter(key)
+    if role == "reject":
+        raise _solver_busy()
+    if role == "follow":
+        return future.result()
+    try:
+        explanations = _explain_version(db, version, days, infeasible)
+    except BaseException as exc:
+        admission.finish(key, error=exc)
+        raise
+    admission.finish(key, explanations)
+    return explanations
+
+
+def _explain_version(
+    db: Session, version: models.ScheduleVersion, days: list[date], infeasible: bool
+) -> list[dict]:
+    from solver.explain import explain_understaffing
+
+    from .solver_client import load_schedule_input, solver_options
+
+    solver_input = load_schedule_input(db, version.period)
+    if infeasible:
+        days = [entry.date for entry in solver_input.calendar]
+    options = solver_options()
+    explanations = _solve_isolated(
+        explain_understaffing, solver_input, days, options, time_limit=options.time_limit_seconds
+    )
+    names = {resident.id: resident.name for resident in db.query(models.Resident).all()}
+    for explanation in explanations:
+        for conflict in explanation["conflicts"]:
+            for diagnostic in conflict:
+                if "resident_id" in diagnostic:
+                    diagnostic["resident_name"] = names.get(diagnostic["resident_id"])
+    return explanations
+
+
+@app.post("/schedule-versions/{version_id}/score", response_model=schemas.ScheduleScore)
+def score_version(
+    version_id: int, payload: schemas.ScoreRequest | None = None, db: Session = Depends(get_db)
+):
+    version = db.get(models.ScheduleVersion, version_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+    from solver.scoring import score_assignments, score_weights
+
+    from .solver_client import load_assignment_table, load_schedule_input
+
+    overrides = payload.constraints if payload else {}
+    started = time.perf_counter()
+    constraints = merge_constraints(get_constraints(db), overrides)
+    solver_input = load_schedule_input(db, version.period, constraints)
+    score = score_assignments(solver_input, load_assignment_table(db, version_id))
+    return schemas.ScheduleScore(
+        version_id=version_id,
+        overrides=overrides,
+        weights=score_weights(constraints),
+        solver_objective=(version.solver_stats or {}).get("objective"),
+        wall_time=time.perf_counter() - started,
+        **score,
+    )
+
+
+@app.post("/schedule-versions/{version_id}/recommendations", response_model=schemas.RecommendationResult)
+def recommend_version_edits(version_id: int, payload: schemas.RecommendationRequest, db: Session = Depends(get_db)):
+    version = db.get(models.ScheduleVersion, version_id)
+    if not version:
+        raise HTTPException(status_code=404, detail="Version not found")
+    if payload.shift_type is None and payload.resident_id is None:
+        raise HTTPException(status_code=400, detail="Provide shift_type or resident_id")
+    from solver.recommend import recommend_edits
+    from solver.solver import ShiftType as SolverShiftType
+
+    from .solver_client import load_assignment_table, load_schedule_input
+
+    solver_input = load_schedule_input(db, version.period)
+    try:
+        result = recommend_edits(
+            solver_input,
+            load_assignment_table(db, version_id),
+            payload.date,
+            shift=SolverShiftType(payload.shift_type.value) if payload.shift_type else None,
+            resident_id=payload.resident_id,
+            limit=payload.limit,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    names = {resident.id: resident.name for resident in db.query(models.Resident).all()}
+    for candidate in result["candidates"]:
+        for edit in candidate["edits"]:
+            edit["resident_name"] = names.get(edit["resident_id"])
+    return schemas.RecommendationResult(version_id=version_id, **result)
+
+
+def _search_log(db: Session, version_id: int) -> models.SolverLog:
+    log = db.query(models.SolverLog).filter(models.SolverLog.version_id == version_id).first()
+    if not log:
+        raise HTTPException(status_code=404, detail="No search log for this version")
+    return log
+
+
+@app.get("/schedule-versions/{version_id}/search-log", response_model=schemas.SearchLogRead)
+def get_search_log(version_id: int, db: Session = Depends(get_db)):
+    log = _search_log(db, version_id)
+    return schemas.SearchLogRead(
+        version_id=version_id,
+        created_at=log.created_at,
+        size=log.size,
+        compressed_size=len(log.log),
+        summary=log.summary,
+    )
+
+
+@app.get("/schedule-versions/{version_id}/search-log/raw", response_class=PlainTextResponse)
+def get_search_log_text(version_id: int, db: Session = Depends(get_db)):
+    return PlainTextResponse(gzip.decompress(_search_log(db, version_id).log).decode())
+
+
 @app.post("/schedule-versions/{version_id}/publish", response_model=schemas.ScheduleVersionRead)
 def publish_version(version_id: int, db: Session = Depends(get_db)):
     version = db.query(models.ScheduleVersion).filter(models.ScheduleVersion.id == version_id).first()
@@ -787,39 +1331,26 @@ def validate_version(version_id: int, db: Session = Depends(get_db)):
     if not assignments:
         raise HTTPException(status_code=404, detail="Version not found or no assignments")
 
-    holidays = {
-        holiday.date
-        for holiday in db.query(models.Holiday).all()
-        if holiday.hospital_holiday
+    # Assignments can be edited onto dates outside the period, so classify the full span.
+    assignment_dates = [assignment.date for assignment, _ in assignments]
+    if period:
+        assignment_dates.extend([period.start_date, period.end_date])
+    calendar = {
+        entry.date: entry
+        for entry in calendar_for_range(db, min(assignment_dates), max(assignment_dates), constraints)
     }
 
-    coverage = constraints.get("coverage", {})
-
-    def coverage_requirements(day: date):
-        is_weekend = day.weekday() >= 5 or day in holidays
-        if is_weekend:
-            return coverage.get(
-                "weekend_or_holiday",
-                {"ob_oc": 2, "ob_l3": 0, "ob_l4": 1, "ob_day_min": 0, "ob_day_max": 0},
-            )
-        if day.weekday() == 4:
-            return coverage.get(
-                "friday",
-                {"ob_oc": 2, "ob_l3": 0, "ob_l4": 1, "ob_day_min": 2, "ob_day_max": 4},
-            )
-        return coverage.get(
-            "weekday",
-            {"ob_oc": 2, "ob_l3": 1, "ob_l4": 0, "ob_day_min": 2, "ob_day_max": 4},
-        )
-
     violations: list[dict] = []
     alerts: list[dict] = []
     assignments_by_day: dict[date, list[models.Assignment]] = {}
     assignments_by_key: dict[tuple[int, date], list[models.Assignment]] = {}
 
+    residents_by_id: dict[int, models.Resident] = {}
+
     for assignment, resident in assignments:
         assignments_by_day.setdefault(assignment.date, []).append(assignment)
         assignments_by_key.setdefault((assignment.resident_id, assignment.date), []).append(assignment)
+        residents_by_id[assignment.resident_id] = resident
 
     for (resident_id, day), resident_assignments in assignments_by_key.items():
         if len(resident_assignments) > 1:
@@ -832,10 +1363,8 @@ def validate_version(version_id: int, db: Session = Depends(get_db)):
                 }
             )
 
-        resident = next(
-            resident for assignment, resident in assignments if assignment.resident_id == resident_id
-        )
-        if resident.ob_months_completed == 0 and day.day <= 3:
+        resident = residents_by_id[resident_id]
+        if resident.ob_months_completed == 0 and calendar[day].tier0_restricted:
             for assignment in resident_assignments:
                 if assignment.shift_type != models.ShiftType.OB_DAY:
                     violations.append(
@@ -868,7 +1397,7 @@ def validate_version(version_id: int, db: Session = Depends(get_db)):
                 )
 
     for day, day_assignments in assignments_by_day.items():
-        requirements = coverage_requirements(day)
+        requirements = calendar[day].coverage
         counts = {
             "ob_oc": 0,
             "ob_l3": 0,
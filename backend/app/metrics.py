@@ -0,0 +1,222 @@
+from __future__ import annotations
+
+import os
+import time
+from typing import Callable
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+    multiprocess,
+    start_http_server,
+)
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+from .query_counter import add_query_observer, count_queries
+
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+SOLVER_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 30, 60, 120, 300)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 250)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency by route template.",
+    ["method", "route", "status"],
+)
+REQUEST_DB_QUERIES = Histogram(
+    "http_request_db_queries",
+    "Database queries issued while serving one request.",
+    ["method", "route"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds",
+    "Database time spent while serving one request.",
+    ["method", "route"],
+)
+DB_QUERY_SECONDS = Histogram("db_query_duration_seconds", "Duration of individual DB statements.")
+SOLVER_SECONDS = Histogram(
+    "solver_duration_seconds",
+    "End-to-end solver time per generation.",
+    ["source"],
+    buckets=SOLVER_BUCKETS,
+)
+SOLVER_RUNS = Counter("solver_runs_total", "Solver runs by final CP-SAT status.", ["source", "status"])
+SOLVER_STOPS = Counter("solver_stops_total", "Solver runs by why the search stopped.", ["source", "reason"])
+SOLVER_GAP = Histogram(
+    "solver_relative_gap",
+    "Relative gap between objective and best bound at the end of a solve.",
+    ["source"],
+    buckets=(0, 0.001, 0.01, 0.05, 0.1, 0.25, 0.5, 1),
+)
+TASK_WAIT_SECONDS = Histogram(
+    "celery_task_queue_wait_seconds",
+    "Time between publishing a Celery task and a worker starting it.",
+    ["task"],
+    buckets=SOLVER_BUCKETS,
+)
+TASK_SECONDS = Histogram(
+    "celery_task_duration_seconds",
+    "Celery task run time.",
+    ["task", "state"],
+    buckets=SOLVER_BUCKETS,
+)
+
+add_query_observer(DB_QUERY_SECONDS.observe)
+
+
+async def metrics_middleware(request, call_next):
+    start = time.perf_counter()
+    status = 500
+    with count_queries() as counter:
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            path = getattr(route, "path", "unmatched")
+            REQUEST_LATENCY.labels(request.method, path, str(status)).observe(time.perf_counter() - start)
+            REQUEST_DB_QUERIES.labels(request.method, path).observe(counter.count)
+            REQUEST_DB_SECONDS.labels(request.method, path).observe(counter.seconds)
+
+
+def observe_solver(stats: dict, source: str) -> None:
+    status = stats.get("status", "UNKNOWN")
+    SOLVER_RUNS.labels(source, status).inc()
+    duration = (stats.get("phases") or {}).get("run_solver")
+    if duration is not None:
+        SOLVER_SECONDS.labels(source).observe(duration)
+    if stats.get("gap") is not None:
+        SOLVER_GAP.labels(source).observe(stats["gap"])
+    if stats.get("stop_reason"):
+        SOLVER_STOPS.labels(source, stats["stop_reason"]).inc()
+
+
+class CacheCollector:
+    """Exposes hit/miss counters of ``functools.lru_cache`` wrapped callables."""
+
+    def __init__(self) -> None:
+        self._caches: dict[str, Callable] = {}
+
+    def register(self, name: str, cached: Callable) -> None:
+        self._caches[name] = cached
+
+    def collect(self):
+        hits = CounterMetricFamily("cache_hits", "Cache hits.", labels=["cache"])
+        misses = CounterMetricFamily("cache_misses", "Cache misses.", labels=["cache"])
+        size = GaugeMetricFamily("cache_entries", "Entries currently cached.", labels=["cache"])
+        for name, cached in self._caches.items():
+            info = cached.cache_info()
+            hits.add_metric([name], info.hits)
+            misses.add_metric([name], info.misses)
+            size.add_metric([name], info.currsize)
+        yield hits
+        yield misses
+        yield size
+
+
+class QueueDepthCollector:
+    """Reports pending messages per Celery queue when the broker is Redis.
+
+    With priority steps Redis keeps one list per step (``queue``, ``queue:3``,
+    ...); the depth is their sum.
+    """
+
+    def __init__(
+        self,
+        broker_url: str,
+        queues: Callable[[], list[str]],
+        priority_steps: list[int] | None = None,
+        sep: str = ":",
+    ) -> None:
+        self.broker_url = broker_url
+        self.queues = queues
+        self.priority_steps = priority_steps or [0]
+        self.sep = sep
+
+    def _lists(self, queue: str) -> list[str]:
+        return [queue if step == 0 else f"{queue}{self.sep}{step}" for step in self.priority_steps]
+
+    def collect(self):
+        depth = GaugeMetricFamily("celery_queue_depth", "Messages waiting in a Celery queue.", labels=["queue"])
+        if self.broker_url.startswith(("redis://", "rediss://")):
+            try:
+                import redis
+
+                client = redis.Redis.from_url(self.broker_url, socket_timeout=1, socket_connect_timeout=1)
+                for queue in self.queues():
+                    depth.add_metric([queue], sum(client.llen(name) for name in self._lists(queue)))
+            except Exception:
+                pass
+        yield depth
+
+
+caches = CacheCollector()
+_collectors: list = []
+
+
+def register_collector(collector) -> None:
+    """Register a custom collector with every registry this process exports."""
+    _collectors.append(collector)
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        REGISTRY.register(collector)
+
+
+def build_registry() -> CollectorRegistry:
+    # Prefork workers and multi-worker uvicorn aggregate per-process files.
+    if not os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    for collector in _collectors:
+        registry.register(collector)
+    return registry
+
+
+def render_latest() -> tuple[bytes, str]:
+    return generate_latest(build_registry()), CONTENT_TYPE_LATEST
+
+
+register_collector(caches)
+
+
+def connect_celery_signals(port: int) -> None:
+    from celery import signals
+
+    started: dict[str, float] = {}
+
+    @signals.before_task_publish.connect(weak=False)
+    def _stamp_enqueued(headers=None, **kwargs):
+        if headers is not None:
+            headers["enqueued_at"] = time.time()
+
+    @signals.task_prerun.connect(weak=False)
+    def _task_started(task_id=None, task=None, **kwargs):
+        started[task_id] = time.perf_counter()
+        enqueued = getattr(task.request, "enqueued_at", None)
+        if enqueued is None:
+            enqueued = (getattr(task.request, "headers", None) or {}).get("enqueued_at")
+        if enqueued is not None:
+            TASK_WAIT_SECONDS.labels(task.name).observe(max(0.0, time.time() - enqueued))
+
+    @signals.task_postrun.connect(weak=False)
+    def _task_finished(task_id=None, task=None, state=None, **kwargs):
+        start = started.pop(task_id, None)
+        if start is not None:
+            TASK_SECONDS.labels(task.name, state or "UNKNOWN").observe(time.perf_counter() - start)
+
+    @signals.worker_init.connect(weak=False)
+    def _start_exporter(**kwargs):
+        start_http_server(port, registry=build_registry())
+
+    @signals.worker_process_shutdown.connect(weak=False)
+    def _mark_dead(pid=None, **kwargs):
+        if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+            multiprocess.mark_process_dead(pid or os.getpid())
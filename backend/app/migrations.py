@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+# Databases built by the old startup create_all have no alembic_version. They match this
+# revision; 0009 onwards skip what a create_all from a later release may already have made.
+LEGACY_REVISION = "0008_pre_approved_flags"
+# Any fixed key; serializes replicas that start against the same outdated schema.
+MIGRATION_LOCK = 0x0B5C4ED
+
+
+def _config(connection: Connection | None = None):
+    from alembic.config import Config
+
+    config = Config(str(BACKEND_DIR / "alembic.ini"))
+    config.set_main_option("script_location", str(BACKEND_DIR / "alembic"))
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+def head_revision() -> str:
+    from alembic.script import ScriptDirectory
+
+    return ScriptDirectory.from_config(_config()).get_current_head()
+
+
+def current_revision(connection: Connection) -> str | None:
+    if not inspect(connection).has_table("alembic_version"):
+        return None
+    return connection.execute(text("SELECT version_num FROM alembic_version")).scalar()
+
+
+def upgrade_to_head(engine: Engine) -> str | None:
+    """Migrate the database to the Alembic head revision.
+
+    The common case, a database already at head, costs one metadata lookup
+    and one query. Returns the revision migrated from, or ``None`` when
+    there was nothing to do.
+    """
+    from alembic import command
+
+    head = head_revision()
+    with engine.connect() as connection:
+        if current_revision(connection) == head:
+            return None
+    with engine.begin() as connection:
+        if connection.dialect.name == "postgresql":
+            connection.execute(text("SELECT pg_advisory_xact_lock(:key)"), {"key": MIGRATION_LOCK})
+        current = current_revision(connection)
+        if current == head:
+            # Another replica migrated while this one waited for the lock.
+            return None
+        config = _config(connection)
+        if current is None and inspect(connection).has_table("schedule_periods"):
+            command.stamp(config, LEGACY_REVISION)
+            current = LEGACY_REVISION
+        command.upgrade(config, "head")
+    return current or "base"
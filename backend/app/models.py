@@ -1,7 +1,7 @@
 from datetime import date, datetime
 from enum import Enum
 
-from sqlalchemy import Boolean, Date, DateTime, Enum as SAEnum, ForeignKey, Integer, String
+from sqlalchemy import Boolean, Date, DateTime, Enum as SAEnum, ForeignKey, Integer, LargeBinary, String
 from sqlalchemy import JSON
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -47,6 +47,7 @@ class ScheduleVersion(Base):
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
     fairness_report: Mapped[dict | None] = mapped_column(JSON, nullable=True)
     unmet_requests: Mapped[list | None] = mapped_column(JSON, nullable=True)
+    solver_stats: Mapped[dict | None] = mapped_column(JSON, nullable=True)
 
     period: Mapped[SchedulePeriod] = relationship("SchedulePeriod", back_populates="versions")
     assignments: Mapped[list["Assignment"]] = relationship(
@@ -55,6 +56,23 @@ class ScheduleVersion(Base):
     alerts: Mapped[list["ScheduleAlert"]] = relationship(
         "ScheduleAlert", back_populates="version", cascade="all, delete-orphan"
     )
+    search_log: Mapped["SolverLog | None"] = relationship(
+        "SolverLog", back_populates="version", cascade="all, delete-orphan", uselist=False
+    )
+
+
+class SolverLog(Base):
+    __tablename__ = "solver_logs"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True, index=True)
+    version_id: Mapped[int] = mapped_column(ForeignKey("schedule_versions.id"), unique=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # gzip-compressed CP-SAT log text.
+    log: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    size: Mapped[int] = mapped_column(Integer, nullable=False)
+    summary: Mapped[dict] = mapped_column(JSON, nullable=False)
+
+    version: Mapped[ScheduleVersion] = relationship("ScheduleVersion", back_populates="search_log")
 
 
 class Resident(Base):
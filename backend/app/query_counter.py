@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import time
+import weakref
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Callable, Iterator
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+@dataclass
+class QueryCounter:
+    count: int = 0
+    seconds: float = 0.0
+    statements: list[str] = field(default_factory=list)
+
+    def record(self, statement: str, elapsed: float) -> None:
+        self.count += 1
+        self.seconds += elapsed
+        self.statements.append(statement)
+
+
+# Counters active in the current context; nested scopes each see every query.
+_active: ContextVar[tuple[QueryCounter, ...]] = ContextVar("active_query_counters", default=())
+_engine_counters: weakref.WeakKeyDictionary[Engine, list[QueryCounter]] = weakref.WeakKeyDictionary()
+_observers: list[Callable[[float], None]] = []
+
+
+def add_query_observer(observer: Callable[[float], None]) -> None:
+    """Call ``observer`` with the duration of every statement executed in this process."""
+    _observers.append(observer)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    for observer in _observers:
+        observer(elapsed)
+    for counter in _active.get():
+        counter.record(statement, elapsed)
+    for counter in _engine_counters.get(conn.engine, ()):
+        counter.record(statement, elapsed)
+
+
+@contextmanager
+def count_queries() -> Iterator[QueryCounter]:
+    """Count queries issued from the current context (request, task or test)."""
+    counter = QueryCounter()
+    token = _active.set(_active.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _active.reset(token)
+
+
+@contextmanager
+def count_engine_queries(engine: Engine) -> Iterator[QueryCounter]:
+    """Count every query sent through ``engine`` regardless of thread or context.
+
+    Used by tests, where TestClient serves requests from its own thread.
+    """
+    counter = QueryCounter()
+    counters = _engine_counters.setdefault(engine, [])
+    counters.append(counter)
+    try:
+        yield counter
+    finally:
+        counters.remove(counter)
+
+
+def query_count_middleware(debug: bool):
+    async def middleware(request, call_next):
+        with count_queries() as counter:
+            response = await call_next(request)
+        if debug:
+            response.headers["X-DB-Query-Count"] = str(counter.count)
+            response.headers["X-DB-Query-Time-Ms"] = f"{counter.seconds * 1000:.2f}"
+        return response
+
+    return middleware
@@ -0,0 +1,9 @@
+"""Queue names and priorities, importable without Celery."""
+
+DEFAULT_QUEUE = "celery"
+SOLVER_QUEUE = "solver"
+
+# Redis brokers emulate priorities with one list per step; lower runs first.
+PRIORITY_STEPS = [0, 3, 6, 9]
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BATCH = 6
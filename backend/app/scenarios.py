@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from datetime import date
+
+from solver.scoring import score_assignments
+from solver.solver import AssignmentTable, GenerationOutput, ScheduleInput
+
+from .crud import json_safe
+
+
+def summarize_scenario(
+    name: str,
+    period_id: int,
+    overrides: dict,
+    solver_input: ScheduleInput,
+    result: GenerationOutput,
+) -> dict:
+    """One comparison-table row plus a compact copy of the schedule.
+
+    The schedule rides along in ``result`` so a chosen scenario can be saved
+    as a version without solving it again.
+    """
+    score = score_assignments(solver_input, result.assignments)
+    call_counts = list(result.fairness.get("ob_oc_counts", {}).values())
+    solver_status = result.stats.get("status")
+    return {
+        "name": name,
+        "period_id": period_id,
+        "overrides": overrides,
+        "status": "ok" if solver_status in {"OPTIMAL", "FEASIBLE"} else "failed",
+        "solver_status": solver_status,
+        "objective": score["objective"],
+        "score": score,
+        "understaffed_days": len(
+            {alert["date"] for alert in result.alerts if alert["message"].startswith("Understaffed")}
+        ),
+        "call_count_spread": max(call_counts) - min(call_counts) if call_counts else 0,
+        "weekend_spread": score["weekend_spread"],
+        "unmet_requests": sum(1 for outcome in result.unmet_requests if not outcome["met"]),
+        "wall_time": result.stats.get("wall_time"),
+        "result": {
+            "assignments": result.assignments.to_json(),
+            "alerts": json_safe(result.alerts),
+            "fairness": json_safe(result.fairness),
+            "unmet_requests": json_safe(result.unmet_requests),
+            "stats": json_safe(result.stats),
+        },
+    }
+
+
+def scenario_output(summary: dict) -> GenerationOutput:
+    """Rebuild the ``GenerationOutput`` carried by a scenario summary."""
+    stored = summary["result"]
+    return GenerationOutput(
+        assignments=AssignmentTable.from_json(stored["assignments"]),
+        alerts=[{**alert, "date": date.fromisoformat(alert["date"])} for alert in stored["alerts"]],
+        fairness=stored["fairness"],
+        unmet_requests=stored["unmet_requests"],
+        stats={**stored["stats"], "scenario": {"name": summary["name"], "overrides": summary["overrides"]}},
+    )
@@ -45,6 +45,7 @@ class ScheduleVersionRead(BaseModel):
     created_at: datetime
     fairness_report: Optional[dict] = None
     unmet_requests: Optional[list] = None
+    solver_stats: Optional[dict] = None
 
     class Config:
         orm_mode = True
@@ -216,6 +217,192 @@ class GenerationResult(BaseModel):
     unmet_requests: list
 
 
+class CalendarDayRead(BaseModel):
+    date: date
+    day_class: str
+    coverage: dict
+    holiday_name: Optional[str] = None
+    is_weekend: bool
+    tier0_restricted: bool
+
+
+class PreviewAssignment(BaseModel):
+    resident_id: int
+    date: date
+    shift_type: ShiftType
+
+
+class SchedulePreview(BaseModel):
+    assignments: list[PreviewAssignment]
+    alerts: list[GenerationAlert]
+    fairness: dict
+    unmet_requests: list
+    stats: dict
+
+
+class GenerationJobRead(BaseModel):
+    job_id: str
+    status: str = "queued"
+    coalesced: bool = False
+
+
+class BatchGenerateRequest(BaseModel):
+    period_ids: list[int] = []
+    start_date: Optional[date] = None
+    end_date: Optional[date] = None
+
+
+class BatchJobRead(BaseModel):
+    period_id: int
+    job_id: str
+    status: str = "queued"
+    coalesced: bool = False
+    result: Optional[dict] = None
+
+
+class BatchGenerationRead(BaseModel):
+    batch_id: str
+    status: str
+    total: int
+    completed: int
+    jobs: list[BatchJobRead]
+    summary: Optional[dict] = None
+
+
+class AlternativesRequest(BaseModel):
+    count: int = Field(default=3, ge=1, le=10)
+    min_distance: Optional[int] = Field(default=None, ge=1)
+
+
+class ScenarioSpec(BaseModel):
+    name: str
+    constraints: dict = {}
+
+
+class ScenarioSweepRequest(BaseModel):
+    scenarios: list[ScenarioSpec]
+    time_limit_seconds: Optional[float] = None
+
+
+class ScenarioRow(BaseModel):
+    name: str
+    job_id: str
+    status: str = "queued"
+    overrides: dict = {}
+    solver_status: Optional[str] = None
+    objective: Optional[int] = None
+    score: Optional[dict] = None
+    understaffed_days: Optional[int] = None
+    call_count_spread: Optional[int] = None
+    weekend_spread: Optional[int] = None
+    unmet_requests: Optional[int] = None
+    wall_time: Optional[float] = None
+
+
+class ScenarioRunRead(BaseModel):
+    run_id: str
+    period_id: int
+    total: int
+    completed: int
+    scenarios: list[ScenarioRow]
+
+
+class ScenarioChoice(BaseModel):
+    name: str
+
+
+class UnderstaffingExplanation(BaseModel):
+    start_date: date
+    end_date: date
+    forced: bool
+    conflicts: list[list[dict]]
+    checks: int
+    truncated: bool = False
+    wall_time: float
+
+
+class SearchLogRead(BaseModel):
+    version_id: int
+    created_at: datetime
+    size: int
+    compressed_size: int
+    summary: dict
+
+
+class ScoreRequest(BaseModel):
+    constraints: dict = {}
+
+
+class ScheduleScore(BaseModel):
+    version_id: int
+    overrides: dict = {}
+    objective: int
+    understaff: int
+    call_deviation: int
+    weekend_spread: int
+    request_penalty: int
+    weights: dict[str, int]
+    solver_objective: Optional[float] = None
+    wall_time: float
+
+
+class ContinueRequest(BaseModel):
+    time_limit_seconds: Optional[float] = Field(default=None, gt=0)
+
+
+class ContinuationResult(BaseModel):
+    version_id: int
+    continued_from: int
+    improved: bool
+    status: str
+    stop_reason: Optional[str] = None
+    previous_objective: int
+    objective: float
+    best_bound: Optional[float] = None
+    gap: Optional[float] = None
+    bound_reused: bool
+    incumbent_hint: Optional[bool] = None
+    wall_time: float
+    search_time: float
+    rounds: int
+
+
+class RecommendationRequest(BaseModel):
+    date: date
+    shift_type: Optional[ShiftType] = None
+    resident_id: Optional[int] = None
+    limit: int = Field(default=10, ge=1, le=50)
+
+
+class RecommendedEdit(BaseModel):
+    resident_id: int
+    resident_name: Optional[str] = None
+    date: date
+    from_shift: Optional[ShiftType] = None
+    to_shift: Optional[ShiftType] = None
+
+
+class RecommendationCandidate(BaseModel):
+    kind: str
+    delta: int
+    valid: bool
+    violations: list[dict]
+    score: dict
+    edits: list[RecommendedEdit]
+
+
+class RecommendationResult(BaseModel):
+    version_id: int
+    date: date
+    shift_type: ShiftType
+    unassigned: list[dict]
+    baseline: dict
+    candidates: list[RecommendationCandidate]
+    evaluated: int
+    truncated: bool
+    wall_time: float
+
+
 class ValidationResult(BaseModel):
     hard_violations: list
     alerts: list
@@ -1,10 +1,27 @@
+from dataclasses import replace
 from datetime import date
+from pathlib import Path
 from typing import Iterable
 
-from solver import generate_schedule
-from solver.solver import Request, Resident, RequestType, ScheduleInput, TimeOff, ShiftType as SolverShiftType
+from solver import SolverOptions, generate_rolling_schedule, generate_schedule
+from solver.calendar import CalendarDay
+from solver.replay import dump_input, input_fingerprint
+from solver.solver import (
+    AssignmentTable,
+    Request,
+    Resident,
+    RequestType,
+    ScheduleInput,
+    TimeOff,
+    ShiftType as SolverShiftType,
+)
+
+from sqlalchemy.orm import Session
 
 from . import models
+from .calendar_service import get_period_calendar
+from .config import get_settings
+from .constraints import get_constraints
 
 
 SHIFT_MAP = {
@@ -32,6 +49,7 @@ def build_schedule_input(
     time_off: Iterable[models.TimeOff],
     holidays: Iterable[models.Holiday],
     constraints: dict | None = None,
+    calendar: list[CalendarDay] | None = None,
 ) -> ScheduleInput:
     resident_payload = [
         Resident(id=resident.id, tier=resident.tier, ob_months_completed=resident.ob_months_completed)
@@ -65,8 +83,84 @@ def build_schedule_input(
         time_off=time_off_payload,
         holidays=[holiday.date for holiday in holidays if holiday.hospital_holiday],
         constraints=constraints,
+        calendar=calendar,
+    )
+
+
+def load_schedule_input(
+    db: Session, period: models.SchedulePeriod, constraints: dict | None = None
+) -> ScheduleInput:
+    """Load everything the solver needs for ``period``; ``constraints`` defaults to the saved ones."""
+    constraints = constraints or get_constraints(db)
+    return build_schedule_input(
+        period.start_date,
+        period.end_date,
+        db.query(models.Resident).all(),
+        db.query(models.ResidentRequest).filter(models.ResidentRequest.approved.is_(True)).all(),
+        db.query(models.TimeOff).all(),
+        db.query(models.Holiday).all(),
+        constraints,
+        calendar=get_period_calendar(db, period, constraints),
+    )
+
+
+def load_assignment_table(db: Session, version_id: int) -> AssignmentTable:
+    """A version's assignments as solver rows, reading only the three columns scoring needs."""
+    table = AssignmentTable()
+    rows = db.query(models.Assignment.resident_id, models.Assignment.date, models.Assignment.shift_type).filter(
+        models.Assignment.version_id == version_id
     )
+    for resident_id, day, shift in rows:
+        table.add(resident_id, day, SHIFT_MAP[shift])
+    return table
+
+
+def solver_options() -> SolverOptions:
+    settings = get_settings()
+    return SolverOptions(
+        time_limit_seconds=settings.solver_time_limit_seconds,
+        num_workers=settings.solver_num_workers,
+        rolling_window_days=settings.solver_rolling_window_days,
+        rolling_step_days=settings.solver_rolling_step_days,
+        symmetry_breaking=settings.solver_symmetry_breaking,
+        objective_mode=settings.solver_objective_mode,
+        stage_time_shares=settings.solver_stage_time_shares,
+        greedy_hint=settings.solver_greedy_hint,
+        relative_gap_limit=settings.solver_relative_gap_limit,
+        plateau_seconds=settings.solver_plateau_seconds,
+        capture_log=settings.solver_capture_log,
+    )
+
+
+def artifact_options(options: SolverOptions, version_id: int) -> SolverOptions:
+    """Dump this version's solver input and models when SOLVER_ARTIFACT_DIR is set."""
+    root = get_settings().solver_artifact_dir
+    if not root:
+        return options
+    return replace(options, artifact_dir=str(Path(root) / str(version_id)))
+
+
+def run_solver(schedule_input: ScheduleInput, options: SolverOptions | None = None):
+    options = options or solver_options()
+    if options.artifact_dir:
+        dump_input(options.artifact_dir, schedule_input, options)
+    # Falls back to a single monolithic model when the period fits in one window.
+    result = generate_rolling_schedule(schedule_input, options)
+    result.stats["input_fingerprint"] = input_fingerprint(schedule_input)
+    return result
+
 
+def continue_solver(
+    schedule_input: ScheduleInput,
+    incumbent: AssignmentTable,
+    best_bound: float | None,
+    options: SolverOptions,
+):
+    """Search again from a stored schedule, as one model over the whole period.
 
-def run_solver(schedule_input: ScheduleInput):
-    return generate_schedule(schedule_input)
+    ``best_bound`` is only passed on when the stored stats were proven on
+    this same input; see ``input_fingerprint``.
+    """
+    result = generate_schedule(schedule_input, options, incumbent=incumbent, best_bound=best_bound)
+    result.stats["input_fingerprint"] = input_fingerprint(schedule_input)
+    return result
@@ -0,0 +1,152 @@
+from __future__ import annotations
+
+import atexit
+import multiprocessing
+import os
+import threading
+import time
+from functools import lru_cache
+from typing import Any, Callable
+
+from .config import get_settings
+
+POLL_SECONDS = 0.25
+STOP_SECONDS = 2.0
+
+
+class SolverWorkerError(RuntimeError):
+    """A solve was lost: its worker died, ran past its deadline or outgrew its memory limit."""
+
+
+class SolverPoolBusy(RuntimeError):
+    """Every worker stayed busy for as long as the solve itself was allowed to run."""
+
+
+def _serve(conn) -> None:
+    # Pay for ortools and the solver package before the first solve arrives.
+    from . import solver_client  # noqa: F401
+
+    conn.send(("ready", os.getpid()))
+    while True:
+        job = conn.recv()
+        if job is None:
+            return
+        function, args = job
+        try:
+            reply = ("ok", function(*args))
+        except Exception as exc:
+            reply = ("error", exc)
+        try:
+            conn.send(reply)
+        except Exception as exc:
+            # The result or exception did not pickle.
+            conn.send(("error", RuntimeError(f"{type(exc).__name__}: {exc}")))
+
+
+class _Worker:
+    def __init__(self, context) -> None:
+        self.conn, child = context.Pipe()
+        self.process = context.Process(target=_serve, args=(child,), name="solver-worker", daemon=True)
+        self.process.start()
+        child.close()
+        self.ready = False
+
+    def rss_mb(self) -> float | None:
+        try:
+            with open(f"/proc/{self.process.pid}/statm") as statm:
+                pages = int(statm.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return pages * os.sysconf("SC_PAGE_SIZE") / 2**20
+
+    def stop(self) -> None:
+        if self.process.is_alive():
+            self.process.kill()
+        self.process.join(STOP_SECONDS)
+        self.conn.close()
+
+
+class SolverPool:
+    """Persistent solver processes, started ahead of the first solve.
+
+    Each solve runs alone in one worker. A worker that dies, passes the
+    solve's deadline or grows past ``max_rss_mb`` is killed and replaced,
+    and the caller gets ``SolverWorkerError``; the other workers and the
+    web process are untouched. Exceptions raised by the solve itself are
+    re-raised in the caller as usual.
+    """
+
+    def __init__(self, size: int, max_rss_mb: int = 0, start_method: str = "spawn") -> None:
+        self._context = multiprocessing.get_context(start_method)
+        self._max_rss_mb = max_rss_mb
+        self._lock = threading.Lock()
+        self._slots = threading.Semaphore(size)
+        self._idle = [_Worker(self._context) for _ in range(size)]
+        self.replaced = 0
+
+    def run(self, function: Callable, *args: Any, timeout: float) -> Any:
+        """Call ``function(*args)`` in a worker; blocks until it returns, so call it off the event loop.
+
+        Waits at most ``timeout`` for a free worker, then raises ``SolverPoolBusy``.
+        """
+        if not self._slots.acquire(timeout=timeout):
+            raise SolverPoolBusy(f"No solver worker became free within {timeout:g} s")
+        with self._lock:
+            worker = self._idle.pop()
+        try:
+            status, value = self._exchange(worker, function, args, timeout)
+        except SolverWorkerError:
+            worker.stop()
+            worker = _Worker(self._context)
+            self.replaced += 1
+            raise
+        finally:
+            with self._lock:
+                self._idle.append(worker)
+            self._slots.release()
+        if status == "error":
+            raise value
+        return value
+
+    def _exchange(self, worker: _Worker, function: Callable, args: tuple, timeout: float) -> tuple[str, Any]:
+        deadline = time.monotonic() + timeout
+        try:
+            if not worker.ready:
+                self._receive(worker, deadline, timeout)
+                worker.ready = True
+            worker.conn.send((function, args))
+            return self._receive(worker, deadline, timeout)
+        except (EOFError, OSError):
+            worker.process.join(STOP_SECONDS)
+            raise SolverWorkerError(f"Solver worker exited with code {worker.process.exitcode}") from None
+
+    def _receive(self, worker: _Worker, deadline: float, timeout: float) -> tuple[str, Any]:
+        while not worker.conn.poll(POLL_SECONDS):
+            if time.monotonic() > deadline:
+                raise SolverWorkerError(f"Solve did not finish within {timeout:g} s")
+            rss = worker.rss_mb() if self._max_rss_mb else None
+            if rss is not None and rss > self._max_rss_mb:
+                raise SolverWorkerError(f"Solver worker exceeded {self._max_rss_mb} MB")
+        return worker.conn.recv()
+
+    def shutdown(self) -> None:
+        with self._lock:
+            workers, self._idle = self._idle, []
+        for worker in workers:
+            try:
+                worker.conn.send(None)
+            except OSError:
+                pass
+            worker.process.join(STOP_SECONDS)
+            worker.stop()
+
+
+@lru_cache
+def get_solver_pool() -> SolverPool | None:
+    """The process pool behind synchronous solves; ``None`` when SOLVER_PROCESS_POOL is off."""
+    settings = get_settings()
+    if not settings.solver_process_pool:
+        return None
+    pool = SolverPool(settings.sync_solve_concurrency, settings.solver_worker_max_rss_mb)
+    atexit.register(pool.shutdown)
+    return pool
@@ -1,10 +1,19 @@
-from datetime import date, datetime
+from dataclasses import replace
 
-from .celery_app import celery_app
+from celery import chord, group
+from celery.exceptions import SoftTimeLimitExceeded
+
+from solver.alternatives import generate_alternatives
+from solver.timing import PhaseTimer
+
+from .celery_app import DEFAULT_QUEUE, celery_app, settings, solver_task_time_limits
 from .database import SessionLocal
-from . import models
-from .constraints import get_constraints
-from .solver_client import build_schedule_input, run_solver
+from . import crud, metrics, models
+from .admission import ACTIVE_JOB_STATES, SYNC_JOB_PREFIX, get_job_registry
+from .constraints import get_constraints, merge_constraints
+from .scenarios import summarize_scenario
+from .solver_client import artifact_options, load_schedule_input, run_solver, solver_options
+from .time_budget import budgeted_options
 
 
 @celery_app.task
@@ -12,8 +21,109 @@ def ping() -> str:
     return "pong"
 
 
+SOLVE_SOFT_TIME_LIMIT, SOLVE_TIME_LIMIT = solver_task_time_limits(settings)
+
+
+def _job_is_active(job_id: str) -> bool:
+    if job_id.startswith(SYNC_JOB_PREFIX):
+        return True
+    return celery_app.AsyncResult(job_id).state in ACTIVE_JOB_STATES
+
+
+@celery_app.task(bind=True, soft_time_limit=SOLVE_SOFT_TIME_LIMIT, time_limit=SOLVE_TIME_LIMIT)
+def generate_schedule_for_period(self, period_id: int) -> dict:
+    registry = get_job_registry()
+    job_id = self.request.id
+    # The claim made at enqueue time may have lapsed while the job waited in the queue.
+    owner = registry.claim(period_id, job_id, _job_is_active)
+    if owner != job_id:
+        return {"status": "superseded", "period_id": period_id, "job_id": owner}
+    db = SessionLocal()
+    timer = PhaseTimer()
+    with registry.hold(period_id, job_id):
+        try:
+            period = (
+                db.query(models.SchedulePeriod)
+                .filter(models.SchedulePeriod.id == period_id)
+                .first()
+            )
+            if not period:
+                return {"status": "not_found", "period_id": period_id}
+
+            version = models.ScheduleVersion(period_id=period.id, status=models.VersionStatus.DRAFT)
+            db.add(version)
+            db.flush()
+
+            solver_input = load_schedule_input(db, period)
+            options, budget = budgeted_options(db, solver_input)
+            options = artifact_options(options, version.id)
+            timer.lap("load_inputs")
+            result = run_solver(solver_input, options)
+            result.stats["budget"] = budget
+            timer.lap("run_solver")
+
+            crud.store_generation_result(db, version, result)
+            timer.lap("persist")
+            crud.set_solver_stats(version, result.stats, timer.phases)
+            db.commit()
+            metrics.observe_solver(version.solver_stats, "celery")
+
+            return {
+                "status": "ok",
+                "period_id": period_id,
+                "version_id": version.id,
+                "assignment_count": len(result.assignments),
+                "alert_count": len(result.alerts),
+                "solver_stats": version.solver_stats,
+            }
+        except SoftTimeLimitExceeded:
+            db.rollback()
+            return {"status": "timeout", "period_id": period_id, "soft_time_limit": SOLVE_SOFT_TIME_LIMIT}
+        finally:
+            db.close()
+
+
+def summarize_batch(results: list[dict]) -> dict:
+    """Aggregate per-period generation results into one batch summary."""
+    periods = []
+    for result in results:
+        result = result or {}
+        stats = result.get("solver_stats") or {}
+        periods.append(
+            {
+                "period_id": result.get("period_id"),
+                "status": result.get("status"),
+                "version_id": result.get("version_id"),
+                "solver_status": stats.get("status"),
+                "objective": stats.get("objective"),
+                "gap": stats.get("gap"),
+                "wall_time": stats.get("wall_time"),
+            }
+        )
+    return {
+        "status": "ok" if all(period["status"] == "ok" for period in periods) else "partial",
+        "periods": periods,
+        "solver_seconds": sum(period["wall_time"] or 0 for period in periods),
+    }
+
+
 @celery_app.task
-def generate_schedule_for_period(period_id: int) -> dict:
+def summarize_generation_batch(results: list[dict]) -> dict:
+    return summarize_batch(results)
+
+
+def dispatch_generation_batch(batch_id: str, jobs: dict[int, str], priority: int) -> None:
+    """Fan period generations out over the solver pool with a summarising chord."""
+    header = group(
+        generate_schedule_for_period.si(period_id).set(task_id=job_id, priority=priority)
+        for period_id, job_id in jobs.items()
+    )
+    chord(header)(summarize_generation_batch.s().set(task_id=batch_id, queue=DEFAULT_QUEUE))
+
+
+@celery_app.task(soft_time_limit=SOLVE_SOFT_TIME_LIMIT, time_limit=SOLVE_TIME_LIMIT)
+def solve_scenario(period_id: int, name: str, overrides: dict, time_limit_seconds: float | None = None) -> dict:
+    """Solve ``period_id`` with constraint overrides; nothing is persisted."""
     db = SessionLocal()
     try:
         period = (
@@ -22,70 +132,82 @@ def generate_schedule_for_period(period_id: int) -> dict:
             .first()
         )
         if not period:
-            return {"status": "not_found", "period_id": period_id}
+            return {"name": name, "status": "not_found", "period_id": period_id}
+        constraints = merge_constraints(get_constraints(db), overrides)
+        solver_input = load_schedule_input(db, period, constraints)
+    finally:
+        db.close()
 
-        version = models.ScheduleVersion(period_id=period.id, status=models.VersionStatus.DRAFT)
-        db.add(version)
-        db.flush()
-
-        residents = db.query(models.Resident).all()
-        requests = db.query(models.ResidentRequest).filter(models.ResidentRequest.approved.is_(True)).all()
-        time_off = db.query(models.TimeOff).all()
-        holidays = db.query(models.Holiday).all()
-        constraints = get_constraints(db)
-
-        solver_input = build_schedule_input(
-            period.start_date,
-            period.end_date,
-            residents,
-            requests,
-            time_off,
-            holidays,
-            constraints,
+    options = solver_options()
+    if time_limit_seconds:
+        options = replace(options, time_limit_seconds=min(time_limit_seconds, options.time_limit_seconds))
+    result = run_solver(solver_input, options)
+    metrics.observe_solver(result.stats, "scenario")
+    return summarize_scenario(name, period_id, overrides, solver_input, result)
+
+
+@celery_app.task(soft_time_limit=SOLVE_SOFT_TIME_LIMIT, time_limit=SOLVE_TIME_LIMIT)
+def generate_alternatives_for_period(period_id: int, count: int, min_distance: int | None = None) -> dict:
+    """Store up to ``count`` diverse draft versions from one solve run."""
+    db = SessionLocal()
+    try:
+        period = (
+            db.query(models.SchedulePeriod)
+            .filter(models.SchedulePeriod.id == period_id)
+            .first()
         )
-        result = run_solver(solver_input)
-
-        assignments = [
-            models.Assignment(
-                version_id=version.id,
-                resident_id=assignment.resident_id,
-                date=assignment.date,
-                shift_type=models.ShiftType(assignment.shift_type.value),
-            )
-            for assignment in result.assignments
-        ]
-        alerts = [
-            models.ScheduleAlert(
-                version_id=version.id,
-                date=alert["date"],
-                message=alert["message"],
-                severity=alert.get("severity", "HIGH"),
+        if not period:
+            return {"status": "not_found", "period_id": period_id}
+        solver_input = load_schedule_input(db, period)
+        outputs = generate_alternatives(solver_input, count, min_distance, solver_options())
+
+        versions = []
+        for output in outputs:
+            version = models.ScheduleVersion(period_id=period.id, status=models.VersionStatus.DRAFT)
+            db.add(version)
+            db.flush()
+            crud.store_generation_result(db, version, output)
+            versions.append(version)
+        version_ids = [version.id for version in versions]
+        summaries = []
+        for version, output in zip(versions, outputs):
+            distances = dict(zip(version_ids, output.stats.pop("distances")))
+            version.solver_stats = crud.json_safe({**output.stats, "distances": distances})
+            summaries.append(
+                {
+                    "version_id": version.id,
+                    "objective": output.stats.get("objective"),
+                    "score": output.stats["score"],
+                    "distances": distances,
+                }
             )
-            for alert in result.alerts
-        ]
-
-        version.assignments.extend(assignments)
-        version.alerts.extend(alerts)
-        version.fairness_report = _json_safe(result.fairness)
-        version.unmet_requests = _json_safe(result.unmet_requests)
-        db.add(version)
         db.commit()
-
+        for output in outputs:
+            metrics.observe_solver(output.stats, "alternatives")
         return {
-            "status": "ok",
-            "version_id": version.id,
-            "assignment_count": len(assignments),
-            "alert_count": len(alerts),
+            "status": "ok" if outputs else "infeasible",
+            "period_id": period_id,
+            "version_ids": version_ids,
+            "alternatives": summaries,
         }
+    except SoftTimeLimitExceeded:
+        db.rollback()
+        return {"status": "timeout", "period_id": period_id, "soft_time_limit": SOLVE_SOFT_TIME_LIMIT}
     finally:
         db.close()
 
 
-def _json_safe(value):
-    if isinstance(value, dict):
-        return {key: _json_safe(val) for key, val in value.items()}
-    if isinstance(value, (list, tuple)):
-        return [_json_safe(item) for item in value]
-    if isinstance(value, (date, datetime)):
-        return value.isoformat()
-    return value
+def dispatch_scenarios(
+    period_id: int,
+    jobs: dict[str, str],
+    overrides: dict[str, dict],
+    time_limit_seconds: float | None,
+    priority: int,
+) -> None:
+    """Solve every scenario of a sweep in parallel on the solver pool."""
+    group(
+        solve_scenario.si(period_id, name, overrides[name], time_limit_seconds).set(
+            task_id=job_id, priority=priority
+        )
+        for name, job_id in jobs.items()
+    ).apply_async()
@@ -0,0 +1,93 @@
+from __future__ import annotations
+
+import math
+from dataclasses import replace
+
+from solver import SolverOptions
+from solver.solver import ScheduleInput
+from sqlalchemy.orm import Session
+
+from . import models
+from .config import Settings, get_settings
+from .solver_client import solver_options
+
+HISTORY_SIZE = 200
+NEIGHBOURS = 5
+# Budget = SAFETY_FACTOR x the slowest neighbour's time to its last improvement.
+SAFETY_FACTOR = 1.5
+
+
+def problem_features(solver_input: ScheduleInput) -> dict:
+    calendar = solver_input.calendar
+    days = len(calendar) if calendar else (solver_input.end_date - solver_input.start_date).days + 1
+    residents = len(solver_input.residents)
+    off_days = sum(
+        max(0, (min(block.end_date, solver_input.end_date) - max(block.start_date, solver_input.start_date)).days + 1)
+        for block in solver_input.time_off
+    )
+    return {
+        "residents": residents,
+        "days": days,
+        "requests": len(solver_input.requests),
+        "time_off_density": off_days / max(1, residents * days),
+    }
+
+
+def _distance(first: dict, second: dict) -> float:
+    sizes = sum(
+        (math.log1p(first[key]) - math.log1p(second[key])) ** 2 for key in ("residents", "days", "requests")
+    )
+    return math.sqrt(sizes + (first["time_off_density"] - second["time_off_density"]) ** 2)
+
+
+def needed_seconds(stats: dict) -> float | None:
+    """How long a recorded solve needed; searches cut off by their limit needed at least twice that."""
+    if stats.get("stop_reason") == "time_limit":
+        return 2 * stats["time_limit"]
+    return stats.get("last_solution_time")
+
+
+def recent_observations(db: Session, limit: int = HISTORY_SIZE) -> list[tuple[dict, float]]:
+    rows = (
+        db.query(models.ScheduleVersion.solver_stats)
+        .filter(models.ScheduleVersion.solver_stats.isnot(None))
+        .order_by(models.ScheduleVersion.id.desc())
+        .limit(limit)
+        .all()
+    )
+    observations = []
+    for (stats,) in rows:
+        features = (stats.get("budget") or {}).get("features")
+        needed = needed_seconds(stats)
+        if features and needed is not None:
+            observations.append((features, needed))
+    return observations
+
+
+def estimate_time_limit(features: dict, observations: list[tuple[dict, float]], settings: Settings) -> dict:
+    """Pick a time limit from the past solves most similar to ``features``.
+
+    Falls back to ``SOLVER_TIME_LIMIT_SECONDS`` until there are enough
+    recorded solves to compare against.
+    """
+    if len(observations) < NEIGHBOURS:
+        return {"time_limit": settings.solver_time_limit_seconds, "source": "default", "neighbours": 0}
+    nearest = sorted(observations, key=lambda observation: _distance(features, observation[0]))[:NEIGHBOURS]
+    needed = max(seconds for _, seconds in nearest)
+    time_limit = min(
+        settings.solver_max_time_limit_seconds,
+        max(settings.solver_min_time_limit_seconds, SAFETY_FACTOR * needed),
+    )
+    return {"time_limit": round(time_limit, 3), "source": "history", "neighbours": len(nearest)}
+
+
+def budgeted_options(db: Session, solver_input: ScheduleInput) -> tuple[SolverOptions, dict]:
+    """Solver options with an adaptive time limit, and the budget record for the solver stats."""
+    settings = get_settings()
+    options = solver_options()
+    features = problem_features(solver_input)
+    if not settings.solver_adaptive_time_limit:
+        return options, {"time_limit": options.time_limit_seconds, "source": "fixed", "features": features}
+    budget = estimate_time_limit(features, recent_observations(db), settings)
+    budget["features"] = features
+    return replace(options, time_limit_seconds=budget["time_limit"]), budget
@@ -1,6 +1,75 @@
+import os
 import sys
 from pathlib import Path
 
+import pytest
+
+# Keep the generation job registry in-process; tests have no Redis.
+os.environ.setdefault("REDIS_URL", "memory://")
+
 ROOT = Path(__file__).resolve().parents[2]
 if str(ROOT) not in sys.path:
     sys.path.insert(0, str(ROOT))
+
+
+@pytest.fixture
+def db_engine():
+    from sqlalchemy import create_engine
+    from sqlalchemy.pool import StaticPool
+
+    from app.database import Base
+
+    os.environ["SKIP_DB_INIT"] = "1"
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(bind=engine)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture
+def db_session_factory(db_engine):
+    from sqlalchemy.orm import sessionmaker
+
+    return sessionmaker(autocommit=False, autoflush=False, bind=db_engine)
+
+
+@pytest.fixture
+def client(db_session_factory):
+    from fastapi.testclient import TestClient
+
+    from app.database import get_db
+    from app.main import app
+
+    def override_get_db():
+        db = db_session_factory()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield TestClient(app)
+    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def query_budget(db_engine):
+    """Run a callable and assert it issued at most ``budget`` queries.
+
+    Usage: ``response = query_budget(3, client.get, "/residents")``.
+    """
+    from app.query_counter import count_engine_queries
+
+    def check(budget, call, *args, **kwargs):
+        with count_engine_queries(db_engine) as counter:
+            result = call(*args, **kwargs)
+        assert counter.count <= budget, (
+            f"expected at most {budget} queries, got {counter.count}:\n" + "\n".join(counter.statements)
+        )
+        return result
+
+    return check
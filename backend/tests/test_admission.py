@@ -0,0 +1,325 @@
+import threading
+import time
+from datetime import date
+
+from app import crud, main, tasks
+from app.admission import LocalJobStore, PeriodJobRegistry, SolveAdmission
+from app.models import ScheduleAlert, SchedulePeriod
+
+
+def test_solve_admission_leads_follows_and_rejects():
+    admission = SolveAdmission(limit=1)
+
+    role, leader = admission.enter(1)
+    assert role == "lead"
+    role, follower = admission.enter(1)
+    assert role == "follow"
+    assert follower is leader
+    assert admission.enter(2) == ("reject", None)
+
+    admission.finish(1, 42)
+    assert follower.result(timeout=1) == 42
+    assert admission.enter(2)[0] == "lead"
+
+
+def test_job_registry_coalesces_active_jobs():
+    registry = PeriodJobRegistry(LocalJobStore(), ttl=60)
+    active = {"job-1"}
+
+    assert registry.claim(7, "job-1", active.__contains__) == "job-1"
+    assert registry.claim(7, "job-2", active.__contains__) == "job-1"
+
+    active.clear()
+    assert registry.claim(7, "job-3", active.__contains__) == "job-3"
+    registry.release(7, "job-3")
+    assert registry.active_job(7, lambda job_id: True) is None
+
+
+def test_period_claims_lapse_unless_held(monkeypatch):
+    now = [0.0]
+    registry = PeriodJobRegistry(LocalJobStore(clock=lambda: now[0]), ttl=900)
+
+    # A job whose process died keeps the period only until its claim's TTL runs out.
+    assert registry.claim(7, "dead-job", lambda job_id: True) == "dead-job"
+    now[0] += 901
+    assert registry.claim(7, "job-2", lambda job_id: True) == "job-2"
+
+    # A running job renews its claim a lease at a time, past any fixed TTL.
+    with registry.hold(7, "job-2", lease=0.3):
+        for _ in range(5):
+            now[0] += 0.9
+            time.sleep(0.2)
+            assert registry.claim(7, "job-3", lambda job_id: True) == "job-2"
+    assert registry.active_job(7, lambda job_id: True) is None
+
+    # A queued job that outwaited its claim steps aside for the job that took the period.
+    registry.claim(7, "job-3", lambda job_id: True)
+    monkeypatch.setattr(tasks, "get_job_registry", lambda: registry)
+    monkeypatch.setattr(tasks, "_job_is_active", lambda job_id: True)
+    result = tasks.generate_schedule_for_period.apply(args=[7], task_id="late-job").get()
+    assert result == {"status": "superseded", "period_id": 7, "job_id": "job-3"}
+
+
+def test_generate_hands_off_to_queue_when_saturated(client, monkeypatch):
+    queued = []
+    registry = PeriodJobRegistry(LocalJobStore(), ttl=60)
+    monkeypatch.setattr(main, "get_solve_admission", lambda: SolveAdmission(limit=0))
+    monkeypatch.setattr(main, "get_job_registry", lambda: registry)
+    monkeypatch.setattr(main, "_job_is_active", lambda job_id: True)
+    monkeypatch.setattr(
+        tasks.generate_schedule_for_period,
+        "apply_async",
+        lambda args, task_id, priority: queued.append((args, task_id)),
+    )
+
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 3}).json()["id"]
+    first = client.post(f"/periods/{period_id}/generate")
+    second = client.post(f"/periods/{period_id}/generate")
+    third = client.post(f"/schedule-periods/{period_id}/generate")
+
+    assert first.status_code == 202
+    assert second.status_code == 202
+    assert second.json() == {"job_id": first.json()["job_id"], "status": "queued", "coalesced": True}
+    assert third.json()["job_id"] == first.json()["job_id"]
+    assert queued == [([period_id], first.json()["job_id"])]
+
+
+class _CountingAdmission(SolveAdmission):
+    def __init__(self, limit):
+        super().__init__(limit)
+        self.entered = threading.Semaphore(0)
+
+    def enter(self, period_id):
+        try:
+            return super().enter(period_id)
+        finally:
+            self.entered.release()
+
+
+def test_concurrent_generate_requests_share_one_solve(client, monkeypatch):
+    calls = []
+    release = threading.Event()
+    original = main._generate_version
+
+    def slow_generate(db, period):
+        calls.append(period.id)
+        release.wait(timeout=5)
+        return original(db, period)
+
+    admission = _CountingAdmission(limit=2)
+    monkeypatch.setattr(main, "get_solve_admission", lambda: admission)
+    monkeypatch.setattr(main, "_generate_version", slow_generate)
+
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 4}).json()["id"]
+    responses = []
+    threads = [
+        threading.Thread(target=lambda: responses.append(client.post(f"/periods/{period_id}/generate")))
+        for _ in range(2)
+    ]
+    for thread in threads:
+        thread.start()
+    # Let the leader finish only once both requests have been admitted.
+    assert admission.entered.acquire(timeout=5)
+    assert admission.entered.acquire(timeout=5)
+    release.set()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert calls == [period_id]
+    assert [response.status_code for response in responses] == [200, 200]
+    assert responses[0].json()["version"]["id"] == responses[1].json()["version"]["id"]
+
+
+class _PendingResult:
+    status = "PENDING"
+
+    def __init__(self, job_id, app=None):
+        self.id = job_id
+
+    def ready(self):
+        return False
+
+
+def test_batch_generation_fans_out_uncovered_periods(client, monkeypatch):
+    dispatched = []
+    monkeypatch.setattr(main, "_job_result", _PendingResult)
+    registry = PeriodJobRegistry(LocalJobStore(), ttl=60)
+    monkeypatch.setattr(main, "get_job_registry", lambda: registry)
+    monkeypatch.setattr(main, "_job_is_active", lambda job_id: True)
+    monkeypatch.setattr(
+        tasks,
+        "dispatch_generation_batch",
+        lambda batch_id, jobs, priority: dispatched.append((batch_id, dict(jobs), priority)),
+    )
+
+    period_ids = [
+        client.post("/periods/monthly", json={"year": 2024, "month": month}).json()["id"]
+        for month in (7, 8, 9)
+    ]
+    registry.claim(period_ids[1], "already-queued", lambda job_id: True)
+
+    response = client.post(
+        "/schedule-periods/generate-batch",
+        json={"start_date": "2024-07-01", "end_date": "2024-09-30"},
+    )
+    assert response.status_code == 202
+    body = response.json()
+    assert body["total"] == 3
+    assert [job["period_id"] for job in body["jobs"]] == period_ids
+    assert [job["coalesced"] for job in body["jobs"]] == [False, True, False]
+    assert body["jobs"][1]["job_id"] == "already-queued"
+
+    [(batch_id, jobs, priority)] = dispatched
+    assert batch_id == body["batch_id"]
+    assert sorted(jobs) == [period_ids[0], period_ids[2]]
+    assert priority == main.PRIORITY_BATCH
+
+    status = client.get(f"/batch-jobs/{batch_id}").json()
+    assert status["completed"] == 0
+    assert {job["job_id"] for job in status["jobs"]} == {*jobs.values(), "already-queued"}
+    assert client.get("/batch-jobs/unknown").status_code == 404
+
+
+def test_summarize_batch_reports_per_period_versions():
+    summary = tasks.summarize_batch(
+        [
+            {"status": "ok", "period_id": 1, "version_id": 10, "solver_stats": {"status": "OPTIMAL", "wall_time": 1.5}},
+            {"status": "timeout", "period_id": 2},
+        ]
+    )
+    assert summary["status"] == "partial"
+    assert [period["version_id"] for period in summary["periods"]] == [10, None]
+    assert summary["solver_seconds"] == 1.5
+
+
+def test_job_registry_replaces_a_stale_job_only_once():
+    registry = PeriodJobRegistry(LocalJobStore(), ttl=60)
+    registry.claim(7, "stale", lambda job_id: False)
+    both_checked = threading.Barrier(2)
+
+    def is_active(job_id):
+        if job_id != "stale":
+            return True
+        # Both callers see the stale owner before either replaces it.
+        both_checked.wait(timeout=5)
+        return False
+
+    owners = []
+    threads = [
+        threading.Thread(target=lambda job_id=job_id: owners.append(registry.claim(7, job_id, is_active)))
+        for job_id in ("job-a", "job-b")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    winner = registry.active_job(7, lambda job_id: True)
+    assert winner in {"job-a", "job-b"}
+    assert owners.count(winner) == 2
+
+
+def test_queued_generation_waits_out_a_running_synchronous_solve(client, monkeypatch):
+    queued = []
+    started = threading.Event()
+    release = threading.Event()
+    original = main._generate_version
+
+    def slow_generate(db, period):
+        started.set()
+        release.wait(timeout=5)
+        return original(db, period)
+
+    monkeypatch.setattr(main, "_generate_version", slow_generate)
+    monkeypatch.setattr(main, "get_job_registry", lambda: registry)
+    registry = PeriodJobRegistry(LocalJobStore(), ttl=60)
+    monkeypatch.setattr(
+        tasks.generate_schedule_for_period,
+        "apply_async",
+        lambda args, task_id, priority: queued.append(task_id),
+    )
+
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 5}).json()["id"]
+    responses = []
+    thread = threading.Thread(target=lambda: responses.append(client.post(f"/periods/{period_id}/generate")))
+    thread.start()
+    assert started.wait(timeout=5)
+    conflict = client.post(f"/schedule-periods/{period_id}/generate")
+    release.set()
+    thread.join(timeout=30)
+
+    assert conflict.status_code == 409
+    assert queued == []
+    assert responses[0].status_code == 200
+    # The claim is released with the solve, so the next queued generation goes ahead.
+    assert client.post(f"/schedule-periods/{period_id}/generate").json()["coalesced"] is False
+    assert len(queued) == 1
+
+
+def test_continue_takes_a_solve_slot_for_its_period(client, monkeypatch):
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 5}).json()["id"]
+    version_id = client.post(f"/periods/{period_id}/generate").json()["version"]["id"]
+    url = f"/schedule-versions/{version_id}/continue"
+
+    monkeypatch.setattr(main, "get_solve_admission", lambda: SolveAdmission(limit=0))
+    busy = client.post(url)
+    assert busy.status_code == 429
+    assert int(busy.headers["Retry-After"]) > 0
+
+    admission = SolveAdmission(limit=2)
+    monkeypatch.setattr(main, "get_solve_admission", lambda: admission)
+    admission.enter(period_id)
+    assert client.post(url).status_code == 409
+    admission.finish(period_id, version_id)
+
+    registry = PeriodJobRegistry(LocalJobStore(), ttl=60)
+    monkeypatch.setattr(main, "get_job_registry", lambda: registry)
+    registry.claim(period_id, "queued-job", lambda job_id: True)
+    monkeypatch.setattr(main, "_job_is_active", lambda job_id: True)
+    assert client.post(url).json()["detail"]["job_id"] == "queued-job"
+    registry.release(period_id, "queued-job")
+
+    # No residents: the solver stops before searching and reports no wall time.
+    result = client.post(url)
+    assert result.status_code == 200
+    assert result.json()["wall_time"] == 0.0 and result.json()["rounds"] == 1
+    assert admission.running == 0 and registry.active_job(period_id, lambda job_id: True) is None
+
+
+def test_explain_takes_a_solve_slot_and_shares_its_run(client, db_session_factory, monkeypatch):
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 6}).json()["id"]
+    with db_session_factory() as db:
+        version = crud.create_version(db, db.get(SchedulePeriod, period_id))
+        db.add(ScheduleAlert(version=version, date=date(2024, 6, 3), message="Understaffed OB_OC coverage."))
+        db.commit()
+        version_id = version.id
+    url = f"/schedule-versions/{version_id}/explain"
+
+    monkeypatch.setattr(main, "get_solve_admission", lambda: SolveAdmission(limit=0))
+    busy = client.get(url)
+    assert busy.status_code == 429
+    assert int(busy.headers["Retry-After"]) > 0
+
+    admission = _CountingAdmission(limit=1)
+    monkeypatch.setattr(main, "get_solve_admission", lambda: admission)
+    key = ("explain", version_id)
+    assert admission.enter(key)[0] == "lead"
+    responses = []
+    follower = threading.Thread(target=lambda: responses.append(client.get(url)))
+    follower.start()
+    assert admission.entered.acquire(timeout=5) and admission.entered.acquire(timeout=5)
+    shared = {
+        "start_date": "2024-06-03",
+        "end_date": "2024-06-03",
+        "forced": False,
+        "conflicts": [],
+        "checks": 1,
+        "truncated": False,
+        "wall_time": 0.1,
+    }
+    admission.finish(key, [shared])
+    follower.join(timeout=10)
+    assert responses[0].json() == [shared]
+
+    assert client.get(url).json()[0]["start_date"] == "2024-06-03"
+    assert admission.running == 0
@@ -1,13 +1,18 @@
 import os
+from datetime import date
 
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
+from solver.replay import load_input
+
+from app import crud, solver_client
+from app.config import Settings
 from app.database import Base, get_db
 from app.main import app
-from app.models import Resident
+from app.models import Holiday, Resident, ScheduleAlert, SchedulePeriod
 
 
 def test_generate_schedule_creates_version_and_assignments():
@@ -50,3 +55,223 @@ def test_generate_schedule_creates_version_and_assignments():
     assert len(payload["assignments"]) == 2
 
     app.dependency_overrides.clear()
+
+
+def test_period_calendar_lists_classified_days():
+    os.environ["SKIP_DB_INIT"] = "1"
+    engine = create_engine(
+        "sqlite+pysqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    Base.metadata.create_all(bind=engine)
+
+    def override_get_db():
+        db = TestingSessionLocal()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+
+    with TestingSessionLocal() as db:
+        db.add(Holiday(date=date(2024, 1, 15), name="MLK Day", hospital_holiday=True))
+        db.commit()
+
+    client = TestClient(app)
+
+    response = client.post("/periods/monthly", json={"year": 2024, "month": 1})
+    assert response.status_code == 201
+    period_id = response.json()["id"]
+
+    response = client.get(f"/periods/{period_id}/calendar")
+    assert response.status_code == 200
+    days = response.json()
+    assert len(days) == 31
+    mlk_day = next(day for day in days if day["date"] == "2024-01-15")
+    assert mlk_day["day_class"] == "weekend_or_holiday"
+    assert mlk_day["holiday_name"] == "MLK Day"
+    assert days[4]["day_class"] == "friday"
+
+    app.dependency_overrides.clear()
+
+
+def test_metrics_endpoint_reports_route_latency():
+    os.environ["SKIP_DB_INIT"] = "1"
+    client = TestClient(app)
+
+    assert client.get("/health").status_code == 200
+    response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert 'http_request_duration_seconds_count{method="GET",route="/health",status="200"}' in response.text
+    assert "cache_hits_total" in response.text
+
+
+def test_explain_endpoint_names_conflicting_time_off(client, db_session_factory):
+    resident_ids = [
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1}).json()["id"]
+        for index in range(4)
+    ]
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+    for resident_id in resident_ids[1:]:
+        client.post(
+            "/time-off",
+            json={
+                "resident_id": resident_id,
+                "start_date": "2024-02-14",
+                "end_date": "2024-02-14",
+                "block_type": "BT_DAY",
+            },
+        )
+    with db_session_factory() as db:
+        version = crud.create_version(db, db.get(SchedulePeriod, period_id))
+        db.add(ScheduleAlert(version=version, date=date(2024, 2, 14), message="Understaffed OB_OC coverage."))
+        db.commit()
+        version_id = version.id
+
+    response = client.get(f"/schedule-versions/{version_id}/explain")
+
+    assert response.status_code == 200
+    [explanation] = response.json()
+    assert explanation["forced"]
+    blamed = {
+        diagnostic["resident_name"]
+        for conflict in explanation["conflicts"]
+        for diagnostic in conflict
+        if diagnostic["kind"] == "time_off"
+    }
+    assert blamed == {"R1", "R2", "R3"}
+    assert client.get("/schedule-versions/999/explain").status_code == 404
+
+
+def test_preview_returns_a_provisional_schedule(client):
+    for index in range(6):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    response = client.get(f"/periods/{period_id}/preview")
+
+    assert response.status_code == 200
+    preview = response.json()
+    assert preview["stats"]["status"] == "PREVIEW"
+    assert any(assignment["shift_type"] == "OB_OC" for assignment in preview["assignments"])
+    assert client.get(f"/periods/{period_id}/versions").json() == []
+
+
+def test_generation_dumps_artifacts_when_configured(client, monkeypatch, tmp_path):
+    monkeypatch.setattr(solver_client, "get_settings", lambda: Settings(SOLVER_ARTIFACT_DIR=str(tmp_path)))
+    for index in range(6):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    version_id = client.post(f"/periods/{period_id}/generate").json()["version"]["id"]
+
+    artifacts = tmp_path / str(version_id)
+    assert sorted(path.name for path in artifacts.iterdir()) == ["input.json.gz", "model-2024-02-01.pb.gz"]
+    payload, _ = load_input(artifacts)
+    assert len(payload.residents) == 6
+
+
+def test_search_log_is_stored_and_summarised(client, monkeypatch):
+    monkeypatch.setattr(solver_client, "get_settings", lambda: Settings(SOLVER_CAPTURE_LOG=True))
+    for index in range(6):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    version_id = client.post(f"/periods/{period_id}/generate").json()["version"]["id"]
+
+    log = client.get(f"/schedule-versions/{version_id}/search-log").json()
+    assert log["compressed_size"] < log["size"]
+    (run,) = log["summary"]["runs"]
+    assert run["label"] == "2024-02-01..2024-02-29"
+    assert run["status"] in {"OPTIMAL", "FEASIBLE"}
+    assert run["presolve_time"] is not None
+    assert run["first_solution_time"] == run["objective"][0][0]
+    assert sum(run["solutions_by_worker"].values()) == len(run["objective"])
+    text = client.get(f"/schedule-versions/{version_id}/search-log/raw").text
+    assert text.startswith("=== 2024-02-01..2024-02-29 ===")
+    assert "CpSolverResponse summary" in text
+
+    monkeypatch.setattr(solver_client, "get_settings", lambda: Settings())
+    other_id = client.post(f"/periods/{period_id}/generate").json()["version"]["id"]
+    assert client.get(f"/schedule-versions/{other_id}/search-log").status_code == 404
+
+
+def test_score_matches_solver_objective_and_applies_overrides(client):
+    for index in range(6):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+    version_id = client.post(f"/periods/{period_id}/generate").json()["version"]["id"]
+
+    score = client.post(f"/schedule-versions/{version_id}/score").json()
+    assert score["objective"] == score["solver_objective"]
+    assert score["weights"] == {"understaff": 1000, "call": 20, "weekend": 5, "request": 10}
+
+    overrides = {"weights": {"understaff": 1}}
+    rescored = client.post(f"/schedule-versions/{version_id}/score", json={"constraints": overrides}).json()
+    assert rescored["overrides"] == overrides
+    assert rescored["weights"]["understaff"] == 1
+    assert rescored["objective"] == score["objective"] - 999 * score["understaff"]
+    assert client.post("/schedule-versions/999/score").status_code == 404
+
+
+def test_recommendations_cover_an_unassigned_call(client):
+    for index in range(8):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+    version_id = client.post(f"/periods/{period_id}/generate").json()["version"]["id"]
+    assignments = client.get(f"/schedule-versions/{version_id}/assignments").json()
+    call = next(
+        assignment
+        for assignment in assignments
+        if assignment["shift_type"] == "OB_OC" and "2024-02-05" <= assignment["date"] <= "2024-02-25"
+    )
+
+    url = f"/schedule-versions/{version_id}/recommendations"
+    result = client.post(url, json={"date": call["date"], "resident_id": call["resident_id"], "limit": 5}).json()
+    assert result["shift_type"] == "OB_OC"
+    assert {"resident_id": call["resident_id"], "date": call["date"], "shift_type": "OB_OC"} in result["unassigned"]
+    assert 0 < len(result["candidates"]) <= 5
+    best = result["candidates"][0]
+    assert best["valid"] and best["kind"] in {"chain", "swap"}
+    assert best["score"]["objective"] == result["baseline"]["objective"] + best["delta"]
+    assert best["score"]["understaff"] <= result["baseline"]["understaff"]
+    (taken,) = [edit for edit in best["edits"] if edit["date"] == call["date"] and edit["to_shift"] == "OB_OC"]
+    assert taken["resident_id"] != call["resident_id"] and taken["resident_name"]
+    deltas = [candidate["delta"] for candidate in result["candidates"] if candidate["valid"]]
+    assert deltas == sorted(deltas)
+
+    response = client.post(url, json={"date": call["date"], "shift_type": "OB_OC"})
+    assert response.status_code == 400
+    assert client.post(url, json={"date": call["date"]}).status_code == 400
+
+
+def test_continue_solving_reuses_the_stored_incumbent_and_bound(client, monkeypatch):
+    monkeypatch.setattr(
+        solver_client, "get_settings", lambda: Settings(SOLVER_TIME_LIMIT_SECONDS=0.3, SOLVER_GREEDY_HINT=False)
+    )
+    for index in range(10):
+        client.post("/residents", json={"name": f"R{index}", "tier": index % 3, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 3}).json()["id"]
+    version = client.post(f"/periods/{period_id}/generate").json()["version"]
+    stats = version["solver_stats"]
+    assert stats["input_fingerprint"]
+
+    result = client.post(f"/schedule-versions/{version['id']}/continue", json={"time_limit_seconds": 2}).json()
+    assert result["continued_from"] == version["id"]
+    assert result["bound_reused"] == (stats["best_bound"] is not None)
+    assert result["incumbent_hint"] is True
+    assert result["previous_objective"] == stats["objective"]
+    assert result["objective"] <= stats["objective"]
+    assert result["best_bound"] >= stats["best_bound"]
+    assert result["rounds"] == 1
+    continued = client.get(f"/periods/{period_id}/versions").json()
+    assert len(continued) == (2 if result["improved"] else 1)
+    latest = next(item for item in continued if item["id"] == result["version_id"])
+    assert latest["solver_stats"]["continuation"]["from_version"] == version["id"]
+
+    again = client.post(f"/schedule-versions/{result['version_id']}/continue").json()
+    assert again["rounds"] == 2 and again["search_time"] > result["search_time"]
@@ -0,0 +1,28 @@
+from app import celery_app as celery_module
+from app.config import Settings
+
+
+def test_generation_routes_to_solver_queue_and_ping_does_not():
+    router = celery_module.celery_app.amqp.router
+
+    solver_route = router.route({}, "app.tasks.generate_schedule_for_period")
+    scenario_route = router.route({}, "app.tasks.solve_scenario")
+    ping_route = router.route({}, "app.tasks.ping")
+
+    assert solver_route["queue"].name == celery_module.SOLVER_QUEUE
+    assert scenario_route["queue"].name == celery_module.SOLVER_QUEUE
+    assert ping_route["queue"].name == celery_module.DEFAULT_QUEUE
+
+
+def test_solver_worker_concurrency_follows_cores_per_solve(monkeypatch):
+    monkeypatch.setattr(celery_module.os, "cpu_count", lambda: 16)
+
+    assert celery_module.solver_worker_concurrency(Settings(SOLVER_NUM_WORKERS=8)) == 2
+    assert celery_module.solver_worker_concurrency(Settings(SOLVER_NUM_WORKERS=32)) == 1
+    assert celery_module.solver_worker_concurrency(Settings(SOLVER_NUM_WORKERS=0)) == 1
+
+
+def test_solver_task_time_limits_track_solver_budget():
+    settings = Settings(SOLVER_TIME_LIMIT_SECONDS=60, SOLVER_TASK_OVERHEAD_SECONDS=30)
+
+    assert celery_module.solver_task_time_limits(settings) == (90, 120)
@@ -0,0 +1,86 @@
+from datetime import date
+
+import pytest
+
+from app import models
+
+
+@pytest.fixture
+def seeded(db_session_factory):
+    with db_session_factory() as db:
+        residents = [
+            models.Resident(name=f"Resident {index}", tier=index % 3, ob_months_completed=index % 4 + 1)
+            for index in range(8)
+        ]
+        db.add_all(residents)
+        db.flush()
+        for resident in residents:
+            db.add(
+                models.ResidentRequest(
+                    resident_id=resident.id,
+                    request_type=models.RequestType.AVOID_CALL,
+                    start_date=date(2024, 2, 3),
+                    end_date=date(2024, 2, 4),
+                )
+            )
+            db.add(
+                models.TimeOff(
+                    resident_id=resident.id,
+                    start_date=date(2024, 2, 12),
+                    end_date=date(2024, 2, 12),
+                    block_type=models.ShiftType.BT_DAY,
+                )
+            )
+        db.commit()
+
+
+def test_endpoint_query_budgets(client, query_budget, seeded):
+    response = query_budget(3, client.post, "/periods/monthly", json={"year": 2024, "month": 2})
+    period_id = response.json()["id"]
+
+    # Rows are bulk inserted, so the budget does not grow with the schedule size.
+    # One of the queries reads past solver stats for the time budget.
+    response = query_budget(21, client.post, f"/periods/{period_id}/generate")
+    assert response.status_code == 200
+    version_id = response.json()["version"]["id"]
+    assert len(response.json()["assignments"]) > 100
+
+    budgets = [
+        (1, "get", f"/periods/{period_id}/versions"),
+        (1, "get", "/requests"),
+        (1, "get", "/residents"),
+        (1, "get", "/time-off"),
+        (1, "get", f"/schedule-versions/{version_id}/assignments"),
+        (1, "get", f"/schedule-versions/{version_id}/conflicts"),
+        (6, "get", f"/schedule-versions/{version_id}/validate"),
+        (3, "get", f"/periods/{period_id}/calendar"),
+        (9, "post", f"/schedule-versions/{version_id}/score"),
+    ]
+    for budget, method, url in budgets:
+        response = query_budget(budget, getattr(client, method), url)
+        assert response.status_code == 200, url
+
+    response = query_budget(2, client.patch, "/requests/1", json={"approved": False})
+    assert response.json()["resident_name"] == "Resident 0"
+
+
+def test_debug_headers_report_query_count(db_engine, db_session_factory):
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    from app.query_counter import query_count_middleware
+
+    app = FastAPI()
+    app.middleware("http")(query_count_middleware(debug=True))
+
+    @app.get("/count")
+    def count():
+        with db_session_factory() as db:
+            db.query(models.Resident).all()
+            db.query(models.Holiday).all()
+        return {}
+
+    response = TestClient(app).get("/count")
+
+    assert response.headers["X-DB-Query-Count"] == "2"
+    assert float(response.headers["X-DB-Query-Time-Ms"]) >= 0
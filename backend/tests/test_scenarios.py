@@ -0,0 +1,107 @@
+from solver.solver import SolverOptions
+
+from app import main, models, tasks
+from app.admission import LocalJobStore, PeriodJobRegistry
+from app.constraints import DEFAULT_CONSTRAINTS, merge_constraints
+from app.scenarios import scenario_output, summarize_scenario
+from app.solver_client import load_schedule_input, run_solver
+
+
+def test_merge_constraints_overrides_nested_keys():
+    merged = merge_constraints(DEFAULT_CONSTRAINTS, {"weights": {"call": 50}, "call_targets": {"tier3": [2, 3]}})
+
+    assert merged["weights"] == {**DEFAULT_CONSTRAINTS["weights"], "call": 50}
+    assert merged["call_targets"]["tier3"] == [2, 3]
+    assert merged["call_targets"]["tier1"] == [6, 7]
+    assert DEFAULT_CONSTRAINTS["weights"]["call"] == 20
+
+
+class _FinishedResult:
+    results: dict = {}
+
+    def __init__(self, job_id, app=None):
+        self.result = self.results.get(job_id)
+        self.status = "SUCCESS" if self.result is not None else "PENDING"
+
+    def ready(self):
+        return self.result is not None
+
+    def successful(self):
+        return self.ready()
+
+
+def test_scenario_sweep_compares_without_persisting_until_chosen(client, db_session_factory, monkeypatch):
+    dispatched = {}
+    registry = PeriodJobRegistry(LocalJobStore(), ttl=60)
+    monkeypatch.setattr(main, "get_job_registry", lambda: registry)
+    monkeypatch.setattr(main, "_job_result", _FinishedResult)
+    monkeypatch.setattr(
+        tasks,
+        "dispatch_scenarios",
+        lambda period_id, jobs, overrides, time_limit, priority: dispatched.update(jobs=jobs, overrides=overrides),
+    )
+    for index in range(6):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    response = client.post(
+        f"/periods/{period_id}/scenarios",
+        json={"scenarios": [{"name": "heavy-call", "constraints": {"weights": {"call": 200}}}]},
+    )
+    assert response.status_code == 202
+    run = response.json()
+    assert [row["name"] for row in run["scenarios"]] == ["base", "heavy-call"]
+    assert dispatched["overrides"] == {"base": {}, "heavy-call": {"weights": {"call": 200}}}
+
+    constraints = merge_constraints(DEFAULT_CONSTRAINTS, {"weights": {"call": 200}})
+    with db_session_factory() as db:
+        solver_input = load_schedule_input(db, db.get(models.SchedulePeriod, period_id), constraints)
+    result = run_solver(solver_input, SolverOptions(time_limit_seconds=5))
+    summary = summarize_scenario("heavy-call", period_id, {"weights": {"call": 200}}, solver_input, result)
+    monkeypatch.setattr(_FinishedResult, "results", {dispatched["jobs"]["heavy-call"]: summary})
+
+    table = client.get(f"/scenario-runs/{run['run_id']}").json()
+    assert table["completed"] == 1
+    row = table["scenarios"][1]
+    assert row["objective"] == summary["objective"]
+    assert row["unmet_requests"] == 0
+    assert client.get(f"/periods/{period_id}/versions").json() == []
+
+    assert client.post(f"/scenario-runs/{run['run_id']}/choose", json={"name": "base"}).status_code == 409
+    chosen = client.post(f"/scenario-runs/{run['run_id']}/choose", json={"name": "heavy-call"})
+    assert chosen.status_code == 201
+    version = chosen.json()
+    assert version["solver_stats"]["scenario"]["name"] == "heavy-call"
+    assignments = client.get(f"/schedule-versions/{version['id']}/assignments").json()
+    assert len(assignments) == len(scenario_output(summary).assignments)
+
+
+def test_alternatives_job_stores_each_schedule_as_a_draft(client, db_session_factory, monkeypatch):
+    monkeypatch.setattr(tasks, "SessionLocal", db_session_factory)
+    monkeypatch.setattr(tasks, "solver_options", lambda: SolverOptions(time_limit_seconds=6))
+    for index in range(6):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    result = tasks.generate_alternatives_for_period(period_id, 2, 4)
+
+    assert result["status"] == "ok"
+    first, second = result["version_ids"]
+    assert result["alternatives"][0]["distances"][second] >= 4
+    versions = client.get(f"/periods/{period_id}/versions").json()
+    assert {version["id"] for version in versions} == {first, second}
+    assert all(version["status"] == "DRAFT" for version in versions)
+    stats = next(version for version in versions if version["id"] == second)["solver_stats"]
+    assert stats["alternative"] == 1
+    assert stats["distances"][str(first)] == result["alternatives"][1]["distances"][first]
+
+
+def test_alternatives_job_handles_an_empty_roster(client, db_session_factory, monkeypatch):
+    monkeypatch.setattr(tasks, "SessionLocal", db_session_factory)
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    result = tasks.generate_alternatives_for_period(period_id, 3)
+
+    [version_id] = result["version_ids"]
+    assert result["alternatives"][0]["distances"] == {version_id: 0}
+    assert result["alternatives"][0]["score"]["understaff"] > 0
@@ -1,6 +1,37 @@
-from datetime import date
+import json
+import pickle
+from dataclasses import replace
+from datetime import date, timedelta
 
-from solver.solver import Resident, ScheduleInput, TimeOff, ShiftType, generate_schedule
+import pytest
+from ortools.sat.python import cp_model
+
+from solver.alternatives import generate_alternatives
+from solver.calendar import DayClass, build_day_table
+from solver.explain import explain_understaffing
+from solver.greedy import greedy_assignments, greedy_schedule
+from solver.horizon import generate_rolling_schedule
+from solver.recommend import recommend_edits
+from solver.replay import dump_input, load_input, main as replay_main, replay_models
+from solver.scoring import score_assignments
+from solver.search_log import summarize_search_log
+from solver.solver import (
+    DEFAULT_CONSTRAINTS,
+    SHIFT_TYPES,
+    Assignment,
+    AssignmentTable,
+    GenerationOutput,
+    Request,
+    RequestType,
+    Resident,
+    ScheduleInput,
+    SolverOptions,
+    TimeOff,
+    ShiftType,
+    build_model,
+    generate_schedule,
+    overall_stop_reason,
+)
 
 
 def test_solver_assigns_postcall_after_call():
@@ -114,3 +145,497 @@ def test_solver_treats_holiday_as_weekend():
         assignment.shift_type == ShiftType.OB_L4
         for assignment in result.assignments
     )
+
+
+def test_day_table_classifies_days_once():
+    table = build_day_table(
+        date(2024, 1, 1),
+        date(2024, 1, 7),
+        {date(2024, 1, 1): "New Year's Day"},
+        DEFAULT_CONSTRAINTS,
+    )
+
+    assert [entry.day_class for entry in table] == [
+        DayClass.WEEKEND_OR_HOLIDAY,
+        DayClass.WEEKDAY,
+        DayClass.WEEKDAY,
+        DayClass.WEEKDAY,
+        DayClass.FRIDAY,
+        DayClass.WEEKEND_OR_HOLIDAY,
+        DayClass.WEEKEND_OR_HOLIDAY,
+    ]
+    assert table[0].holiday_name == "New Year's Day"
+    assert table[0].coverage["ob_l4"] == 1
+    assert [entry.tier0_restricted for entry in table[:4]] == [True, True, True, False]
+
+    # Cached tables are shared, so their coverage must not be writable or alias the constraints.
+    with pytest.raises(TypeError):
+        table[1].coverage["ob_oc"] = 9
+    assert table[1].coverage is not DEFAULT_CONSTRAINTS["coverage"]["weekday"]
+    assert pickle.loads(pickle.dumps(table)) == table
+
+
+def test_solver_reports_model_statistics():
+    payload = ScheduleInput(
+        start_date=date(2024, 1, 8),
+        end_date=date(2024, 1, 10),
+        residents=[Resident(id=index, tier=1, ob_months_completed=1) for index in range(1, 7)],
+        requests=[],
+        time_off=[],
+    )
+
+    result = generate_schedule(payload)
+
+    assert result.stats["status"] in {"OPTIMAL", "FEASIBLE"}
+    assert result.stats["model"]["days"] == 3
+    assert result.stats["model"]["variables"] > 0
+    assert result.stats["num_solutions"] >= 1
+    assert set(result.stats["phases"]) == {"build_model", "greedy_hint", "search", "extract"}
+
+
+def _roster(count):
+    return [Resident(id=index + 1, tier=1 + index % 2, ob_months_completed=1) for index in range(count)]
+
+
+def test_hint_time_comes_out_of_the_time_limit():
+    payload = ScheduleInput(
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 3, 31),
+        residents=_roster(30),
+        requests=[],
+        time_off=[],
+    )
+
+    result = generate_schedule(payload, SolverOptions(time_limit_seconds=1.0, plateau_seconds=0))
+
+    phases = result.stats["phases"]
+    assert phases["greedy_hint"] > 0
+    assert phases["greedy_hint"] + phases["search"] <= 1.1
+
+
+def test_score_matches_solver_objective():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 10),
+        residents=_roster(6),
+        requests=[
+            Request(
+                resident_id=1,
+                request_type=RequestType.AVOID_CALL,
+                start_date=date(2024, 2, 3),
+                end_date=date(2024, 2, 4),
+            )
+        ],
+        time_off=[],
+    )
+
+    result = generate_schedule(payload, SolverOptions(time_limit_seconds=10))
+
+    assert score_assignments(payload, result.assignments)["objective"] == result.stats["objective"]
+
+
+def test_rolling_horizon_carries_boundary_state():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 21),
+        residents=_roster(8),
+        requests=[],
+        time_off=[],
+    )
+    options = SolverOptions(time_limit_seconds=15, rolling_window_days=10, rolling_step_days=7)
+
+    result = generate_rolling_schedule(payload, options)
+
+    assert result.stats["mode"] == "rolling"
+    assert result.stats["model"]["windows"] == 3
+    assert result.stats["objective"] == score_assignments(payload, result.assignments)["objective"]
+    shifts = {(assignment.resident_id, assignment.date): assignment.shift_type for assignment in result.assignments}
+    assert len(shifts) == len(result.assignments)
+    assert {assignment.date for assignment in result.assignments} == set(
+        date(2024, 2, day) for day in range(1, 22)
+    )
+    for (resident_id, day), shift in shifts.items():
+        next_shift = shifts.get((resident_id, day + timedelta(days=1)))
+        if day == payload.end_date:
+            continue
+        if shift in {ShiftType.OB_OC, ShiftType.OB_L4}:
+            assert next_shift == ShiftType.OB_POSTCALL
+        if shift == ShiftType.OB_L3:
+            assert next_shift == ShiftType.OB_OC
+    assert sum(result.fairness["ob_oc_counts"].values()) == sum(
+        shift == ShiftType.OB_OC for shift in shifts.values()
+    )
+
+
+def test_symmetry_breaking_orders_interchangeable_residents():
+    residents = [Resident(id=index, tier=1, ob_months_completed=2) for index in range(1, 7)]
+    residents.append(Resident(id=7, tier=2, ob_months_completed=2))
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 5),
+        end_date=date(2024, 2, 18),
+        residents=residents,
+        requests=[],
+        time_off=[
+            TimeOff(
+                resident_id=6,
+                start_date=date(2024, 2, 5),
+                end_date=date(2024, 2, 6),
+                block_type=ShiftType.BT_DAY,
+            )
+        ],
+    )
+
+    broken = generate_schedule(payload, SolverOptions(time_limit_seconds=10, symmetry_breaking=True))
+    plain = generate_schedule(payload, SolverOptions(time_limit_seconds=10))
+
+    assert broken.stats["symmetry_classes"] == plain.stats["symmetry_classes"] == [5]
+    assert broken.stats["symmetry_breaking"] and not plain.stats["symmetry_breaking"]
+    assert broken.stats["objective"] == plain.stats["objective"]
+    counts = [broken.fairness["ob_oc_counts"][resident_id] for resident_id in range(1, 6)]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_lexicographic_mode_fixes_coverage_before_fairness():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 14),
+        residents=_roster(5),
+        requests=[
+            Request(
+                resident_id=2,
+                request_type=RequestType.PREFER_CALL,
+                start_date=date(2024, 2, 6),
+                end_date=date(2024, 2, 7),
+            )
+        ],
+        time_off=[],
+    )
+
+    weighted = generate_schedule(payload, SolverOptions(time_limit_seconds=10))
+    staged = generate_schedule(payload, SolverOptions(time_limit_seconds=10, objective_mode="lexicographic"))
+
+    stages = staged.stats["stages"]
+    assert [stage["stage"] for stage in stages] == ["understaff", "call_deviation", "balance"]
+    assert all(stage["status"] == "OPTIMAL" for stage in stages)
+    score = score_assignments(payload, staged.assignments)
+    assert staged.stats["objective"] == score["objective"]
+    assert score["understaff"] == stages[0]["objective"]
+    assert score["understaff"] <= score_assignments(payload, weighted.assignments)["understaff"]
+    # Last improvement is measured across stages, not pinned to the end of the run.
+    last = staged.stats["last_solution_time"]
+    assert last == max(stage["last_solution_time"] for stage in stages)
+    assert stages[-1]["last_solution_time"] >= sum(stage["wall_time"] for stage in stages[:-1])
+    assert last <= staged.stats["wall_time"]
+
+
+def test_lexicographic_bounds_need_proven_earlier_stages(monkeypatch):
+    from solver import solver as solver_module
+
+    solve = solver_module._solve
+    calls = []
+
+    def first_stage_plateaus(*args, **kwargs):
+        status, plateaued = solve(*args, **kwargs)
+        calls.append(status)
+        # Stand in for a first stage stopped before it proved its optimum.
+        return (cp_model.FEASIBLE, True) if len(calls) == 1 else (status, plateaued)
+
+    monkeypatch.setattr(solver_module, "_solve", first_stage_plateaus)
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 14),
+        residents=_roster(5),
+        requests=[],
+        time_off=[],
+    )
+
+    output = generate_schedule(payload, SolverOptions(time_limit_seconds=10, objective_mode="lexicographic"))
+
+    first, *later = output.stats["stages"]
+    assert first["stop_reason"] == "plateau" and first["best_bound"] is not None
+    assert later and all(stage["objective"] is not None for stage in later)
+    assert all(stage["best_bound"] is None and stage["gap"] is None for stage in later)
+    assert output.stats["best_bound"] is None and output.stats["gap"] is None
+
+
+def test_alternatives_differ_in_call_shifts():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 5),
+        end_date=date(2024, 2, 18),
+        residents=_roster(6),
+        requests=[],
+        time_off=[],
+    )
+
+    outputs = generate_alternatives(payload, 3, min_distance=4, options=SolverOptions(time_limit_seconds=9))
+
+    assert len(outputs) == 3
+    objectives = [output.stats["objective"] for output in outputs]
+    assert objectives == sorted(objectives)
+    for index, output in enumerate(outputs):
+        distances = output.stats["distances"]
+        assert distances[index] == 0
+        assert all(distance >= 4 for other, distance in enumerate(distances) if other != index)
+        assert output.stats["score"]["objective"] == output.stats["objective"]
+
+
+def test_explanation_names_the_time_off_behind_a_shortfall():
+    crunch = date(2024, 2, 14)
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 12),
+        end_date=date(2024, 2, 16),
+        residents=_roster(4),
+        requests=[],
+        time_off=[
+            TimeOff(resident_id=resident_id, start_date=crunch, end_date=crunch, block_type=ShiftType.BT_DAY)
+            for resident_id in (2, 3, 4)
+        ],
+    )
+    output = generate_schedule(payload, SolverOptions(time_limit_seconds=5))
+    understaffed = {alert["date"] for alert in output.alerts if alert["message"].startswith("Understaffed")}
+    assert crunch in understaffed
+
+    explanations = explain_understaffing(payload, [crunch])
+
+    assert len(explanations) == 1
+    explanation = explanations[0]
+    assert explanation["forced"]
+    kinds = [{diagnostic["kind"] for diagnostic in conflict} for conflict in explanation["conflicts"]]
+    assert all("coverage" in conflict for conflict in kinds)
+    blamed = {
+        diagnostic["resident_id"]
+        for conflict in explanation["conflicts"]
+        for diagnostic in conflict
+        if diagnostic["kind"] == "time_off"
+    }
+    assert blamed == {2, 3, 4}
+
+
+def test_explanation_reports_unforced_shortfalls():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 12),
+        end_date=date(2024, 2, 16),
+        residents=_roster(8),
+        requests=[],
+        time_off=[],
+    )
+
+    explanations = explain_understaffing(payload, [date(2024, 2, 13), date(2024, 2, 14)])
+
+    assert [(item["start_date"], item["forced"], item["conflicts"]) for item in explanations] == [
+        ("2024-02-13", False, [])
+    ]
+    assert not explanations[0]["truncated"]
+
+    # Out of time before the first check: the cluster is reported, unexplained.
+    [truncated] = explain_understaffing(payload, [date(2024, 2, 13)], SolverOptions(time_limit_seconds=0))
+    assert truncated["truncated"] and truncated["checks"] == 0
+
+
+def test_greedy_schedule_satisfies_every_hard_rule():
+    residents = _roster(5) + [Resident(id=6, tier=0, ob_months_completed=0)]
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 29),
+        residents=residents,
+        requests=[],
+        time_off=[
+            TimeOff(resident_id=2, start_date=date(2024, 2, 8), end_date=date(2024, 2, 12), block_type=ShiftType.BT_DAY)
+        ],
+    )
+    built = build_model(payload, SolverOptions())
+    schedule = greedy_assignments(payload, built.calendar)
+    for (resident_id, day, shift), variable in built.assign.items():
+        built.model.Add(variable == int(schedule.get((resident_id, day)) == shift))
+    built.model.Minimize(built.weighted_objective)
+    solver = cp_model.CpSolver()
+
+    assert solver.Solve(built.model) == cp_model.OPTIMAL
+    preview = greedy_schedule(payload)
+    assert preview.stats["status"] == "PREVIEW"
+    assert score_assignments(payload, preview.assignments)["objective"] == solver.ObjectiveValue()
+
+
+def test_solver_reports_why_the_search_stopped():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 5),
+        end_date=date(2024, 2, 11),
+        residents=_roster(6),
+        requests=[],
+        time_off=[],
+    )
+
+    stats = generate_schedule(payload, SolverOptions(time_limit_seconds=5, plateau_seconds=1)).stats
+
+    assert stats["stop_reason"] == "optimal"
+    assert stats["last_solution_time"] <= stats["wall_time"]
+    assert overall_stop_reason(["optimal", "plateau", "gap"]) == "plateau"
+    assert overall_stop_reason(["gap", "time_limit", None]) == "time_limit"
+
+
+def test_dumped_input_and_models_replay(tmp_path):
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 3, 15),
+        residents=_roster(6),
+        requests=[Request(1, RequestType.AVOID_CALL, date(2024, 2, 3), date(2024, 2, 4))],
+        time_off=[TimeOff(2, date(2024, 2, 5), date(2024, 2, 6), ShiftType.BT_DAY)],
+        holidays={date(2024, 2, 19): "Presidents Day"},
+    )
+    options = SolverOptions(time_limit_seconds=6, rolling_window_days=35, artifact_dir=str(tmp_path))
+    dump_input(tmp_path, payload, options)
+    result = generate_rolling_schedule(payload, options)
+
+    replayed_input, replayed_options = load_input(tmp_path)
+    assert replayed_input == payload
+    assert replayed_options.artifact_dir == ""
+    replays = replay_models(tmp_path, 3, 0, ["linearization_level: 2"], log=False)
+    assert [replay["model"] for replay in replays] == ["model-2024-02-01.pb.gz", "model-2024-02-29.pb.gz"]
+    assert replays[0]["objective"] == result.stats["windows"][0]["objective"]
+
+
+def test_pipeline_replay_prints_timings_and_the_search_log(tmp_path, capsys):
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 5),
+        end_date=date(2024, 2, 11),
+        residents=_roster(5),
+        requests=[],
+        time_off=[],
+    )
+    dump_input(tmp_path, payload, SolverOptions(time_limit_seconds=2))
+
+    replay_main([str(tmp_path), "--pipeline"])
+
+    captured = capsys.readouterr()
+    report = json.loads(captured.out)
+    assert "search" in report["stats"]["phases"]
+    [run] = report["search_log"]["runs"]
+    assert run["status"] == report["stats"]["status"]
+    assert "Starting CP-SAT solver" in captured.err
+
+
+def test_rolling_search_log_has_one_run_per_window():
+    payload = ScheduleInput(
+        start_date=date(2024, 1, 1),
+        end_date=date(2024, 2, 29),
+        residents=[Resident(id=index, tier=1, ob_months_completed=1) for index in range(8)],
+        requests=[],
+        time_off=[],
+    )
+    options = SolverOptions(time_limit_seconds=6, rolling_window_days=35, rolling_step_days=28, capture_log=True)
+
+    result = generate_rolling_schedule(payload, options)
+
+    summary = summarize_search_log(result.search_log)
+    assert [run["label"] for run in summary["runs"]] == [
+        f"{window['start_date']}..{window['end_date']}" for window in result.stats["windows"]
+    ]
+    for run, window in zip(summary["runs"], result.stats["windows"]):
+        assert run["status"] == window["status"]
+        assert run["objective"][-1][1] == window["objective"]
+    assert generate_rolling_schedule(payload, replace(options, capture_log=False)).search_log is None
+
+
+def test_model_fixes_blocked_cells_in_variable_domains():
+    residents = _roster(4) + [Resident(id=5, tier=0, ob_months_completed=0)]
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 1),
+        end_date=date(2024, 2, 10),
+        residents=residents,
+        requests=[],
+        time_off=[
+            TimeOff(resident_id=2, start_date=date(2024, 1, 30), end_date=date(2024, 2, 2), block_type=ShiftType.BT_DAY)
+        ],
+    )
+    built = build_model(payload, SolverOptions())
+    restricted = {entry.date for entry in built.calendar if entry.tier0_restricted}
+    assert restricted
+
+    def fixed(resident_id, day, shift):
+        return list(built.assign[(resident_id, day, shift)].Proto().domain) == [0, 0]
+
+    assert len(built.assign) == 5 * 10 * 5
+    assert all(fixed(2, date(2024, 2, day), shift) for day in (1, 2) for shift in SHIFT_TYPES)
+    assert not fixed(2, date(2024, 2, 3), ShiftType.OB_OC)
+    assert all(fixed(5, day, ShiftType.OB_OC) and fixed(5, day, ShiftType.OB_POSTCALL) for day in restricted)
+    assert all(fixed(resident.id, date(2024, 2, 10), ShiftType.OB_L3) for resident in residents)
+    assert [(item.resident_id, item.date) for item in built.fixed_assignments] == [
+        (2, date(2024, 2, 1)),
+        (2, date(2024, 2, 2)),
+    ]
+
+
+def test_assignment_table_round_trips_and_materialises_rows():
+    rows = [
+        Assignment(resident_id=2, date=date(2024, 2, 2), shift_type=ShiftType.OB_OC),
+        Assignment(resident_id=1, date=date(2024, 2, 2), shift_type=ShiftType.BT_DAY),
+        Assignment(resident_id=1, date=date(2024, 2, 1), shift_type=ShiftType.OB_L3),
+    ]
+    table = AssignmentTable(rows)
+
+    assert list(table) == rows
+    assert table[-1] == rows[-1]
+    assert table[1:] == AssignmentTable(rows[1:])
+    assert AssignmentTable.from_json(json.loads(json.dumps(table.to_json()))) == table
+    assert list(table.between(date(2024, 2, 2), date(2024, 2, 9))) == rows[:2]
+    days = [day for _, day, _ in table.rows()]
+    assert days[0] is days[1]
+    table.sort()
+    assert [(item.date.day, item.resident_id) for item in table] == [(1, 1), (2, 1), (2, 2)]
+    output = GenerationOutput(rows, [], {}, [])
+    assert isinstance(output.assignments, AssignmentTable) and len(output.assignments) == 3
+
+
+def test_recommended_edits_score_like_the_edited_schedule():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 5),
+        end_date=date(2024, 2, 25),
+        residents=_roster(8),
+        requests=[Request(3, RequestType.PREFER_CALL, date(2024, 2, 12), date(2024, 2, 14))],
+        time_off=[TimeOff(4, date(2024, 2, 13), date(2024, 2, 14), ShiftType.BT_DAY)],
+    )
+    assignments = generate_schedule(payload, SolverOptions(time_limit_seconds=5)).assignments
+    call = next(row for row in assignments if row.shift_type == ShiftType.OB_OC and row.date >= date(2024, 2, 10))
+
+    result = recommend_edits(payload, assignments, call.date, resident_id=call.resident_id)
+
+    cells = {(row.resident_id, row.date): row.shift_type for row in assignments}
+    for removed in result["unassigned"]:
+        del cells[(removed["resident_id"], removed["date"])]
+    assert result["candidates"] and not result["truncated"]
+    for candidate in result["candidates"]:
+        edited = dict(cells)
+        for edit in candidate["edits"]:
+            assert edited.pop((edit["resident_id"], edit["date"]), None) == edit["from_shift"]
+            if edit["to_shift"] is not None:
+                edited[(edit["resident_id"], edit["date"])] = edit["to_shift"]
+        table = AssignmentTable(Assignment(*key, shift) for key, shift in edited.items())
+        assert score_assignments(payload, table) == candidate["score"]
+        assert all(edit["resident_id"] != call.resident_id for edit in candidate["edits"])
+
+
+def test_recommended_edits_refill_the_l3_before_a_removed_call():
+    payload = ScheduleInput(
+        start_date=date(2024, 2, 5),
+        end_date=date(2024, 2, 25),
+        residents=_roster(8),
+        requests=[],
+        time_off=[],
+    )
+    assignments = generate_schedule(payload, SolverOptions(time_limit_seconds=5)).assignments
+    cells = {(row.resident_id, row.date): row.shift_type for row in assignments}
+    call = next(
+        row
+        for row in assignments
+        if row.shift_type == ShiftType.OB_OC
+        and cells.get((row.resident_id, row.date - timedelta(days=1))) == ShiftType.OB_L3
+    )
+    eve = call.date - timedelta(days=1)
+
+    result = recommend_edits(payload, assignments, call.date, resident_id=call.resident_id)
+
+    assert result["shift_type"] == ShiftType.OB_OC
+    assert {"resident_id": call.resident_id, "date": eve, "shift_type": ShiftType.OB_L3} in result["unassigned"]
+    assert result["candidates"]
+    for candidate in result["candidates"]:
+        assert any(edit["date"] == eve and edit["to_shift"] == ShiftType.OB_L3 for edit in candidate["edits"])
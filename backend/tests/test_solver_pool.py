@@ -0,0 +1,76 @@
+import os
+import threading
+import time
+
+import pytest
+
+from app import main
+from app.solver_pool import SolverPool, SolverPoolBusy, SolverWorkerError
+
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = SolverPool(1, max_rss_mb=0)
+    yield pool
+    pool.shutdown()
+
+
+def test_pool_returns_results_and_reraises_solve_errors(pool):
+    assert pool.run(divmod, 7, 2, timeout=30) == (3, 1)
+    with pytest.raises(ValueError):
+        pool.run(int, "not a number", timeout=30)
+    assert pool.replaced == 0
+
+
+def test_pool_replaces_dead_and_overdue_workers(pool):
+    with pytest.raises(SolverWorkerError, match="exited with code 3"):
+        pool.run(os._exit, 3, timeout=30)
+    started = time.monotonic()
+    with pytest.raises(SolverWorkerError, match="did not finish"):
+        pool.run(time.sleep, 30, timeout=1)
+    assert time.monotonic() - started < 10
+    assert pool.replaced == 2
+    assert pool.run(divmod, 9, 4, timeout=30) == (2, 1)
+
+
+def test_pool_gives_up_waiting_for_a_busy_worker(pool):
+    running = threading.Thread(target=pool.run, args=(time.sleep, 2), kwargs={"timeout": 30})
+    running.start()
+    while pool._idle:
+        time.sleep(0.01)
+    started = time.monotonic()
+    with pytest.raises(SolverPoolBusy, match="within 0.5 s"):
+        pool.run(divmod, 7, 2, timeout=0.5)
+    assert time.monotonic() - started < 1.5
+    running.join(timeout=30)
+    assert pool.run(divmod, 7, 2, timeout=30) == (3, 1)
+
+
+def test_lost_solve_returns_503_without_an_empty_version(client, monkeypatch):
+    class LostPool:
+        def run(self, function, *args, timeout):
+            raise SolverWorkerError("Solver worker exited with code -9")
+
+    monkeypatch.setattr(main, "get_solver_pool", lambda: LostPool())
+    client.post("/residents", json={"name": "R0", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    response = client.post(f"/periods/{period_id}/generate")
+    assert response.status_code == 503
+    assert response.json()["detail"] == "Solver worker exited with code -9"
+    assert client.get(f"/periods/{period_id}/versions").json() == []
+
+
+def test_saturated_pool_returns_503_with_retry_after(client, monkeypatch):
+    class BusyPool:
+        def run(self, function, *args, timeout):
+            raise SolverPoolBusy(f"No solver worker became free within {timeout:g} s")
+
+    monkeypatch.setattr(main, "get_solver_pool", lambda: BusyPool())
+    client.post("/residents", json={"name": "R0", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    response = client.post(f"/periods/{period_id}/generate")
+    assert response.status_code == 503
+    assert int(response.headers["Retry-After"]) > 0
+    assert client.get(f"/periods/{period_id}/versions").json() == []
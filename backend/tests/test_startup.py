@@ -0,0 +1,77 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from app import models  # noqa: F401
+from app.database import Base
+from app.migrations import LEGACY_REVISION, current_revision, head_revision, upgrade_to_head
+from app.query_counter import count_engine_queries
+
+BACKEND = Path(__file__).resolve().parents[1]
+
+COLD_START = """
+import json, os, sys, time
+started = time.perf_counter()
+{imports}
+print(json.dumps({{
+    "seconds": time.perf_counter() - started,
+    "rss_mb": int(open("/proc/self/statm").read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20,
+    "loaded": [name for name in ("ortools", "celery", "pandas") if name in sys.modules],
+}}))
+"""
+
+
+def _cold_start(imports: str) -> dict:
+    env = dict(os.environ, SKIP_DB_INIT="1", PYTHONPATH=os.pathsep.join([str(BACKEND), str(BACKEND.parent)]))
+    completed = subprocess.run(
+        [sys.executable, "-c", COLD_START.format(imports=imports)],
+        cwd=BACKEND,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(completed.stdout.splitlines()[-1])
+
+
+@pytest.mark.skipif(not Path("/proc/self/statm").exists(), reason="reads RSS from /proc")
+def test_api_cold_start_loads_neither_solver_nor_celery():
+    api = _cold_start("import app.main")
+    # What every web worker used to import.
+    eager = _cold_start("import app.main, app.tasks")
+
+    assert api["loaded"] == []
+    assert {"ortools", "celery"} <= set(eager["loaded"])
+    assert api["rss_mb"] < eager["rss_mb"] - 25, (api, eager)
+    assert api["seconds"] < eager["seconds"], (api, eager)
+
+
+def _baseline_schema(engine) -> None:
+    # What the old startup create_all built before solver stats and logs existed.
+    tables = [table for table in Base.metadata.sorted_tables if table.name != "solver_logs"]
+    Base.metadata.create_all(engine, tables=tables)
+    with engine.begin() as connection:
+        connection.execute(text("ALTER TABLE schedule_versions DROP COLUMN solver_stats"))
+
+
+@pytest.mark.parametrize("build", [_baseline_schema, Base.metadata.create_all], ids=["baseline", "current-models"])
+def test_schema_upgrade_stamps_legacy_databases_and_is_cheap_at_head(tmp_path, build):
+    engine = create_engine(f"sqlite:///{tmp_path / 'legacy.db'}")
+    # No alembic_version table, as the old startup left it.
+    build(engine)
+
+    assert upgrade_to_head(engine) == LEGACY_REVISION
+    with engine.connect() as connection:
+        assert current_revision(connection) == head_revision()
+        inspector = inspect(connection)
+        assert inspector.has_table("solver_logs")
+        assert "solver_stats" in {column["name"] for column in inspector.get_columns("schedule_versions")}
+    with count_engine_queries(engine) as counter:
+        assert upgrade_to_head(engine) is None
+    # One table lookup and one SELECT: cheap enough for every replica's startup.
+    assert counter.count <= 2, counter.statements
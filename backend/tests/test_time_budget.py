@@ -0,0 +1,41 @@
+from app.config import Settings
+from app.time_budget import estimate_time_limit, needed_seconds
+
+
+def _features(residents, days=29):
+    return {"residents": residents, "days": days, "requests": residents, "time_off_density": 0.05}
+
+
+def test_time_limit_follows_similar_past_solves():
+    settings = Settings(
+        SOLVER_TIME_LIMIT_SECONDS=10, SOLVER_MIN_TIME_LIMIT_SECONDS=1, SOLVER_MAX_TIME_LIMIT_SECONDS=60
+    )
+    small = [(_features(8), 0.2)] * 5
+    large = [(_features(40, 92), 30.0)] * 5
+
+    assert estimate_time_limit(_features(8), small[:4], settings) == {
+        "time_limit": 10,
+        "source": "default",
+        "neighbours": 0,
+    }
+    assert estimate_time_limit(_features(8), small + large, settings)["time_limit"] == 1
+    assert estimate_time_limit(_features(40, 92), small + large, settings)["time_limit"] == 45
+    assert estimate_time_limit(_features(40, 92), [(_features(40, 92), 50.0)] * 5, settings)["time_limit"] == 60
+
+
+def test_time_limited_solves_count_as_needing_more_time():
+    assert needed_seconds({"stop_reason": "optimal", "last_solution_time": 0.4, "time_limit": 10}) == 0.4
+    assert needed_seconds({"stop_reason": "time_limit", "last_solution_time": 9.0, "time_limit": 10}) == 20
+
+
+def test_generation_records_budget_and_stop_reason(client):
+    for index in range(6):
+        client.post("/residents", json={"name": f"R{index}", "tier": 1, "ob_months_completed": 1})
+    period_id = client.post("/periods/monthly", json={"year": 2024, "month": 2}).json()["id"]
+
+    stats = client.post(f"/periods/{period_id}/generate").json()["version"]["solver_stats"]
+
+    assert stats["budget"]["source"] == "default"
+    assert stats["budget"]["features"]["residents"] == 6
+    assert stats["stop_reason"] in {"optimal", "gap", "plateau", "time_limit"}
+    assert stats["last_solution_time"] is not None
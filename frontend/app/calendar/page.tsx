@@ -53,6 +53,7 @@ export default function CalendarPage() {
   const [jobId, setJobId] = useState<string | null>(null);
   const [jobStatus, setJobStatus] = useState<string>("");
   const [jobResult, setJobResult] = useState<string>("");
+  const [isPreview, setIsPreview] = useState(false);
   const [editingAssignmentId, setEditingAssignmentId] = useState<number | null>(null);
   const [editResidentId, setEditResidentId] = useState<string>("");
   const [editDate, setEditDate] = useState<string>("");
@@ -118,6 +119,7 @@ export default function CalendarPage() {
       ]);
       if (assignmentsResponse.ok) {
         setAssignments(await assignmentsResponse.json());
+        setIsPreview(false);
       }
       if (alertsResponse.ok) {
         setAlerts(await alertsResponse.json());
@@ -250,6 +252,19 @@ export default function CalendarPage() {
     const payload = await response.json();
     setJobId(payload.job_id);
     setStatus(`Generation started (job ${payload.job_id}).`);
+    const previewResponse = await fetch(`${API_BASE_URL}/periods/${selectedPeriodId}/preview`);
+    if (previewResponse.ok) {
+      const preview = await previewResponse.json();
+      // Preview rows are not saved, so they get placeholder ids and cannot be edited.
+      setAssignments(
+        preview.assignments.map((assignment: Omit<Assignment, "id">, index: number) => ({
+          ...assignment,
+          id: -(index + 1),
+        }))
+      );
+      setAlerts(preview.alerts);
+      setIsPreview(true);
+    }
   };
 
   const residentLookup = new Map(residents.map((resident) => [resident.id, resident.name]));
@@ -399,6 +414,11 @@ export default function CalendarPage() {
       {!assignments.length ? (
         <p>No assignments available.</p>
       ) : null}
+      {isPreview ? (
+        <p style={{ color: "#b54708" }}>
+          Provisional preview — the solver is still working on the final draft.
+        </p>
+      ) : null}
       {viewMode === "date" && assignments.length ? (
         <section style={{ display: "grid", gap: "1rem" }}>
           {dates.map((date) => {
@@ -449,7 +469,11 @@ export default function CalendarPage() {
                           <td>{getResidentName(assignment.resident_id)}</td>
                           <td>{assignment.shift_type}</td>
                           <td>
-                            <button type="button" onClick={() => startEditing(assignment)}>
+                            <button
+                              type="button"
+                              onClick={() => startEditing(assignment)}
+                              disabled={isPreview}
+                            >
                               Edit
                             </button>
                           </td>
@@ -497,7 +521,7 @@ export default function CalendarPage() {
                           <td>{formatDateWithDay(assignment.date)}</td>
                           <td>{assignment.shift_type}</td>
                           <td>
-                            <button type="button" onClick={() => startEditing(assignment)}>
+                            <button type="button" onClick={() => startEditing(assignment)} disabled={isPreview}>
                               Edit
                             </button>
                           </td>
@@ -545,7 +569,7 @@ export default function CalendarPage() {
                           <td>{formatDateWithDay(assignment.date)}</td>
                           <td>{getResidentName(assignment.resident_id)}</td>
                           <td>
-                            <button type="button" onClick={() => startEditing(assignment)}>
+                            <button type="button" onClick={() => startEditing(assignment)} disabled={isPreview}>
                               Edit
                             </button>
                           </td>
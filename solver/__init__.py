@@ -1,3 +1,17 @@
-from .solver import generate_schedule
+from importlib import import_module
 
-__all__ = ["generate_schedule"]
+# Resolved on first access so that light submodules (solver.calendar,
+# solver.timing, solver.search_log) can be imported without ortools.
+_EXPORTS = {
+    "SolverOptions": ".solver",
+    "generate_rolling_schedule": ".horizon",
+    "generate_schedule": ".solver",
+}
+
+__all__ = ["SolverOptions", "generate_rolling_schedule", "generate_schedule"]
+
+
+def __getattr__(name: str):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return getattr(import_module(_EXPORTS[name], __name__), name)
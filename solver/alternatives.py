@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import math
+
+from ortools.sat.python import cp_model
+
+from .scoring import score_assignments
+from .solver import (
+    GenerationOutput,
+    ScheduleInput,
+    ShiftType,
+    SolverOptions,
+    _new_solver,
+    _SolutionCounter,
+    _solver_stats,
+    build_model,
+    extract_output,
+    generate_schedule,
+)
+
+CALL_SHIFTS = {ShiftType.OB_OC, ShiftType.OB_L3, ShiftType.OB_L4}
+
+
+def generate_alternatives(
+    payload: ScheduleInput,
+    count: int,
+    min_distance: int | None = None,
+    options: SolverOptions | None = None,
+) -> list[GenerationOutput]:
+    """Find up to ``count`` good schedules that differ pairwise in call shifts.
+
+    After each solve a no-good constraint requires the next schedule to differ
+    from every earlier one in at least ``min_distance`` resident-day call
+    cells (default: 10% of the first schedule's call shifts, at least 2). The
+    time limit is split evenly across the solves. Each output's stats carry
+    its objective breakdown and its distances to every alternative.
+    """
+    options = options or SolverOptions()
+    if not payload.residents:
+        # Nothing to vary: the one (empty) schedule, with the stats every alternative carries.
+        output = generate_schedule(payload, options)
+        output.stats.update(
+            alternative=0,
+            score=score_assignments(payload, output.assignments),
+            min_distance=min_distance,
+            distances=[0],
+        )
+        return [output]
+
+    built = build_model(payload, options)
+    model = built.model
+    model.Minimize(built.weighted_objective)
+    call_vars = [variable for (_, _, shift), variable in built.assign.items() if shift in CALL_SHIFTS]
+    time_limit = options.time_limit_seconds / count
+
+    outputs: list[GenerationOutput] = []
+    patterns: list[list[int]] = []
+    for index in range(count):
+        counter = _SolutionCounter()
+        solver = _new_solver(options, time_limit)
+        status = solver.Solve(model, counter)
+        if status not in {cp_model.OPTIMAL, cp_model.FEASIBLE}:
+            break
+
+        output = extract_output(built, solver, payload)
+        output.stats = _solver_stats(model, solver, status, counter, len(built.residents), len(built.calendar))
+        output.stats.update(
+            alternative=index,
+            time_limit=time_limit,
+            num_workers=options.num_workers,
+            score=score_assignments(payload, output.assignments),
+        )
+        pattern = [solver.Value(variable) for variable in call_vars]
+        if min_distance is None:
+            min_distance = max(2, math.ceil(0.1 * sum(pattern)))
+        model.Add(
+            sum(variable if value == 0 else 1 - variable for variable, value in zip(call_vars, pattern))
+            >= min_distance
+        )
+        outputs.append(output)
+        patterns.append(pattern)
+
+    for output, pattern in zip(outputs, patterns):
+        output.stats["min_distance"] = min_distance
+        output.stats["distances"] = [
+            sum(first != second for first, second in zip(pattern, other)) for other in patterns
+        ]
+    return outputs
@@ -0,0 +1,158 @@
+"""Compare rolling-horizon and monolithic solves on synthetic rosters.
+
+    python -m solver.benchmark --months 3 --residents 16 --time-limit 60
+    python -m solver.benchmark --build-scaling
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+from dataclasses import replace
+from datetime import date, timedelta
+
+from .horizon import generate_rolling_schedule
+from .scoring import score_assignments
+from .solver import (
+    Request,
+    RequestType,
+    Resident,
+    ScheduleInput,
+    ShiftType,
+    SolverOptions,
+    TimeOff,
+    build_model,
+    generate_schedule,
+)
+
+BUILD_RESIDENTS = (20, 40, 80)
+BUILD_DAYS = (28, 91, 182, 365)
+
+
+def synthetic_instance(residents: int, start_date: date, end_date: date, seed: int = 0) -> ScheduleInput:
+    rng = random.Random(seed)
+    roster = [
+        Resident(id=index + 1, tier=index % 4, ob_months_completed=0 if index % 4 == 0 else 1 + index % 3)
+        for index in range(residents)
+    ]
+    span = (end_date - start_date).days
+    requests = []
+    for resident in roster:
+        offset = rng.randrange(max(1, span - 2))
+        request_start = start_date + timedelta(days=offset)
+        requests.append(
+            Request(
+                resident_id=resident.id,
+                request_type=rng.choice([RequestType.PREFER_CALL, RequestType.AVOID_CALL]),
+                start_date=request_start,
+                end_date=request_start + timedelta(days=2),
+            )
+        )
+    return ScheduleInput(start_date=start_date, end_date=end_date, residents=roster, requests=requests, time_off=[])
+
+
+def compare_with_monolithic(payload: ScheduleInput, options: SolverOptions) -> dict:
+    """Run both strategies with the same total time limit and report the gap.
+
+    ``gap_vs_bound`` measures the rolling schedule against the monolithic
+    model's proven lower bound, so it is a true optimality gap.
+    """
+    rolling = generate_rolling_schedule(payload, options)
+    monolithic = generate_schedule(payload, replace(options, rolling_window_days=0))
+    rolling_objective = score_assignments(payload, rolling.assignments)["objective"]
+    monolithic_objective = monolithic.stats.get("objective")
+    bound = monolithic.stats.get("best_bound")
+
+    def gap(reference):
+        if reference is None:
+            return None
+        return (rolling_objective - reference) / max(1.0, abs(rolling_objective))
+
+    return {
+        "days": (payload.end_date - payload.start_date).days + 1,
+        "residents": len(payload.residents),
+        "rolling": {
+            "status": rolling.stats["status"],
+            "objective": rolling_objective,
+            "wall_time": rolling.stats.get("wall_time"),
+            "max_variables": rolling.stats["model"]["variables"],
+        },
+        "monolithic": {
+            "status": monolithic.stats["status"],
+            "objective": monolithic_objective,
+            "best_bound": bound,
+            "wall_time": monolithic.stats.get("wall_time"),
+            "variables": monolithic.stats.get("model", {}).get("variables"),
+        },
+        "gap_vs_monolithic": gap(monolithic_objective),
+        "gap_vs_bound": gap(bound),
+    }
+
+
+def build_scaling(start_date: date, residents: tuple[int, ...], days: tuple[int, ...], seed: int = 0) -> list[dict]:
+    """Time ``build_model`` alone over a grid of roster sizes and horizons.
+
+    Every resident gets a few five-day time-off blocks so the time-off rules
+    are part of what is measured.
+    """
+    rows = []
+    for resident_count in residents:
+        for day_count in days:
+            end_date = start_date + timedelta(days=day_count - 1)
+            payload = synthetic_instance(resident_count, start_date, end_date, seed)
+            rng = random.Random(seed)
+            time_off = []
+            for resident in payload.residents:
+                for _ in range(max(1, day_count // 90)):
+                    block_start = start_date + timedelta(days=rng.randrange(day_count))
+                    time_off.append(
+                        TimeOff(resident.id, block_start, block_start + timedelta(days=4), ShiftType.BT_DAY)
+                    )
+            payload = replace(payload, time_off=time_off)
+            started = time.perf_counter()
+            built = build_model(payload, SolverOptions())
+            proto = built.model.Proto()
+            rows.append(
+                {
+                    "residents": resident_count,
+                    "days": day_count,
+                    "variables": len(proto.variables),
+                    "constraints": len(proto.constraints),
+                    "build_seconds": round(time.perf_counter() - started, 4),
+                }
+            )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--start", type=date.fromisoformat, default=date(2024, 7, 1))
+    parser.add_argument("--months", type=int, default=3)
+    parser.add_argument("--residents", type=int, default=16)
+    parser.add_argument("--time-limit", type=float, default=60.0)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--window", type=int, default=35)
+    parser.add_argument("--step", type=int, default=28)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--build-scaling", action="store_true", help="time model construction only")
+    args = parser.parse_args(argv)
+
+    if args.build_scaling:
+        print(json.dumps(build_scaling(args.start, BUILD_RESIDENTS, BUILD_DAYS, args.seed), indent=2))
+        return
+
+    end_date = args.start + timedelta(days=round(args.months * 30.4) - 1)
+    payload = synthetic_instance(args.residents, args.start, end_date, args.seed)
+    options = SolverOptions(
+        time_limit_seconds=args.time_limit,
+        num_workers=args.workers,
+        rolling_window_days=args.window,
+        rolling_step_days=args.step,
+    )
+    print(json.dumps(compare_with_monolithic(payload, options), indent=2))
+
+
+if __name__ == "__main__":
+    main()
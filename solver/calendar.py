@@ -0,0 +1,103 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import date, timedelta
+from enum import Enum
+from types import MappingProxyType
+from typing import Iterable, Mapping
+
+
+class DayClass(str, Enum):
+    WEEKDAY = "weekday"
+    FRIDAY = "friday"
+    WEEKEND_OR_HOLIDAY = "weekend_or_holiday"
+
+
+DEFAULT_COVERAGE = {
+    DayClass.WEEKDAY: {"ob_oc": 2, "ob_l4": 0, "ob_l3": 1, "ob_day_min": 2, "ob_day_max": 4},
+    DayClass.FRIDAY: {"ob_oc": 2, "ob_l4": 1, "ob_l3": 0, "ob_day_min": 2, "ob_day_max": 4},
+    DayClass.WEEKEND_OR_HOLIDAY: {"ob_oc": 2, "ob_l4": 1, "ob_l3": 0, "ob_day_min": 0, "ob_day_max": 0},
+}
+
+DEFAULT_TIER0_RESTRICTED_DAYS = [1, 2, 3]
+
+
+@dataclass(frozen=True)
+class CalendarDay:
+    date: date
+    day_class: DayClass
+    # Read-only: cached day tables hand the same entries to every caller.
+    coverage: Mapping[str, int]
+    holiday_name: str | None = None
+    tier0_restricted: bool = False
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.coverage, MappingProxyType):
+            object.__setattr__(self, "coverage", MappingProxyType(dict(self.coverage)))
+
+    def __reduce__(self):
+        # Mapping proxies do not pickle; solver processes and Celery receive a plain dict.
+        return (
+            CalendarDay,
+            (self.date, self.day_class, dict(self.coverage), self.holiday_name, self.tier0_restricted),
+        )
+
+    @property
+    def is_weekend(self) -> bool:
+        return self.date.weekday() >= 5
+
+    @property
+    def is_holiday(self) -> bool:
+        return self.holiday_name is not None
+
+
+def classify_day(day: date, holidays: Mapping[date, str] | set[date]) -> DayClass:
+    if day.weekday() >= 5 or day in holidays:
+        return DayClass.WEEKEND_OR_HOLIDAY
+    if day.weekday() == 4:
+        return DayClass.FRIDAY
+    return DayClass.WEEKDAY
+
+
+def build_day_table(
+    start_date: date,
+    end_date: date,
+    holidays: Mapping[date, str] | Iterable[date] | None,
+    constraints: dict,
+) -> list[CalendarDay]:
+    """Classify every day in ``[start_date, end_date]`` once.
+
+    ``holidays`` are hospital holidays, either as a ``date -> name`` mapping or
+    a plain iterable of dates (the solver only carries dates).
+    """
+    if holidays is None:
+        holiday_names: dict[date, str] = {}
+    elif isinstance(holidays, Mapping):
+        holiday_names = dict(holidays)
+    else:
+        holiday_names = {holiday: "Holiday" for holiday in holidays}
+
+    coverage = constraints.get("coverage", {})
+    requirements = {
+        day_class: MappingProxyType(dict(coverage.get(day_class.value, default)))
+        for day_class, default in DEFAULT_COVERAGE.items()
+    }
+    restricted_days = set(
+        (constraints.get("tier0_call_prohibition") or {}).get("days", DEFAULT_TIER0_RESTRICTED_DAYS)
+    )
+
+    table: list[CalendarDay] = []
+    current = start_date
+    while current <= end_date:
+        day_class = classify_day(current, holiday_names)
+        table.append(
+            CalendarDay(
+                date=current,
+                day_class=day_class,
+                coverage=requirements[day_class],
+                holiday_name=holiday_names.get(current),
+                tier0_restricted=current.day in restricted_days,
+            )
+        )
+        current += timedelta(days=1)
+    return table
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from datetime import date, timedelta
+
+from ortools.sat.python import cp_model
+
+from .calendar import CalendarDay, build_day_table
+from .solver import DEFAULT_CONSTRAINTS, SHIFT_TYPES, ScheduleInput, ShiftType, SolverOptions
+
+COVERAGE_SHIFTS = {
+    "ob_oc": ShiftType.OB_OC,
+    "ob_l3": ShiftType.OB_L3,
+    "ob_l4": ShiftType.OB_L4,
+    "ob_day_min": ShiftType.OB_DAY,
+}
+TIER0_BLOCKED = [ShiftType.OB_L3, ShiftType.OB_OC, ShiftType.OB_L4, ShiftType.OB_POSTCALL]
+
+
+@dataclass
+class _Rule:
+    literal: cp_model.IntVar
+    diagnostic: dict
+
+
+def _clusters(days: list[date]) -> list[list[date]]:
+    clusters: list[list[date]] = []
+    for day in sorted(set(days)):
+        if clusters and day - clusters[-1][-1] <= timedelta(days=1):
+            clusters[-1].append(day)
+        else:
+            clusters.append([day])
+    return clusters
+
+
+def _build_window(payload: ScheduleInput, window: list[CalendarDay], targets: set[date], last_day: date):
+    """Feasibility model of ``window`` with every named rule behind a literal.
+
+    Rules outside the window, the objective and coverage of non-target days
+    are dropped, so the model is a relaxation: a conflict here is a conflict
+    in the full model too.
+    """
+    model = cp_model.CpModel()
+    days = [entry.date for entry in window]
+    residents = payload.residents
+    assign = {
+        (resident.id, day, shift): model.NewBoolVar(f"assign_{resident.id}_{day.isoformat()}_{shift.value}")
+        for resident in residents
+        for day in days
+        for shift in SHIFT_TYPES
+    }
+    rules: list[_Rule] = []
+
+    def rule(diagnostic: dict) -> cp_model.IntVar:
+        literal = model.NewBoolVar(f"rule_{len(rules)}")
+        rules.append(_Rule(literal, diagnostic))
+        return literal
+
+    # Structural constraints stay hard, as in generate_schedule.
+    for resident in residents:
+        for index, day in enumerate(days):
+            model.Add(sum(assign[(resident.id, day, shift)] for shift in SHIFT_TYPES) <= 1)
+            if index + 1 < len(days):
+                next_day = days[index + 1]
+                model.Add(
+                    assign[(resident.id, day, ShiftType.OB_L3)] <= assign[(resident.id, next_day, ShiftType.OB_OC)]
+                )
+                model.Add(
+                    assign[(resident.id, next_day, ShiftType.OB_POSTCALL)]
+                    == assign[(resident.id, day, ShiftType.OB_OC)] + assign[(resident.id, day, ShiftType.OB_L4)]
+                )
+    if days and days[-1] == last_day:
+        # OB_L3 needs an OB_OC the next day, which falls outside the period.
+        literal = rule({"kind": "period_end", "date": last_day.isoformat(), "shift": ShiftType.OB_L3.value})
+        for resident in residents:
+            model.Add(assign[(resident.id, last_day, ShiftType.OB_L3)] == 0).OnlyEnforceIf(literal)
+    for entry in window:
+        for key, shift in COVERAGE_SHIFTS.items():
+            model.Add(sum(assign[(resident.id, entry.date, shift)] for resident in residents) <= entry.coverage[key])
+
+    for resident in residents:
+        restricted = []
+        if resident.ob_months_completed == 0:
+            restricted = [entry.date for entry in window if entry.tier0_restricted]
+        if restricted:
+            literal = rule(
+                {
+                    "kind": "tier0_rule",
+                    "resident_id": resident.id,
+                    "dates": [day.isoformat() for day in restricted],
+                }
+            )
+            for day in restricted:
+                for shift in TIER0_BLOCKED:
+                    model.Add(assign[(resident.id, day, shift)] == 0).OnlyEnforceIf(literal)
+
+        for block in payload.time_off:
+            if block.resident_id != resident.id:
+                continue
+            # generate_schedule ignores time off on a tier-0 resident's restricted days.
+            blocked = [day for day in days if block.start_date <= day <= block.end_date and day not in restricted]
+            if not blocked:
+                continue
+            literal = rule(
+                {
+                    "kind": "time_off",
+                    "resident_id": resident.id,
+                    "start_date": block.start_date.isoformat(),
+                    "end_date": block.end_date.isoformat(),
+                    "block_type": block.block_type.value,
+                }
+            )
+            for day in blocked:
+                for shift in SHIFT_TYPES:
+                    model.Add(assign[(resident.id, day, shift)] == 0).OnlyEnforceIf(literal)
+
+    for entry in window:
+        if entry.date not in targets:
+            continue
+        for key, shift in COVERAGE_SHIFTS.items():
+            required = entry.coverage[key]
+            if not required:
+                continue
+            literal = rule(
+                {
+                    "kind": "coverage",
+                    "date": entry.date.isoformat(),
+                    "day_class": entry.day_class.value,
+                    "shift": shift.value,
+                    "required": required,
+                }
+            )
+            staffed = sum(assign[(resident.id, entry.date, shift)] for resident in residents)
+            model.Add(staffed >= required).OnlyEnforceIf(literal)
+    return model, rules
+
+
+def _infeasible(model: cp_model.CpModel, literals: list[cp_model.IntVar], time_limit: float) -> tuple[bool, list[int]]:
+    model.ClearAssumptions()
+    model.AddAssumptions(literals)
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    # Cores of assumptions are only reported by the single-worker search.
+    solver.parameters.num_workers = 1
+    status = solver.Solve(model)
+    if status == cp_model.INFEASIBLE:
+        return True, list(solver.SufficientAssumptionsForInfeasibility())
+    return False, []
+
+
+def _minimal_core(
+    model: cp_model.CpModel,
+    literals: list[cp_model.IntVar],
+    active: list[int],
+    core_indices: list[int],
+    check_limit: float,
+    deadline: float,
+) -> tuple[list[int], int]:
+    """Shrink a sufficient core to a minimal one; returns (core, solves).
+
+    Past ``deadline`` the core is returned as it stands: still a conflict, maybe not minimal.
+    """
+    by_index = {literals[position].Index(): position for position in active}
+    core = [by_index[index] for index in core_indices if index in by_index] or list(active)
+    checks = 0
+    position = 0
+    while position < len(core):
+        remaining = deadline - time.perf_counter()
+        if remaining <= 0:
+            break
+        trial = core[:position] + core[position + 1 :]
+        still_infeasible, _ = _infeasible(model, [literals[index] for index in trial], min(check_limit, remaining))
+        checks += 1
+        if still_infeasible:
+            core = trial
+        else:
+            position += 1
+    return core, checks
+
+
+def explain_understaffing(
+    payload: ScheduleInput,
+    understaffed_days: list[date],
+    options: SolverOptions | None = None,
+) -> list[dict]:
+    """Name the rules that force understaffing on the given days.
+
+    Days are analysed in clusters of consecutive dates, each in a window
+    padded by one day. CP-SAT's sufficient assumptions give a first core,
+    which a deletion filter shrinks to a minimal conflict. The conflict's
+    coverage rules are then relaxed and the search repeats, so a cluster
+    yields disjoint conflicts that each force at least one shortfall. A
+    cluster with no conflict is reported as ``forced: False``: the solver
+    understaffed it to improve the objective elsewhere.
+
+    ``options.time_limit_seconds`` bounds the whole analysis. Clusters it cuts
+    short, or never reaches, are reported with ``truncated: True``.
+    """
+    options = options or SolverOptions()
+    constraints = payload.constraints or DEFAULT_CONSTRAINTS
+    calendar = payload.calendar or build_day_table(payload.start_date, payload.end_date, payload.holidays, constraints)
+    index_of = {entry.date: index for index, entry in enumerate(calendar)}
+    last_day = calendar[-1].date if calendar else payload.end_date
+    check_limit = max(1.0, options.time_limit_seconds / 10)
+    deadline = time.perf_counter() + options.time_limit_seconds
+
+    explanations = []
+    for cluster in _clusters([day for day in understaffed_days if day in index_of]):
+        started = time.perf_counter()
+        truncated = False
+        first = max(0, index_of[cluster[0]] - 1)
+        last = min(len(calendar), index_of[cluster[-1]] + 2)
+        model, rules = _build_window(payload, calendar[first:last], set(cluster), last_day)
+        literals = [rule.literal for rule in rules]
+        active = list(range(len(rules)))
+        conflicts: list[list[dict]] = []
+        checks = 0
+        while True:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                truncated = True
+                break
+            infeasible, core_indices = _infeasible(
+                model, [literals[index] for index in active], min(check_limit, remaining)
+            )
+            checks += 1
+            if not infeasible:
+                # A check cut off by the deadline proves nothing either way.
+                truncated = time.perf_counter() >= deadline
+                break
+            core, solves = _minimal_core(model, literals, active, core_indices, check_limit, deadline)
+            checks += solves
+            conflicts.append([rules[index].diagnostic for index in core])
+            relaxed = {index for index in core if rules[index].diagnostic["kind"] == "coverage"} or set(core)
+            active = [index for index in active if index not in relaxed]
+        explanations.append(
+            {
+                "start_date": cluster[0].isoformat(),
+                "end_date": cluster[-1].isoformat(),
+                "forced": bool(conflicts),
+                "conflicts": conflicts,
+                "checks": checks,
+                "truncated": truncated,
+                "wall_time": time.perf_counter() - started,
+            }
+        )
+    return explanations
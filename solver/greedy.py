@@ -0,0 +1,191 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from datetime import date
+
+from .calendar import CalendarDay, build_day_table
+from .solver import (
+    DEFAULT_CONSTRAINTS,
+    AssignmentTable,
+    GenerationOutput,
+    HorizonBoundary,
+    ScheduleInput,
+    ShiftType,
+    _is_time_off,
+    _request_outcomes,
+    _scaled_target,
+)
+
+Schedule = dict[tuple[int, date], ShiftType]
+
+
+def greedy_assignments(
+    payload: ScheduleInput,
+    calendar: list[CalendarDay],
+    boundary: HorizonBoundary | None = None,
+) -> Schedule:
+    """Build a schedule day by day that satisfies every hard rule of the model.
+
+    Each day fills OB_OC and OB_L4 with the residents furthest below their
+    call target, then OB_L3 (reserving the next day's OB_OC), then OB_DAY.
+    Calls are only given to residents who can take the postcall day, so the
+    result is a feasible CP-SAT hint; coverage it cannot fill is left short.
+    """
+    constraints = payload.constraints or DEFAULT_CONSTRAINTS
+    days = [entry.date for entry in calendar]
+    count = len(days)
+    residents = payload.residents
+    schedule: Schedule = {}
+
+    restricted = {
+        (resident.id, index)
+        for resident in residents
+        if resident.ob_months_completed == 0
+        for index, entry in enumerate(calendar)
+        if entry.tier0_restricted
+    }
+    blocked = {
+        (resident.id, index)
+        for resident in residents
+        for index, day in enumerate(days)
+        if (resident.id, index) not in restricted and _is_time_off(day, resident.id, payload.time_off)
+    }
+
+    call_targets = constraints.get("call_targets", {})
+    scale = boundary.target_scale if boundary else 1.0
+    low_target = {}
+    high_target = {}
+    for resident in residents:
+        target = call_targets.get(f"tier{resident.tier}")
+        low_target[resident.id], high_target[resident.id] = (
+            _scaled_target(target, scale) if target else (0, count)
+        )
+    calls = Counter(boundary.call_counts if boundary else {})
+    weekend_calls = Counter(boundary.weekend_counts if boundary else {})
+    day_shifts: Counter = Counter()
+    last_call: dict[int, int] = {}
+
+    def free(resident_id: int, index: int) -> bool:
+        return (resident_id, days[index]) not in schedule and (resident_id, index) not in blocked
+
+    def can_call(resident_id: int, index: int) -> bool:
+        # A call needs the postcall day free of other shifts, time off and tier-0 limits.
+        if not free(resident_id, index) or (resident_id, index) in restricted:
+            return False
+        return index + 1 == count or (free(resident_id, index + 1) and (resident_id, index + 1) not in restricted)
+
+    def staffed(index: int, shift: ShiftType) -> int:
+        return sum(1 for resident in residents if schedule.get((resident.id, days[index])) == shift)
+
+    def give_call(resident_id: int, index: int, shift: ShiftType) -> None:
+        schedule[(resident_id, days[index])] = shift
+        if index + 1 < count:
+            schedule[(resident_id, days[index + 1])] = ShiftType.OB_POSTCALL
+        if shift == ShiftType.OB_OC:
+            calls[resident_id] += 1
+            weekend_calls[resident_id] += calendar[index].is_weekend
+            last_call[resident_id] = index
+
+    def call_order(index: int):
+        weekend = calendar[index].is_weekend
+
+        def key(resident):
+            return (
+                calls[resident.id] >= high_target[resident.id],
+                calls[resident.id] - low_target[resident.id],
+                weekend_calls[resident.id] if weekend else 0,
+                last_call.get(resident.id, -count),
+                resident.id,
+            )
+
+        return sorted(residents, key=key)
+
+    if boundary and count:
+        for resident_id in boundary.postcall:
+            schedule[(resident_id, days[0])] = ShiftType.OB_POSTCALL
+        for resident_id in boundary.must_call:
+            if free(resident_id, 0):
+                give_call(resident_id, 0, ShiftType.OB_OC)
+
+    for index, entry in enumerate(calendar):
+        requirements = entry.coverage
+        for shift, key in ((ShiftType.OB_OC, "ob_oc"), (ShiftType.OB_L4, "ob_l4")):
+            needed = requirements[key] - staffed(index, shift)
+            for resident in call_order(index):
+                if needed <= 0:
+                    break
+                if can_call(resident.id, index):
+                    give_call(resident.id, index, shift)
+                    needed -= 1
+
+        # OB_L3 commits the resident to OB_OC tomorrow, so tomorrow must have room.
+        needed = requirements["ob_l3"]
+        if index + 1 < count:
+            for resident in call_order(index + 1):
+                if needed <= 0 or staffed(index + 1, ShiftType.OB_OC) >= calendar[index + 1].coverage["ob_oc"]:
+                    break
+                takes_l3 = free(resident.id, index) and (resident.id, index) not in restricted
+                if takes_l3 and can_call(resident.id, index + 1):
+                    schedule[(resident.id, entry.date)] = ShiftType.OB_L3
+                    give_call(resident.id, index + 1, ShiftType.OB_OC)
+                    needed -= 1
+
+        needed = requirements["ob_day_min"]
+        for resident in sorted(residents, key=lambda resident: (day_shifts[resident.id], resident.id)):
+            if needed <= 0:
+                break
+            if free(resident.id, index):
+                schedule[(resident.id, entry.date)] = ShiftType.OB_DAY
+                day_shifts[resident.id] += 1
+                needed -= 1
+    return schedule
+
+
+def greedy_schedule(payload: ScheduleInput) -> GenerationOutput:
+    """Provisional schedule from the greedy heuristic, in solver output form."""
+    started = time.perf_counter()
+    constraints = payload.constraints or DEFAULT_CONSTRAINTS
+    calendar = payload.calendar or build_day_table(payload.start_date, payload.end_date, payload.holidays, constraints)
+    schedule = greedy_assignments(payload, calendar)
+    days = [entry.date for entry in calendar]
+
+    assignments = AssignmentTable()
+    for (resident_id, day), shift in schedule.items():
+        assignments.add(resident_id, day, shift)
+    for resident in payload.residents:
+        for entry in calendar:
+            time_off_type = _is_time_off(entry.date, resident.id, payload.time_off)
+            tier0_restricted = resident.ob_months_completed == 0 and entry.tier0_restricted
+            if time_off_type and not tier0_restricted:
+                assignments.add(resident.id, entry.date, time_off_type)
+    assignments.sort()
+
+    staffed = Counter((day, shift) for (_, day), shift in schedule.items())
+    alerts = []
+    for entry in calendar:
+        for shift, key in (
+            (ShiftType.OB_OC, "ob_oc"),
+            (ShiftType.OB_L3, "ob_l3"),
+            (ShiftType.OB_L4, "ob_l4"),
+            (ShiftType.OB_DAY, "ob_day_min"),
+        ):
+            if entry.coverage[key] and staffed[(entry.date, shift)] < entry.coverage[key]:
+                alerts.append(
+                    {"date": entry.date, "message": f"Understaffed {shift.value} coverage.", "severity": "HIGH"}
+                )
+
+    call_counts = {resident.id: 0 for resident in payload.residents}
+    weekend_counts = {resident.id: 0 for resident in payload.residents}
+    weekend_days = {entry.date for entry in calendar if entry.is_weekend}
+    for (resident_id, day), shift in schedule.items():
+        if shift == ShiftType.OB_OC:
+            call_counts[resident_id] += 1
+            weekend_counts[resident_id] += day in weekend_days
+    fairness = {
+        "ob_oc_counts": call_counts,
+        "weekend_ob_oc_spread": max(weekend_counts.values()) - min(weekend_counts.values()) if weekend_counts else 0,
+    }
+    stats = {"status": "PREVIEW", "wall_time": time.perf_counter() - started}
+    unmet_requests = _request_outcomes(payload.requests, days, assignments)
+    return GenerationOutput(assignments, alerts, fairness, unmet_requests, stats)
@@ -0,0 +1,175 @@
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import replace
+
+from .calendar import CalendarDay, build_day_table
+from .scoring import score_assignments
+from .solver import (
+    DEFAULT_CONSTRAINTS,
+    AssignmentTable,
+    GenerationOutput,
+    HorizonBoundary,
+    Request,
+    ScheduleInput,
+    ShiftType,
+    SolverOptions,
+    _request_outcomes,
+    assignment_rows,
+    generate_schedule,
+    overall_stop_reason,
+)
+
+SOLVED_STATUSES = {"OPTIMAL", "FEASIBLE"}
+
+
+def window_offsets(total_days: int, window_days: int, step_days: int) -> list[int]:
+    """Start index of every window; the last window ends on the last day."""
+    offsets = [0]
+    while offsets[-1] + window_days < total_days:
+        offsets.append(offsets[-1] + step_days)
+    return offsets
+
+
+def _advance(
+    state: HorizonBoundary,
+    committed: list[CalendarDay],
+    assignments: AssignmentTable,
+    requests: list[Request],
+) -> HorizonBoundary:
+    last_day = committed[-1].date
+    weekend_days = {entry.date for entry in committed if entry.is_weekend}
+    call_counts = Counter(state.call_counts)
+    weekend_counts = Counter(state.weekend_counts)
+    request_calls = Counter(state.request_calls)
+    postcall: set[int] = set()
+    must_call: set[int] = set()
+
+    for resident_id, day, shift in assignment_rows(assignments):
+        if shift == ShiftType.OB_OC:
+            call_counts[resident_id] += 1
+            if day in weekend_days:
+                weekend_counts[resident_id] += 1
+            for index, request in enumerate(requests):
+                if request.resident_id == resident_id and request.start_date <= day <= request.end_date:
+                    request_calls[index] += 1
+        if day == last_day:
+            if shift in {ShiftType.OB_OC, ShiftType.OB_L4}:
+                postcall.add(resident_id)
+            elif shift == ShiftType.OB_L3:
+                must_call.add(resident_id)
+
+    return HorizonBoundary(
+        postcall=frozenset(postcall),
+        must_call=frozenset(must_call),
+        call_counts=dict(call_counts),
+        weekend_counts=dict(weekend_counts),
+        request_calls=dict(request_calls),
+    )
+
+
+def generate_rolling_schedule(payload: ScheduleInput, options: SolverOptions | None = None) -> GenerationOutput:
+    """Solve a long horizon as overlapping windows.
+
+    Each window is solved with the state committed so far; only its first
+    ``rolling_step_days`` are kept (all of it for the last window). The time
+    limit is split evenly across the windows still to solve, so time a window
+    leaves unused by stopping early goes to the later ones. Horizons that fit
+    in one window are solved monolithically.
+    """
+    options = options or SolverOptions()
+    constraints = payload.constraints or DEFAULT_CONSTRAINTS
+    calendar = payload.calendar or build_day_table(
+        payload.start_date, payload.end_date, payload.holidays, constraints
+    )
+    window_days = options.rolling_window_days
+    step_days = max(1, min(options.rolling_step_days, window_days))
+    if not payload.residents or window_days <= 0 or len(calendar) <= window_days:
+        return generate_schedule(payload, options)
+
+    total_days = len(calendar)
+    offsets = window_offsets(total_days, window_days, step_days)
+    remaining_time = options.time_limit_seconds
+
+    state = HorizonBoundary()
+    assignments = AssignmentTable()
+    alerts: list[dict] = []
+    windows: list[dict] = []
+    logs: list[str] = []
+    phases: Counter = Counter()
+    status = "OPTIMAL"
+    for index, offset in enumerate(offsets):
+        window = calendar[offset : offset + window_days]
+        final = offset + window_days >= total_days
+        committed = window if final else window[:step_days]
+        boundary = replace(state, target_scale=1.0 if final else (offset + len(window)) / total_days)
+        window_payload = replace(payload, start_date=window[0].date, end_date=window[-1].date, calendar=window)
+
+        window_options = replace(options, time_limit_seconds=remaining_time / (len(offsets) - index))
+        result = generate_schedule(window_payload, window_options, boundary)
+        remaining_time = max(0.0, remaining_time - (result.stats.get("wall_time") or 0.0))
+        phases.update(result.stats.get("phases", {}))
+        if result.search_log:
+            logs.append(result.search_log)
+        windows.append(
+            {
+                "start_date": window[0].date.isoformat(),
+                "end_date": window[-1].date.isoformat(),
+                "committed_days": len(committed),
+                **{
+                    key: result.stats.get(key)
+                    for key in ("status", "stop_reason", "objective", "gap", "time_limit", "wall_time")
+                },
+                "last_solution_time": result.stats.get("last_solution_time"),
+                "variables": result.stats["model"]["variables"] if "model" in result.stats else None,
+                "symmetry_classes": result.stats.get("symmetry_classes"),
+            }
+        )
+        if result.stats.get("status") not in SOLVED_STATUSES:
+            status = result.stats.get("status", "UNKNOWN")
+            alerts.extend(result.alerts)
+            break
+        if result.stats["status"] != "OPTIMAL":
+            status = "FEASIBLE"
+
+        committed_days = {entry.date for entry in committed}
+        kept = result.assignments.between(committed[0].date, committed[-1].date)
+        assignments.extend(kept)
+        alerts.extend(alert for alert in result.alerts if alert["date"] in committed_days)
+        state = _advance(state, committed, kept, payload.requests)
+
+    score = score_assignments(replace(payload, calendar=calendar), assignments)
+    fairness = {
+        "ob_oc_counts": {resident.id: state.call_counts.get(resident.id, 0) for resident in payload.residents},
+        "weekend_ob_oc_spread": score["weekend_spread"],
+    }
+    days = [entry.date for entry in calendar]
+    unmet_requests = _request_outcomes(payload.requests, days, assignments)
+
+    stats = {
+        "status": status,
+        "mode": "rolling",
+        "model": {
+            "residents": len(payload.residents),
+            "days": total_days,
+            "windows": len(offsets),
+            "window_days": window_days,
+            "step_days": step_days,
+            "variables": max((window["variables"] or 0) for window in windows),
+        },
+        "objective": score["objective"],
+        "best_bound": None,
+        "gap": None,
+        "score": score,
+        "wall_time": sum(window["wall_time"] or 0 for window in windows),
+        "last_solution_time": sum(window["last_solution_time"] or 0 for window in windows),
+        "stop_reason": overall_stop_reason(window["stop_reason"] for window in windows),
+        "time_limit": options.time_limit_seconds,
+        "relative_gap_limit": options.relative_gap_limit,
+        "plateau_seconds": options.plateau_seconds,
+        "num_workers": options.num_workers,
+        "windows": windows,
+        "phases": {name: round(seconds, 6) for name, seconds in phases.items()},
+    }
+    search_log = "\n".join(logs) if options.capture_log else None
+    return GenerationOutput(assignments, alerts, fairness, unmet_requests, stats, search_log)
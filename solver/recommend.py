@@ -0,0 +1,403 @@
+from __future__ import annotations
+
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import date
+
+from .calendar import build_day_table
+from .scoring import COVERAGE_KEYS, score_weights
+from .solver import DEFAULT_CONSTRAINTS, AssignmentTable, RequestType, ScheduleInput, ShiftType, _is_time_off
+
+CALL_SHIFTS = (ShiftType.OB_OC, ShiftType.OB_L4)
+TIER0_BLOCKED = (ShiftType.OB_L3, ShiftType.OB_OC, ShiftType.OB_L4, ShiftType.OB_POSTCALL)
+WORKING_SHIFTS = (ShiftType.OB_DAY, *TIER0_BLOCKED)
+CHAIN_FOLLOWS = {
+    ShiftType.OB_L3: ShiftType.OB_OC,
+    ShiftType.OB_OC: ShiftType.OB_POSTCALL,
+    ShiftType.OB_L4: ShiftType.OB_POSTCALL,
+}
+# Calls this many days either side of a hole are considered for swaps.
+SWAP_WINDOW_DAYS = 7
+
+
+@dataclass(frozen=True)
+class Edit:
+    resident_id: int
+    day_index: int
+    before: ShiftType | None
+    after: ShiftType | None
+
+
+class _ScheduleState:
+    """A schedule held as cells with running objective terms.
+
+    Applying or reverting edits updates coverage, call counts and request
+    penalties for the touched cells only, so a candidate is scored in time
+    proportional to its size rather than the schedule's.
+    """
+
+    def __init__(self, payload: ScheduleInput, calendar, assignments: AssignmentTable) -> None:
+        constraints = payload.constraints or DEFAULT_CONSTRAINTS
+        self.payload = payload
+        self.calendar = calendar
+        self.weights = score_weights(constraints)
+        self.residents = {resident.id: resident for resident in payload.residents}
+        index_of = {entry.date.toordinal(): index for index, entry in enumerate(calendar)}
+        self.cells: dict[tuple[int, int], ShiftType] = {}
+        for resident_id, day, shift in assignments.rows():
+            index = index_of.get(day.toordinal())
+            if index is not None:
+                self.cells[(resident_id, index)] = shift
+
+        self.required = {
+            (index, shift): entry.coverage[key] for index, entry in enumerate(calendar) for shift, key in COVERAGE_KEYS
+        }
+        self.staffed = Counter((index, shift) for (_, index), shift in self.cells.items())
+        self.understaff = sum(
+            max(0, required - self.staffed[cell]) for cell, required in self.required.items()
+        )
+        self.calls = Counter(
+            resident_id for (resident_id, _), shift in self.cells.items() if shift == ShiftType.OB_OC
+        )
+        self.weekend = Counter(
+            resident_id
+            for (resident_id, index), shift in self.cells.items()
+            if shift == ShiftType.OB_OC and calendar[index].is_weekend
+        )
+        self.targets = {}
+        call_targets = constraints.get("call_targets", {})
+        for resident in payload.residents:
+            target = call_targets.get(f"tier{resident.tier}")
+            if target:
+                self.targets[resident.id] = target
+
+        self.requests: dict[int, list[tuple[bool, list[int]]]] = {}
+        for request in payload.requests:
+            indices = [
+                index_of[ordinal]
+                for ordinal in range(request.start_date.toordinal(), request.end_date.toordinal() + 1)
+                if ordinal in index_of
+            ]
+            if indices and request.resident_id in self.residents:
+                self.requests.setdefault(request.resident_id, []).append(
+                    (request.request_type == RequestType.PREFER_CALL, indices)
+                )
+        self.call_deviation = sum(self._deviation(resident_id) for resident_id in self.residents)
+        self.request_penalty = sum(self._request_penalty(resident_id) for resident_id in self.residents)
+
+    def _deviation(self, resident_id: int) -> int:
+        target = self.targets.get(resident_id)
+        if not target:
+            return 0
+        low, high = target
+        count = self.calls[resident_id]
+        return max(0, low - count) + max(0, count - high)
+
+    def _request_penalty(self, resident_id: int) -> int:
+        penalty = 0
+        for prefers_call, indices in self.requests.get(resident_id, ()):
+            has_call = any(self.cells.get((resident_id, index)) == ShiftType.OB_OC for index in indices)
+            penalty += prefers_call != has_call
+        return penalty
+
+    def _set(self, resident_id: int, index: int, shift: ShiftType | None) -> None:
+        before = self.cells.pop((resident_id, index), None)
+        if shift is not None:
+            self.cells[(resident_id, index)] = shift
+        for old, new in ((before, -1), (shift, 1)):
+            if old is None:
+                continue
+            cell = (index, old)
+            required = self.required.get(cell)
+            if required is not None:
+                self.understaff -= max(0, required - self.staffed[cell])
+            self.staffed[cell] += new
+            if required is not None:
+                self.understaff += max(0, required - self.staffed[cell])
+            if old == ShiftType.OB_OC:
+                self.calls[resident_id] += new
+                self.weekend[resident_id] += new if self.calendar[index].is_weekend else 0
+
+    def apply(self, edits: list[Edit], revert: bool = False) -> None:
+        residents = {edit.resident_id for edit in edits}
+        self.call_deviation -= sum(self._deviation(resident_id) for resident_id in residents)
+        self.request_penalty -= sum(self._request_penalty(resident_id) for resident_id in residents)
+        for edit in reversed(edits) if revert else edits:
+            self._set(edit.resident_id, edit.day_index, edit.before if revert else edit.after)
+        self.call_deviation += sum(self._deviation(resident_id) for resident_id in residents)
+        self.request_penalty += sum(self._request_penalty(resident_id) for resident_id in residents)
+
+    def terms(self) -> dict:
+        weekend = [self.weekend[resident_id] for resident_id in self.residents]
+        weekend_spread = max(weekend) - min(weekend) if weekend else 0
+        objective = (
+            self.weights["understaff"] * self.understaff
+            + self.weights["call"] * self.call_deviation
+            + self.weights["weekend"] * weekend_spread
+            + self.weights["request"] * self.request_penalty
+        )
+        return {
+            "objective": objective,
+            "understaff": self.understaff,
+            "call_deviation": self.call_deviation,
+            "weekend_spread": weekend_spread,
+            "request_penalty": self.request_penalty,
+        }
+
+    def violations(self, edits: list[Edit]) -> list[dict]:
+        """Hard rules of the model broken around the edited cells."""
+        found = []
+        last = len(self.calendar) - 1
+
+        def violation(kind: str, resident_id: int | None, index: int, shift: ShiftType | None = None) -> None:
+            item = {"kind": kind, "resident_id": resident_id, "date": self.calendar[index].date}
+            if shift is not None:
+                item["shift_type"] = shift.value
+            if item not in found:
+                found.append(item)
+
+        for edit in edits:
+            resident_id, index, shift = edit.resident_id, edit.day_index, edit.after
+            entry = self.calendar[index]
+            restricted = self.residents[resident_id].ob_months_completed == 0 and entry.tier0_restricted
+            if shift in TIER0_BLOCKED and restricted:
+                violation("tier0_rule", resident_id, index, shift)
+            time_off = _is_time_off(entry.date, resident_id, self.payload.time_off)
+            if shift in WORKING_SHIFTS and time_off and not restricted:
+                violation("time_off", resident_id, index, shift)
+            if shift == ShiftType.OB_L3 and index == last:
+                violation("period_end", resident_id, index, shift)
+            for other in (edit.before, shift):
+                required = self.required.get((index, other))
+                if required is None:
+                    continue
+                limit = entry.coverage["ob_day_max"] if other == ShiftType.OB_DAY else required
+                if self.staffed[(index, other)] > limit:
+                    violation("over_coverage", None, index, other)
+            for day in range(max(0, index - 1), min(last, index + 1)):
+                today = self.cells.get((resident_id, day))
+                tomorrow = self.cells.get((resident_id, day + 1))
+                if today == ShiftType.OB_L3 and tomorrow != ShiftType.OB_OC:
+                    violation("l3_without_call", resident_id, day)
+                if (today in CALL_SHIFTS) != (tomorrow == ShiftType.OB_POSTCALL):
+                    violation("postcall", resident_id, day + 1)
+        return found
+
+
+def _chain_shifts(shift: ShiftType) -> list[ShiftType]:
+    chain = [shift]
+    while chain[-1] in CHAIN_FOLLOWS:
+        chain.append(CHAIN_FOLLOWS[chain[-1]])
+    return chain
+
+
+def _free(state: _ScheduleState, resident_id: int, index: int, displace: bool) -> bool:
+    shift = state.cells.get((resident_id, index))
+    return shift is None or (displace and shift == ShiftType.OB_DAY)
+
+
+def _take(state: _ScheduleState, resident_id: int, index: int, shift: ShiftType) -> list[Edit] | None:
+    """Edits giving ``resident_id`` the shift and its chain: postcall after a call, OB_OC after OB_L3.
+
+    Only empty cells and OB_DAY shifts are overwritten; ``None`` if the chain does not fit.
+    """
+    edits = []
+    for offset, link in enumerate(_chain_shifts(shift)):
+        day = index + offset
+        if day >= len(state.calendar):
+            if link == ShiftType.OB_POSTCALL:
+                break
+            return None
+        # The hole itself may displace an OB_DAY shift; the chain's follow-ups may too.
+        if not _free(state, resident_id, day, displace=shift != ShiftType.OB_DAY):
+            return None
+        edits.append(Edit(resident_id, day, state.cells.get((resident_id, day)), link))
+    return edits
+
+
+def _call_chain(state: _ScheduleState, resident_id: int, index: int) -> list[Edit]:
+    """Edits removing the linked OB_L3, call and postcall shifts around ``index``."""
+    start = index
+    if state.cells.get((resident_id, start)) == ShiftType.OB_POSTCALL and state.cells.get(
+        (resident_id, start - 1)
+    ) in CALL_SHIFTS:
+        start -= 1
+    if state.cells.get((resident_id, start)) == ShiftType.OB_OC and state.cells.get(
+        (resident_id, start - 1)
+    ) == ShiftType.OB_L3:
+        start -= 1
+    edits = []
+    expected = state.cells[(resident_id, start)]
+    day = start
+    while expected is not None and state.cells.get((resident_id, day)) == expected:
+        edits.append(Edit(resident_id, day, expected, None))
+        expected = CHAIN_FOLLOWS.get(expected)
+        day += 1
+    return edits
+
+
+def recommend_edits(
+    payload: ScheduleInput,
+    assignments: AssignmentTable,
+    day: date,
+    shift: ShiftType | None = None,
+    resident_id: int | None = None,
+    limit: int = 10,
+    time_budget: float = 0.2,
+) -> dict:
+    """Rank edits that cover a hole in a schedule, by objective delta.
+
+    The hole is either ``shift`` on ``day`` or whatever ``resident_id``
+    works that day; unassigning a call shift drops its whole OB_L3, call
+    and postcall chain, and the hole then starts at the chain's head. Three neighbourhoods are searched until
+    ``time_budget`` seconds have passed: a resident picks up an OB_DAY
+    shift (``move``) or a call shift with its postcall and OB_OC
+    follow-ups (``chain``), and pairwise ``swap`` moves where the taker
+    hands another resident either the call chain that blocks the hole or
+    one of their calls within a week. Candidates that break a hard rule
+    are kept with their violations but ranked last.
+    """
+    started = time.perf_counter()
+    constraints = payload.constraints or DEFAULT_CONSTRAINTS
+    calendar = payload.calendar or build_day_table(payload.start_date, payload.end_date, payload.holidays, constraints)
+    state = _ScheduleState(payload, calendar, assignments)
+    index_of = {entry.date: index for index, entry in enumerate(calendar)}
+    if day not in index_of:
+        raise ValueError(f"{day} is outside the schedule")
+    index = index_of[day]
+
+    removed: list[Edit] = []
+    if resident_id is not None:
+        shift = state.cells.get((resident_id, index))
+        if shift not in WORKING_SHIFTS or shift == ShiftType.OB_POSTCALL:
+            raise ValueError(f"Resident {resident_id} has no shift to hand over on {day}")
+        if shift == ShiftType.OB_DAY:
+            removed = [Edit(resident_id, index, shift, None)]
+        else:
+            removed = _call_chain(state, resident_id, index)
+        state.apply(removed)
+        held = shift
+        # An OB_L3 the day before the call went too: refill the chain from there.
+        index, shift = removed[0].day_index, removed[0].before
+    elif shift not in (ShiftType.OB_DAY, ShiftType.OB_L3, ShiftType.OB_OC, ShiftType.OB_L4):
+        raise ValueError(f"{shift} is not a coverage shift")
+    elif state.staffed[(index, shift)] >= state.required[(index, shift)]:
+        raise ValueError(f"{shift.value} on {day} is fully staffed")
+    else:
+        held = shift
+    baseline = state.terms()
+
+    candidates = []
+    evaluated = 0
+    truncated = False
+
+    def consider(kind: str, edits: list[Edit]) -> None:
+        nonlocal evaluated
+        state.apply(edits)
+        terms = state.terms()
+        violations = state.violations(edits)
+        state.apply(edits, revert=True)
+        evaluated += 1
+        candidates.append(
+            {
+                "kind": kind,
+                "delta": terms["objective"] - baseline["objective"],
+                "valid": not violations,
+                "violations": violations,
+                "score": terms,
+                "edits": edits,
+            }
+        )
+
+    def handovers(given_up: list[Edit], excluded: set) -> list[list[Edit]]:
+        # Receivers take the chain from its head; the caller has applied the edits so far.
+        head = given_up[0]
+        return [
+            handover
+            for receiver in payload.residents
+            if receiver.id not in excluded and (handover := _take(state, receiver.id, head.day_index, head.before))
+        ]
+
+    hole_days = range(index, min(len(calendar), index + len(_chain_shifts(shift))))
+    chains = {}
+    blocked = {}
+    for resident in payload.residents:
+        if resident.id == resident_id:
+            continue
+        edits = _take(state, resident.id, index, shift)
+        if edits is not None:
+            chains[resident.id] = edits
+            consider("move" if len(edits) == 1 else "chain", edits)
+            continue
+        cells = [state.cells.get((resident.id, day)) for day in hole_days]
+        if cells[0] != shift and all(cell is None or cell in TIER0_BLOCKED or cell == ShiftType.OB_DAY for cell in cells):
+            starts = {
+                _call_chain(state, resident.id, day)[0]
+                for day, cell in zip(hole_days, cells)
+                if cell in TIER0_BLOCKED
+            }
+            if len(starts) == 1 and next(iter(starts)).before != ShiftType.OB_POSTCALL:
+                blocked[resident.id] = _call_chain(state, resident.id, next(iter(starts)).day_index)
+
+    # Swaps: a resident whose own call chain blocks the hole hands that chain to someone else.
+    for taker, given_up in blocked.items():
+        if time.perf_counter() - started > time_budget:
+            truncated = True
+            break
+        state.apply(given_up)
+        taken = _take(state, taker, index, shift)
+        options = []
+        if taken is not None:
+            state.apply(taken)
+            options = handovers(given_up, {taker, resident_id})
+            state.apply(taken, revert=True)
+        state.apply(given_up, revert=True)
+        for handover in options:
+            consider("swap", given_up + taken + handover)
+
+    # Trades: the taker gives up a nearby call so their call count is unchanged.
+    if shift != ShiftType.OB_DAY and not truncated:
+        first, last = max(0, index - SWAP_WINDOW_DAYS), min(len(calendar) - 1, index + SWAP_WINDOW_DAYS)
+        for taker, taken in chains.items():
+            for other_day in range(first, last + 1):
+                if time.perf_counter() - started > time_budget:
+                    truncated = True
+                    break
+                if other_day == index or state.cells.get((taker, other_day)) not in CALL_SHIFTS:
+                    continue
+                given_up = _call_chain(state, taker, other_day)
+                if {edit.day_index for edit in given_up} & {edit.day_index for edit in taken}:
+                    continue
+                state.apply(taken + given_up)
+                options = handovers(given_up, {taker, resident_id})
+                state.apply(taken + given_up, revert=True)
+                for handover in options:
+                    consider("swap", taken + given_up + handover)
+            if truncated:
+                break
+
+    candidates.sort(key=lambda candidate: (not candidate["valid"], candidate["delta"], len(candidate["edits"])))
+    for candidate in candidates[:limit]:
+        candidate["edits"] = [
+            {
+                "resident_id": edit.resident_id,
+                "date": calendar[edit.day_index].date,
+                "from_shift": edit.before,
+                "to_shift": edit.after,
+            }
+            for edit in candidate["edits"]
+        ]
+    return {
+        "date": day,
+        "shift_type": held,
+        "unassigned": [
+            {"resident_id": edit.resident_id, "date": calendar[edit.day_index].date, "shift_type": edit.before}
+            for edit in removed
+        ],
+        "baseline": baseline,
+        "candidates": candidates[:limit],
+        "evaluated": evaluated,
+        "truncated": truncated,
+        "wall_time": time.perf_counter() - started,
+    }
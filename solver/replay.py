@@ -0,0 +1,211 @@
+"""Replay dumped solver inputs and models away from production.
+
+    python -m solver.replay artifacts/123 --time-limit 30 --param linearization_level:2
+    python -m solver.replay artifacts/123 --pipeline --option objective_mode=lexicographic
+"""
+
+from __future__ import annotations
+
+import argparse
+import dataclasses
+import gzip
+import hashlib
+import json
+import sys
+from collections.abc import Mapping
+from datetime import date
+from pathlib import Path
+
+from google.protobuf import text_format
+from ortools.sat.python import cp_model
+
+from .calendar import CalendarDay, DayClass
+from .horizon import generate_rolling_schedule
+from .search_log import summarize_search_log
+from .solver import Request, RequestType, Resident, ScheduleInput, ShiftType, SolverOptions, TimeOff
+
+INPUT_FILE = "input.json.gz"
+MODEL_GLOB = "model-*.pb.gz"
+
+
+def input_to_dict(payload: ScheduleInput) -> dict:
+    holidays = payload.holidays
+    if isinstance(holidays, Mapping):
+        holidays = {day.isoformat(): name for day, name in holidays.items()}
+    elif holidays is not None:
+        holidays = [day.isoformat() for day in holidays]
+    return {
+        "start_date": payload.start_date.isoformat(),
+        "end_date": payload.end_date.isoformat(),
+        "residents": [dataclasses.asdict(resident) for resident in payload.residents],
+        "requests": [
+            [
+                request.resident_id,
+                request.request_type.value,
+                request.start_date.isoformat(),
+                request.end_date.isoformat(),
+            ]
+            for request in payload.requests
+        ],
+        "time_off": [
+            [block.resident_id, block.start_date.isoformat(), block.end_date.isoformat(), block.block_type.value]
+            for block in payload.time_off
+        ],
+        "holidays": holidays,
+        "constraints": payload.constraints,
+        "calendar": None
+        if payload.calendar is None
+        else [
+            {
+                "date": entry.date.isoformat(),
+                "day_class": entry.day_class.value,
+                "coverage": dict(entry.coverage),
+                "holiday_name": entry.holiday_name,
+                "tier0_restricted": entry.tier0_restricted,
+            }
+            for entry in payload.calendar
+        ],
+    }
+
+
+def input_from_dict(data: dict) -> ScheduleInput:
+    holidays = data["holidays"]
+    if isinstance(holidays, dict):
+        holidays = {date.fromisoformat(day): name for day, name in holidays.items()}
+    elif holidays is not None:
+        holidays = [date.fromisoformat(day) for day in holidays]
+    calendar = data["calendar"]
+    if calendar is not None:
+        calendar = [
+            CalendarDay(
+                date=date.fromisoformat(entry["date"]),
+                day_class=DayClass(entry["day_class"]),
+                coverage=entry["coverage"],
+                holiday_name=entry["holiday_name"],
+                tier0_restricted=entry["tier0_restricted"],
+            )
+            for entry in calendar
+        ]
+    return ScheduleInput(
+        start_date=date.fromisoformat(data["start_date"]),
+        end_date=date.fromisoformat(data["end_date"]),
+        residents=[Resident(**resident) for resident in data["residents"]],
+        requests=[
+            Request(resident_id, RequestType(kind), date.fromisoformat(start), date.fromisoformat(end))
+            for resident_id, kind, start, end in data["requests"]
+        ],
+        time_off=[
+            TimeOff(resident_id, date.fromisoformat(start), date.fromisoformat(end), ShiftType(kind))
+            for resident_id, start, end, kind in data["time_off"]
+        ],
+        holidays=holidays,
+        constraints=data["constraints"],
+        calendar=calendar,
+    )
+
+
+def input_fingerprint(payload: ScheduleInput) -> str:
+    """Digest of everything the model is built from; equal digests mean the same model."""
+    document = json.dumps(input_to_dict(payload), sort_keys=True, default=str)
+    return hashlib.sha256(document.encode()).hexdigest()
+
+
+def dump_input(directory: str | Path, payload: ScheduleInput, options: SolverOptions) -> Path:
+    """Write the solver input and the options it was solved with."""
+    path = Path(directory) / INPUT_FILE
+    path.parent.mkdir(parents=True, exist_ok=True)
+    document = {"input": input_to_dict(payload), "options": dataclasses.asdict(options)}
+    path.write_bytes(gzip.compress(json.dumps(document).encode()))
+    return path
+
+
+def load_input(directory: str | Path) -> tuple[ScheduleInput, SolverOptions]:
+    document = json.loads(gzip.decompress((Path(directory) / INPUT_FILE).read_bytes()))
+    options = document["options"]
+    options["stage_time_shares"] = tuple(options["stage_time_shares"])
+    # Never dump again over the artifacts being replayed.
+    options["artifact_dir"] = ""
+    return input_from_dict(document["input"]), SolverOptions(**options)
+
+
+def load_model(path: str | Path) -> cp_model.CpModel:
+    model = cp_model.CpModel()
+    model.Proto().ParseFromString(gzip.decompress(Path(path).read_bytes()))
+    return model
+
+
+def replay_models(directory: str | Path, time_limit: float, workers: int, params: list[str], log: bool) -> list[dict]:
+    """Solve every dumped model with the given CP-SAT parameters."""
+    results = []
+    for path in sorted(Path(directory).glob(MODEL_GLOB)):
+        model = load_model(path)
+        solver = cp_model.CpSolver()
+        solver.parameters.max_time_in_seconds = time_limit
+        if workers:
+            solver.parameters.num_workers = workers
+        for param in params:
+            text_format.Merge(param, solver.parameters)
+        solver.parameters.log_search_progress = log
+        status = solver.Solve(model)
+        results.append(
+            {
+                "model": path.name,
+                "status": solver.StatusName(status),
+                "objective": solver.ObjectiveValue() if status in {cp_model.OPTIMAL, cp_model.FEASIBLE} else None,
+                "best_bound": solver.BestObjectiveBound(),
+                "wall_time": solver.WallTime(),
+                "num_conflicts": solver.NumConflicts(),
+                "num_branches": solver.NumBranches(),
+            }
+        )
+    return results
+
+
+def _option_value(text: str):
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return text
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("directory", help="artifact directory of one schedule version")
+    parser.add_argument("--pipeline", action="store_true", help="rebuild and solve from the dumped input")
+    parser.add_argument("--time-limit", type=float, help="per model; defaults to the recorded limit split across them")
+    parser.add_argument("--workers", type=int, help="defaults to the recorded worker count")
+    parser.add_argument(
+        "--param", action="append", default=[], help="CP-SAT parameter in text format, e.g. linearization_level:2"
+    )
+    parser.add_argument(
+        "--option", action="append", default=[], help="SolverOptions field for --pipeline, e.g. plateau_seconds=0"
+    )
+    parser.add_argument(
+        "--quiet", action="store_true", help="do not print the CP-SAT search log (to stderr with --pipeline)"
+    )
+    args = parser.parse_args(argv)
+
+    payload, options = load_input(args.directory)
+    overrides = dict(option.split("=", 1) for option in args.option)
+    options = dataclasses.replace(options, **{key: _option_value(value) for key, value in overrides.items()})
+    if args.workers is not None:
+        options = dataclasses.replace(options, num_workers=args.workers)
+
+    if args.pipeline:
+        if args.time_limit is not None:
+            options = dataclasses.replace(options, time_limit_seconds=args.time_limit)
+        result = generate_rolling_schedule(payload, dataclasses.replace(options, capture_log=True))
+        if not args.quiet:
+            sys.stderr.write(result.search_log)
+        # Phase timings are in the stats; the search summary sits beside them.
+        report = {"stats": result.stats, "search_log": summarize_search_log(result.search_log)}
+        print(json.dumps(report, indent=2, default=str))
+        return
+    models = len(list(Path(args.directory).glob(MODEL_GLOB)))
+    time_limit = args.time_limit or options.time_limit_seconds / max(1, models)
+    results = replay_models(args.directory, time_limit, options.num_workers, args.param, not args.quiet)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+from collections import Counter
+from typing import Iterable
+
+from .calendar import build_day_table
+from .solver import (
+    DEFAULT_CONSTRAINTS,
+    SHIFT_CODES,
+    Assignment,
+    AssignmentTable,
+    RequestType,
+    ScheduleInput,
+    ShiftType,
+)
+
+COVERAGE_KEYS = (
+    (ShiftType.OB_OC, "ob_oc"),
+    (ShiftType.OB_L3, "ob_l3"),
+    (ShiftType.OB_L4, "ob_l4"),
+    (ShiftType.OB_DAY, "ob_day_min"),
+)
+
+
+def score_assignments(payload: ScheduleInput, assignments: Iterable[Assignment]) -> dict:
+    """Evaluate the solver's weighted objective for a complete schedule.
+
+    Returns the weighted ``objective`` and the unweighted value of each term,
+    so schedules produced by different strategies can be compared directly.
+    Counting runs over the columns of an ``AssignmentTable``, so a year of
+    assignments scores in milliseconds.
+    """
+    constraints = payload.constraints or DEFAULT_CONSTRAINTS
+    calendar = payload.calendar or build_day_table(
+        payload.start_date, payload.end_date, payload.holidays, constraints
+    )
+    table = assignments if isinstance(assignments, AssignmentTable) else AssignmentTable(assignments)
+    days = {entry.date.toordinal() for entry in calendar}
+    weekend_days = {entry.date.toordinal() for entry in calendar if entry.is_weekend}
+
+    coverage = Counter(zip(table.day_ordinals, table.shift_codes))
+    call_code = SHIFT_CODES.index(ShiftType.OB_OC)
+    calls = {
+        (resident_id, ordinal)
+        for resident_id, ordinal, code in zip(table.resident_ids, table.day_ordinals, table.shift_codes)
+        if code == call_code and ordinal in days
+    }
+
+    coverage_codes = [(SHIFT_CODES.index(shift), key) for shift, key in COVERAGE_KEYS]
+    understaff = 0
+    for entry in calendar:
+        ordinal = entry.date.toordinal()
+        requirements = entry.coverage
+        for code, key in coverage_codes:
+            understaff += max(0, requirements[key] - coverage[(ordinal, code)])
+
+    call_counts = Counter(resident_id for resident_id, _ in calls)
+    weekend_counts = Counter(resident_id for resident_id, ordinal in calls if ordinal in weekend_days)
+
+    call_deviation = 0
+    call_targets = constraints.get("call_targets", {})
+    for resident in payload.residents:
+        target = call_targets.get(f"tier{resident.tier}")
+        if not target:
+            continue
+        low, high = target
+        count = call_counts[resident.id]
+        call_deviation += max(0, low - count) + max(0, count - high)
+
+    weekend = [weekend_counts[resident.id] for resident in payload.residents]
+    weekend_spread = max(weekend) - min(weekend) if weekend else 0
+
+    request_penalty = 0
+    for request in payload.requests:
+        request_days = [
+            ordinal
+            for ordinal in range(request.start_date.toordinal(), request.end_date.toordinal() + 1)
+            if ordinal in days
+        ]
+        if not request_days:
+            continue
+        has_call = any((request.resident_id, ordinal) in calls for ordinal in request_days)
+        if request.request_type == RequestType.PREFER_CALL:
+            request_penalty += 0 if has_call else 1
+        else:
+            request_penalty += 1 if has_call else 0
+
+    weights = score_weights(constraints)
+    objective = (
+        weights["understaff"] * understaff
+        + weights["call"] * call_deviation
+        + weights["weekend"] * weekend_spread
+        + weights["request"] * request_penalty
+    )
+    return {
+        "objective": objective,
+        "understaff": understaff,
+        "call_deviation": call_deviation,
+        "weekend_spread": weekend_spread,
+        "request_penalty": request_penalty,
+    }
+
+
+def score_weights(constraints: dict) -> dict[str, int]:
+    """The objective weights ``constraints`` resolve to, defaults filled in."""
+    weights = constraints.get("weights", {})
+    return {
+        "understaff": int(weights.get("understaff", 1000)),
+        "call": int(weights.get("call", 20)),
+        "weekend": int(weights.get("weekend", 5)),
+        "request": int(weights.get("request", 10)),
+    }
@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from ortools.sat.python import cp_model
+
+_HEADER = re.compile(r"^=== (.+) ===$")
+_PROGRESS = re.compile(r"^#(\d+|Bound)\s+([\d.]+)s\s+best:(\S+)\s+next:\[([^,\]]*),?([^\]]*)\]\s*(.*)$")
+_WORKER = re.compile(r"^([A-Za-z_][\w/]*)")
+_PRESOLVE = re.compile(r"^Starting presolve at ([\d.]+)s")
+_SEARCH = re.compile(r"^Starting (?:sequential )?search at ([\d.]+)s")
+_VARIABLES = re.compile(r"^#Variables: ([\d']+)")
+_TABLE_ROW = re.compile(r"^\s*'([^']+)':\s+(.*)$")
+_RESPONSE = re.compile(r"^(status|walltime|deterministic_time): (\S+)$")
+
+
+class SearchLog:
+    """Collects the CP-SAT search logs of every solve in one generation."""
+
+    def __init__(self) -> None:
+        self.lines: list[str] = []
+
+    def attach(self, solver: cp_model.CpSolver, label: str) -> None:
+        self.lines.append(f"=== {label} ===")
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = self.lines.append
+
+    def text(self) -> str:
+        return "\n".join(self.lines)
+
+
+def _number(text: str) -> float | int | None:
+    try:
+        value = float(text)
+    except ValueError:
+        return None
+    if not value.is_integer() or abs(value) == float("inf"):
+        return value
+    return int(value)
+
+
+def _new_run(label: str | None) -> dict:
+    return {
+        "label": label,
+        "status": None,
+        "presolve_time": None,
+        "variables": None,
+        "presolved_variables": None,
+        "first_solution_time": None,
+        "wall_time": None,
+        "deterministic_time": None,
+        "objective": [],
+        "bound": [],
+        "solutions_by_worker": {},
+        "lns": {},
+    }
+
+
+def _finish(run: dict, presolve_start: float | None, search_start: float | None) -> dict:
+    if presolve_start is not None and search_start is not None:
+        # Includes loading the presolved model into the workers.
+        run["presolve_time"] = round(search_start - presolve_start, 6)
+    if run["objective"]:
+        run["first_solution_time"] = run["objective"][0][0]
+    return run
+
+
+def summarize_search_log(text: str) -> dict:
+    """Parse a captured log into per-solve summaries.
+
+    Each run records its presolve time, first-solution time, the objective
+    and bound curves as ``[seconds, value, worker]`` points, solutions found
+    per worker and the LNS ``[improved, calls]`` counts.
+    """
+    runs: list[dict] = []
+    label = None
+    run = None
+    presolve_start = search_start = None
+    table = None
+    for line in text.splitlines():
+        header = _HEADER.match(line)
+        if header:
+            label = header.group(1)
+            continue
+        if line.startswith("Starting CP-SAT solver"):
+            if run is not None:
+                runs.append(_finish(run, presolve_start, search_start))
+            run = _new_run(label)
+            presolve_start = search_start = table = None
+            continue
+        if run is None:
+            continue
+        if not line.strip():
+            table = None
+            continue
+        if line.startswith("LNS stats"):
+            table = "lns"
+            continue
+        if table == "lns":
+            row = _TABLE_ROW.match(line)
+            improved, _, calls = row.group(2).split()[0].partition("/") if row else ("", "", "")
+            if improved.isdigit() and calls.isdigit():
+                run["lns"][row.group(1)] = [int(improved), int(calls)]
+            continue
+
+        progress = _PROGRESS.match(line)
+        if progress:
+            kind, seconds, best, lower, _, rest = progress.groups()
+            worker = _WORKER.match(rest)
+            worker = worker.group(1) if worker else "default"
+            if kind == "Bound":
+                value = _number(lower)
+                if value is not None:
+                    run["bound"].append([float(seconds), value, worker])
+            else:
+                run["objective"].append([float(seconds), _number(best), worker])
+                run["solutions_by_worker"][worker] = run["solutions_by_worker"].get(worker, 0) + 1
+            continue
+        if match := _PRESOLVE.match(line):
+            presolve_start = float(match.group(1))
+        elif match := _SEARCH.match(line):
+            search_start = float(match.group(1))
+        elif match := _VARIABLES.match(line):
+            key = "variables" if run["variables"] is None else "presolved_variables"
+            run[key] = int(match.group(1).replace("'", ""))
+        elif match := _RESPONSE.match(line):
+            key, value = match.groups()
+            if key == "status":
+                run["status"] = value
+            else:
+                run["wall_time" if key == "walltime" else key] = float(value)
+    if run is not None:
+        runs.append(_finish(run, presolve_start, search_start))
+
+    return {
+        "runs": runs,
+        "presolve_time": round(sum(run["presolve_time"] or 0.0 for run in runs), 6),
+        "search_time": round(sum(run["wall_time"] or 0.0 for run in runs), 6),
+    }
@@ -1,12 +1,24 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+import gzip
+import math
+import threading
+import time
+from array import array
+from collections import defaultdict
+from collections.abc import Iterator, Sequence
+from dataclasses import dataclass, field, replace
 from datetime import date, timedelta
 from enum import Enum
-from typing import Iterable
+from pathlib import Path
+from typing import Iterable, overload
 
 from ortools.sat.python import cp_model
 
+from .calendar import CalendarDay, build_day_table
+from .search_log import SearchLog
+from .timing import PhaseTimer
+
 
 class ShiftType(str, Enum):
     OB_DAY = "OB_DAY"
@@ -46,19 +58,150 @@ class TimeOff:
     block_type: ShiftType
 
 
-@dataclass
+@dataclass(slots=True)
 class Assignment:
     resident_id: int
     date: date
     shift_type: ShiftType
 
 
+# Shift codes stored by AssignmentTable.
+SHIFT_CODES = list(ShiftType)
+_SHIFT_CODE = {shift: code for code, shift in enumerate(SHIFT_CODES)}
+
+
+class AssignmentTable(Sequence[Assignment]):
+    """Assignments as parallel integer arrays: resident id, day ordinal, shift code.
+
+    A long horizon's schedule takes a few bytes per row instead of an object
+    graph. Indexing and iteration build ``Assignment`` rows on demand for
+    existing callers; ``rows()`` and ``to_json()`` read the arrays directly.
+    """
+
+    __slots__ = ("resident_ids", "day_ordinals", "shift_codes")
+
+    def __init__(self, assignments: Iterable[Assignment] = ()) -> None:
+        self.resident_ids = array("i")
+        self.day_ordinals = array("i")
+        self.shift_codes = array("b")
+        self.extend(assignments)
+
+    def add(self, resident_id: int, day: date, shift: ShiftType) -> None:
+        self.resident_ids.append(resident_id)
+        self.day_ordinals.append(day.toordinal())
+        self.shift_codes.append(_SHIFT_CODE[shift])
+
+    def append(self, assignment: Assignment) -> None:
+        self.add(assignment.resident_id, assignment.date, assignment.shift_type)
+
+    def extend(self, assignments: Iterable[Assignment]) -> None:
+        if isinstance(assignments, AssignmentTable):
+            self.resident_ids.extend(assignments.resident_ids)
+            self.day_ordinals.extend(assignments.day_ordinals)
+            self.shift_codes.extend(assignments.shift_codes)
+            return
+        for assignment in assignments:
+            self.append(assignment)
+
+    def __len__(self) -> int:
+        return len(self.resident_ids)
+
+    @overload
+    def __getitem__(self, index: int) -> Assignment: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> AssignmentTable: ...
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            table = AssignmentTable()
+            table.resident_ids = self.resident_ids[index]
+            table.day_ordinals = self.day_ordinals[index]
+            table.shift_codes = self.shift_codes[index]
+            return table
+        return Assignment(
+            self.resident_ids[index], date.fromordinal(self.day_ordinals[index]), SHIFT_CODES[self.shift_codes[index]]
+        )
+
+    def __iter__(self) -> Iterator[Assignment]:
+        for resident_id, day, shift in self.rows():
+            yield Assignment(resident_id, day, shift)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, AssignmentTable):
+            return (
+                self.resident_ids == other.resident_ids
+                and self.day_ordinals == other.day_ordinals
+                and self.shift_codes == other.shift_codes
+            )
+        return NotImplemented
+
+    def rows(self) -> Iterator[tuple[int, date, ShiftType]]:
+        """(resident id, date, shift) tuples; rows on the same day share one ``date``."""
+        days: dict[int, date] = {}
+        for resident_id, ordinal, code in zip(self.resident_ids, self.day_ordinals, self.shift_codes):
+            day = days.get(ordinal)
+            if day is None:
+                day = days[ordinal] = date.fromordinal(ordinal)
+            yield resident_id, day, SHIFT_CODES[code]
+
+    def between(self, first: date, last: date) -> AssignmentTable:
+        """The rows dated ``first`` through ``last``."""
+        low, high = first.toordinal(), last.toordinal()
+        keep = [index for index, ordinal in enumerate(self.day_ordinals) if low <= ordinal <= high]
+        table = AssignmentTable()
+        table.resident_ids = array("i", (self.resident_ids[index] for index in keep))
+        table.day_ordinals = array("i", (self.day_ordinals[index] for index in keep))
+        table.shift_codes = array("b", (self.shift_codes[index] for index in keep))
+        return table
+
+    def sort(self) -> None:
+        """Order rows by date, then resident."""
+        order = sorted(range(len(self)), key=lambda index: (self.day_ordinals[index], self.resident_ids[index]))
+        self.resident_ids = array("i", (self.resident_ids[index] for index in order))
+        self.day_ordinals = array("i", (self.day_ordinals[index] for index in order))
+        self.shift_codes = array("b", (self.shift_codes[index] for index in order))
+
+    def to_json(self) -> dict:
+        """Columnar form for JSON; shift codes index ``shifts``."""
+        return {
+            "shifts": [shift.value for shift in SHIFT_CODES],
+            "resident_ids": self.resident_ids.tolist(),
+            "day_ordinals": self.day_ordinals.tolist(),
+            "shift_codes": self.shift_codes.tolist(),
+        }
+
+    @classmethod
+    def from_json(cls, data: dict) -> AssignmentTable:
+        codes = [_SHIFT_CODE[ShiftType(shift)] for shift in data["shifts"]]
+        table = cls()
+        table.resident_ids = array("i", data["resident_ids"])
+        table.day_ordinals = array("i", data["day_ordinals"])
+        table.shift_codes = array("b", (codes[code] for code in data["shift_codes"]))
+        return table
+
+
+def assignment_rows(assignments: Iterable[Assignment]) -> Iterator[tuple[int, date, ShiftType]]:
+    """(resident id, date, shift) for each assignment, read from the arrays of a table."""
+    if isinstance(assignments, AssignmentTable):
+        return assignments.rows()
+    return ((assignment.resident_id, assignment.date, assignment.shift_type) for assignment in assignments)
+
+
 @dataclass
 class GenerationOutput:
-    assignments: list[Assignment]
+    # Lists of Assignment are converted on construction.
+    assignments: AssignmentTable
     alerts: list[dict]
     fairness: dict
     unmet_requests: list[dict]
+    stats: dict = field(default_factory=dict)
+    # Captured CP-SAT log text when SolverOptions.capture_log is set.
+    search_log: str | None = None
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.assignments, AssignmentTable):
+            self.assignments = AssignmentTable(self.assignments)
 
 
 @dataclass(frozen=True)
@@ -70,6 +213,52 @@ class ScheduleInput:
     time_off: list[TimeOff]
     holidays: list[date] = None
     constraints: dict | None = None
+    calendar: list[CalendarDay] | None = None
+
+
+@dataclass(frozen=True)
+class SolverOptions:
+    time_limit_seconds: float = 10.0
+    # CP-SAT search workers; 0 lets CP-SAT use every core.
+    num_workers: int = 0
+    # Rolling horizon: horizons longer than the window are solved in
+    # overlapping windows advancing by ``rolling_step_days``; 0 disables.
+    rolling_window_days: int = 0
+    rolling_step_days: int = 28
+    # Order call counts within classes of interchangeable residents. Off by
+    # default: CP-SAT's own symmetry detection did better on our rosters.
+    symmetry_breaking: bool = False
+    # "weighted" solves one weighted sum; "lexicographic" minimises understaffing,
+    # then call-target deviation, then weekend spread and requests.
+    objective_mode: str = "weighted"
+    stage_time_shares: tuple[float, ...] = (0.4, 0.3, 0.3)
+    # Start the search from the greedy heuristic's schedule.
+    greedy_hint: bool = True
+    # Early stops: a proven relative gap, or no improvement for this long; 0 disables.
+    relative_gap_limit: float = 0.0
+    plateau_seconds: float = 0.0
+    # Write each built model to this directory for solver.replay; "" disables.
+    artifact_dir: str = ""
+    # Keep the CP-SAT search log of every solve in GenerationOutput.search_log.
+    capture_log: bool = False
+
+
+@dataclass(frozen=True)
+class HorizonBoundary:
+    """State carried into a window from the days already committed before it.
+
+    ``postcall`` residents worked OB_OC/OB_L4 on the last committed day and
+    ``must_call`` residents worked OB_L3 on it. Call, weekend and request
+    counts are totals over the committed days; ``target_scale`` prorates the
+    call targets to the share of the horizon solved so far.
+    """
+
+    postcall: frozenset[int] = frozenset()
+    must_call: frozenset[int] = frozenset()
+    call_counts: dict[int, int] = field(default_factory=dict)
+    weekend_counts: dict[int, int] = field(default_factory=dict)
+    request_calls: dict[int, int] = field(default_factory=dict)
+    target_scale: float = 1.0
 
 
 DEFAULT_CONSTRAINTS = {
@@ -96,6 +285,8 @@ SHIFT_TYPES = [
     ShiftType.OB_L4,
     ShiftType.OB_POSTCALL,
 ]
+# Positions in SHIFT_TYPES, i.e. the last axis of ScheduleModel.grid.
+DAY, L3, OC, L4, POSTCALL = range(len(SHIFT_TYPES))
 
 
 def _daterange(start_date: date, end_date: date) -> Iterable[date]:
@@ -105,233 +296,570 @@ def _daterange(start_date: date, end_date: date) -> Iterable[date]:
         current += timedelta(days=1)
 
 
-def _is_weekend(day: date) -> bool:
-    return day.weekday() >= 5
+def _is_time_off(day: date, resident_id: int, time_off: list[TimeOff]) -> ShiftType | None:
+    for block in time_off:
+        if block.resident_id == resident_id and block.start_date <= day <= block.end_date:
+            return block.block_type
+    return None
+
 
+def _equivalence_classes(
+    residents: list[Resident], payload: ScheduleInput, boundary: HorizonBoundary | None
+) -> list[list[int]]:
+    """Group residents the model cannot tell apart; classes of one are dropped.
 
-def _is_friday(day: date) -> bool:
-    return day.weekday() == 4
+    Residents with requests or time off are never interchangeable, and in a
+    rolling window neither are residents with different carried state.
+    """
+    distinct = {request.resident_id for request in payload.requests}
+    distinct |= {block.resident_id for block in payload.time_off}
+    classes: dict[tuple, list[int]] = defaultdict(list)
+    for resident in residents:
+        if resident.id in distinct:
+            continue
+        key: tuple = (resident.tier, resident.ob_months_completed)
+        if boundary is not None:
+            key += (
+                boundary.call_counts.get(resident.id, 0),
+                boundary.weekend_counts.get(resident.id, 0),
+                resident.id in boundary.postcall,
+                resident.id in boundary.must_call,
+            )
+        classes[key].append(resident.id)
+    return [sorted(members) for members in classes.values() if len(members) > 1]
 
 
-def _coverage_requirements(day: date, holidays: set[date], constraints: dict) -> dict[str, int]:
-    coverage = constraints.get("coverage", {})
-    if _is_weekend(day) or day in holidays:
-        return coverage.get(
-            "weekend_or_holiday",
-            {"ob_oc": 2, "ob_l4": 1, "ob_l3": 0, "ob_day_min": 0, "ob_day_max": 0},
+def _new_solver(
+    options: SolverOptions,
+    time_limit: float,
+    log: SearchLog | None = None,
+    label: str = "",
+) -> cp_model.CpSolver:
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = time_limit
+    if options.num_workers:
+        solver.parameters.num_workers = options.num_workers
+    if options.relative_gap_limit:
+        solver.parameters.relative_gap_limit = options.relative_gap_limit
+    if log is not None:
+        log.attach(solver, label)
+    return solver
+
+
+PLATEAU_MAX_GAP = 0.05
+
+
+def _solve(
+    model: cp_model.CpModel,
+    solver: cp_model.CpSolver,
+    counter: _SolutionCounter,
+    plateau_seconds: float,
+) -> tuple[int, bool]:
+    """Solve, stopping once ``plateau_seconds`` pass without a better solution.
+
+    A plateau only counts once the incumbent is within ``PLATEAU_MAX_GAP`` of
+    the bound: CP-SAT can go quiet for seconds before a large improvement.
+    Returns the status and whether the plateau stopped the search.
+    """
+    if plateau_seconds <= 0:
+        return solver.Solve(model, counter), False
+    done = threading.Event()
+    stalled = threading.Event()
+    solutions = counter.count
+    counter.last_improvement = time.perf_counter()
+
+    def watch() -> None:
+        while not done.wait(min(0.1, plateau_seconds / 4)):
+            stale = time.perf_counter() - counter.last_improvement >= plateau_seconds
+            if counter.count > solutions and stale and counter.last_gap <= PLATEAU_MAX_GAP:
+                stalled.set()
+                solver.StopSearch()
+                return
+
+    watcher = threading.Thread(target=watch, daemon=True)
+    watcher.start()
+    try:
+        status = solver.Solve(model, counter)
+    finally:
+        done.set()
+        watcher.join()
+    return status, stalled.is_set() and status == cp_model.FEASIBLE
+
+
+STOP_REASONS = ("optimal", "gap", "plateau", "time_limit", "infeasible", "error")
+
+
+def _stop_reason(solver: cp_model.CpSolver, status: int, plateaued: bool) -> str:
+    if status == cp_model.OPTIMAL:
+        objective, bound = solver.ObjectiveValue(), solver.BestObjectiveBound()
+        # A search ended by relative_gap_limit still reports OPTIMAL.
+        return "gap" if abs(objective - bound) > 1e-6 else "optimal"
+    if status == cp_model.FEASIBLE:
+        return "plateau" if plateaued else "time_limit"
+    if status == cp_model.UNKNOWN:
+        return "time_limit"
+    return "infeasible" if status == cp_model.INFEASIBLE else "error"
+
+
+def overall_stop_reason(reasons: Iterable[str | None]) -> str | None:
+    """The least conclusive of several stop reasons, e.g. across windows or stages."""
+    known = [reason for reason in reasons if reason in STOP_REASONS]
+    return max(known, key=STOP_REASONS.index) if known else None
+
+
+def _upper_bound(variables: list[cp_model.IntVar]) -> int:
+    return sum(variable.Proto().domain[-1] for variable in variables)
+
+
+def _solve_lexicographic(
+    model: cp_model.CpModel,
+    stages: list[tuple[str, cp_model.LinearExprT, int]],
+    options: SolverOptions,
+    counter: _SolutionCounter,
+    log: SearchLog | None = None,
+    label: str = "",
+) -> tuple[cp_model.CpSolver, int, list[dict]]:
+    """Minimise each ``(name, expression, upper_bound)`` stage in turn.
+
+    A stage's optimum is held by dominance rather than an explicit
+    ``expression <= optimum`` constraint, which stalled CP-SAT's search: the
+    next stage minimises ``expression + (upper_bound + 1) * previous`` from a
+    hint of the previous solution, so no improving solution can worsen an
+    earlier stage. Stages split the time limit by ``stage_time_shares``, with
+    unused time passed on. If a later stage finds nothing, the last solved
+    stage's solver is returned.
+    """
+    shares = list(options.stage_time_shares[: len(stages)])
+    shares += [shares[-1] if shares else 1.0] * (len(stages) - len(shares))
+    remaining = options.time_limit_seconds
+    elapsed = 0.0
+    previous: cp_model.LinearExprT | None = None
+    previous_value = 0
+    # Whether every earlier stage closed its gap; only then is previous_value its true optimum.
+    proven = True
+    solved: tuple[cp_model.CpSolver, int] | None = None
+    solver, status = None, cp_model.UNKNOWN
+    stage_stats: list[dict] = []
+
+    for index, (name, expression, upper_bound) in enumerate(stages):
+        if isinstance(expression, int):
+            # Nothing to optimise (e.g. no residents with call targets).
+            continue
+        weight = upper_bound + 1
+        objective = expression if previous is None else expression + weight * previous
+        time_limit = remaining * shares[index] / (sum(shares[index:]) or 1.0)
+        model.Minimize(objective)
+        solver = _new_solver(options, time_limit, log, f"{label} stage {name}")
+        solutions = counter.count
+        status, plateaued = _solve(model, solver, counter, options.plateau_seconds)
+        remaining = max(0.0, remaining - solver.WallTime())
+        # The callback's WallTime() restarts with each stage's solver.
+        improved_at = elapsed + counter.last_solution_time if counter.count > solutions else None
+        elapsed += solver.WallTime()
+        stage = {
+            "stage": name,
+            "status": solver.StatusName(status),
+            "stop_reason": _stop_reason(solver, status, plateaued),
+            "time_limit": time_limit,
+            "objective": None,
+            "best_bound": None,
+            "gap": None,
+            "wall_time": solver.WallTime(),
+            "last_solution_time": improved_at,
+            "num_conflicts": solver.NumConflicts(),
+            "num_branches": solver.NumBranches(),
+        }
+        stage_stats.append(stage)
+        if status not in {cp_model.OPTIMAL, cp_model.FEASIBLE}:
+            break
+
+        value = solver.Value(expression)
+        stage["objective"] = value
+        if proven:
+            bound = solver.BestObjectiveBound() - (weight * previous_value if previous is not None else 0)
+            stage["best_bound"] = max(0.0, bound)
+            stage["gap"] = abs(value - stage["best_bound"]) / max(1.0, abs(value))
+        proven = proven and stage["stop_reason"] == "optimal"
+        solved = (solver, status)
+        previous, previous_value = objective, solver.Value(objective)
+        model.ClearHints()
+        solution = solver.ResponseProto().solution
+        model.Proto().solution_hint.vars.extend(range(len(solution)))
+        model.Proto().solution_hint.values.extend(solution)
+
+    if solved is None:
+        return solver, status, stage_stats
+    solver, status = solved
+    if any(stage["status"] != "OPTIMAL" for stage in stage_stats):
+        status = cp_model.FEASIBLE
+    return solver, status, stage_stats
+
+
+def _request_outcomes(requests: list[Request], days: list[date], assignments: Iterable[Assignment]) -> list[dict]:
+    calls = {(resident_id, day) for resident_id, day, shift in assignment_rows(assignments) if shift == ShiftType.OB_OC}
+    outcomes = []
+    for request in requests:
+        has_call = any(
+            (request.resident_id, day) in calls for day in days if request.start_date <= day <= request.end_date
         )
-    if _is_friday(day):
-        return coverage.get(
-            "friday",
-            {"ob_oc": 2, "ob_l4": 1, "ob_l3": 0, "ob_day_min": 2, "ob_day_max": 4},
+        if request.request_type == RequestType.PREFER_CALL:
+            met = has_call
+        else:
+            met = not has_call
+        outcomes.append(
+            {
+                "resident_id": request.resident_id,
+                "request_type": request.request_type.value,
+                "start_date": request.start_date,
+                "end_date": request.end_date,
+                "met": met,
+            }
         )
-    return coverage.get(
-        "weekday",
-        {"ob_oc": 2, "ob_l4": 0, "ob_l3": 1, "ob_day_min": 2, "ob_day_max": 4},
-    )
+    return outcomes
+
+
+class _SolutionCounter(cp_model.CpSolverSolutionCallback):
+    def __init__(self) -> None:
+        super().__init__()
+        self.count = 0
+        self.first_solution_time: float | None = None
+        self.last_solution_time: float | None = None
+        # perf_counter() and gap of the latest solution, read by the plateau watch.
+        self.last_improvement = time.perf_counter()
+        self.last_gap = 1.0
+
+    def on_solution_callback(self) -> None:
+        if self.count == 0:
+            self.first_solution_time = self.WallTime()
+        self.count += 1
+        self.last_solution_time = self.WallTime()
+        self.last_improvement = time.perf_counter()
+        objective = self.ObjectiveValue()
+        self.last_gap = abs(objective - self.BestObjectiveBound()) / max(1.0, abs(objective))
+
+
+def _solver_stats(
+    model: cp_model.CpModel,
+    solver: cp_model.CpSolver,
+    status: int,
+    counter: _SolutionCounter,
+    residents: int,
+    days: int,
+) -> dict:
+    proto = model.Proto()
+    stats = {
+        "status": solver.StatusName(status),
+        "model": {
+            "residents": residents,
+            "days": days,
+            "variables": len(proto.variables),
+            "constraints": len(proto.constraints),
+        },
+        "objective": None,
+        "best_bound": None,
+        "gap": None,
+        "num_solutions": counter.count,
+        "first_solution_time": counter.first_solution_time,
+        "last_solution_time": counter.last_solution_time,
+        "wall_time": solver.WallTime(),
+        "user_time": solver.UserTime(),
+        "num_conflicts": solver.NumConflicts(),
+        "num_branches": solver.NumBranches(),
+    }
+    if status in {cp_model.OPTIMAL, cp_model.FEASIBLE}:
+        objective = solver.ObjectiveValue()
+        bound = solver.BestObjectiveBound()
+        stats["objective"] = objective
+        stats["best_bound"] = bound
+        stats["gap"] = abs(objective - bound) / max(1.0, abs(objective))
+    return stats
+
+
+def _scaled_target(target: list[int], scale: float) -> tuple[int, int]:
+    low, high = target
+    if scale >= 1.0:
+        return low, high
+    return math.floor(low * scale), math.ceil(high * scale)
 
 
-def _is_tier0_restricted(day: date, resident: Resident, constraints: dict) -> bool:
-    restricted_days = set((constraints.get("tier0_call_prohibition") or {}).get("days", [1, 2, 3]))
-    return resident.ob_months_completed == 0 and day.day in restricted_days
+@dataclass
+class ScheduleModel:
+    """A built CP-SAT model plus the handles needed to solve and read it."""
 
+    model: cp_model.CpModel
+    calendar: list[CalendarDay]
+    residents: list[Resident]
+    # Proto indices of the assignment Booleans: grid[resident row][day index][position in SHIFT_TYPES].
+    grid: list[list[list[int]]]
+    # Time-off rows and build-time alerts, which hold whatever the solution.
+    fixed_assignments: list[Assignment]
+    alerts: list[dict]
+    weighted_objective: cp_model.LinearExprT
+    # (name, expression, upper bound) for the lexicographic mode.
+    stages: list[tuple[str, cp_model.LinearExprT, int]]
+    weekend_spread: cp_model.IntVar | None
+    symmetry_classes: list[list[int]]
+
+    @property
+    def days(self) -> list[date]:
+        return [entry.date for entry in self.calendar]
+
+    @property
+    def assign(self) -> dict[tuple[int, date, ShiftType], cp_model.IntVar]:
+        """``grid`` keyed by (resident id, date, shift)."""
+        days = self.days
+        return {
+            (resident.id, days[day_index], shift): self.model.GetIntVarFromProtoIndex(cell[position])
+            for resident, row in zip(self.residents, self.grid)
+            for day_index, cell in enumerate(row)
+            for position, shift in enumerate(SHIFT_TYPES)
+        }
 
-def _is_time_off(day: date, resident_id: int, time_off: list[TimeOff]) -> ShiftType | None:
-    for block in time_off:
-        if block.resident_id == resident_id and block.start_date <= day <= block.end_date:
-            return block.block_type
-    return None
 
+# (grid position, coverage key, slack name) in the model's variable order.
+COVERAGE_SLACKS = ((OC, "ob_oc", "oc"), (L3, "ob_l3", "l3"), (L4, "ob_l4", "l4"), (DAY, "ob_day_min", "day"))
 
-def generate_schedule(payload: ScheduleInput) -> GenerationOutput:
-    assignments: list[Assignment] = []
-    alerts: list[dict] = []
-    fairness: dict = {"ob_oc_counts": {}, "weekend_ob_oc_spread": 0}
-    unmet_requests: list[dict] = []
 
-    residents = payload.residents
-    if not residents:
-        for day in _daterange(payload.start_date, payload.end_date):
-            alerts.append({"date": day, "message": "No residents available for coverage.", "severity": "HIGH"})
-        return GenerationOutput(assignments, alerts, fairness, unmet_requests)
+def _time_off_table(
+    payload: ScheduleInput, residents: list[Resident], days: list[date]
+) -> dict[tuple[int, int], ShiftType]:
+    """Time-off type by (resident row, day index); the first matching block wins, as in ``_is_time_off``."""
+    day_index = {day: index for index, day in enumerate(days)}
+    row_of = {resident.id: row for row, resident in enumerate(residents)}
+    table: dict[tuple[int, int], ShiftType] = {}
+    for block in payload.time_off:
+        row = row_of.get(block.resident_id)
+        if row is None or not days:
+            continue
+        first, last = max(block.start_date, days[0]), min(block.end_date, days[-1])
+        for offset in range((last - first).days + 1):
+            index = day_index.get(first + timedelta(days=offset))
+            if index is not None:
+                table.setdefault((row, index), block.block_type)
+    return table
 
-    model = cp_model.CpModel()
 
-    days = list(_daterange(payload.start_date, payload.end_date))
-    holiday_set = set(payload.holidays or [])
-    constraints = payload.constraints or DEFAULT_CONSTRAINTS
-    resident_ids = [resident.id for resident in residents]
+def _add_linear(model: cp_model.CpModel, variables: list[int], coefficients: list[int], lower: int, upper: int) -> None:
+    """Add ``lower <= sum(coefficient * variable) <= upper`` over proto variable indices."""
+    linear = model.Proto().constraints.add().linear
+    linear.vars.extend(variables)
+    linear.coeffs.extend(coefficients)
+    linear.domain.extend([lower, upper])
 
-    assign: dict[tuple[int, date, ShiftType], cp_model.IntVar] = {}
+
+def _add_count(model: cp_model.CpModel, count: cp_model.IntVar, variables: list[int], carried: int) -> None:
+    """``count == carried + sum(variables)``."""
+    _add_linear(model, variables + [count.Index()], [1] * len(variables) + [-1], -carried, -carried)
+
+
+def _bool_grid(model: cp_model.CpModel, residents: list[Resident], days: list[date]) -> list[list[list[int]]]:
+    """Proto indices of new Booleans, indexed [resident row][day index][position in SHIFT_TYPES]."""
+    variables = model.Proto().variables
+    grid = []
     for resident in residents:
+        row = []
         for day in days:
+            cell = []
             for shift in SHIFT_TYPES:
-                assign[(resident.id, day, shift)] = model.NewBoolVar(
-                    f"assign_{resident.id}_{day.isoformat()}_{shift.value}"
-                )
+                cell.append(len(variables))
+                variable = variables.add()
+                variable.name = f"assign_{resident.id}_{day.isoformat()}_{shift.value}"
+                variable.domain.extend([0, 1])
+            row.append(cell)
+        grid.append(row)
+    return grid
+
+
+def _total(terms: list) -> cp_model.LinearExprT:
+    # Stay a plain 0 when empty: the lexicographic mode skips int stages.
+    return cp_model.LinearExpr.Sum(terms) if terms else 0
+
+
+def build_model(
+    payload: ScheduleInput,
+    options: SolverOptions,
+    boundary: HorizonBoundary | None = None,
+) -> ScheduleModel:
+    """Build the CP-SAT model for a non-empty roster without solving it."""
+    residents = payload.residents
+    fixed_assignments: list[Assignment] = []
+    alerts: list[dict] = []
+    model = cp_model.CpModel()
+
+    constraints = payload.constraints or DEFAULT_CONSTRAINTS
+    calendar = payload.calendar or build_day_table(
+        payload.start_date, payload.end_date, payload.holidays, constraints
+    )
+    days = [entry.date for entry in calendar]
+    day_count = len(days)
+    rows = range(len(residents))
+
+    # The assignment Booleans are created and constrained straight in the
+    # proto: cp_model's per-call validation and expression parsing cost more
+    # than everything else in building a year-long model.
+    proto = model.Proto()
+    grid = _bool_grid(model, residents, days)
+    # Variables fixed to 0 by a hard rule; their domains are narrowed at the end.
+    zeros: list[int] = []
+    time_off = _time_off_table(payload, residents, days)
 
     # Hard constraints: one shift per day and time off blocks
-    for resident in residents:
-        for day in days:
-            model.Add(
-                assign[(resident.id, day, ShiftType.OB_DAY)]
-                + assign[(resident.id, day, ShiftType.OB_L4)]
-                + assign[(resident.id, day, ShiftType.OB_POSTCALL)]
-                + assign[(resident.id, day, ShiftType.OB_OC)]
-                + assign[(resident.id, day, ShiftType.OB_L3)]
-                <= 1
-            )
-            next_day = day + timedelta(days=1)
-            if next_day in days:
+    for row, resident in enumerate(residents):
+        for day_index, entry in enumerate(calendar):
+            cell = grid[row][day_index]
+            tier0_restricted = resident.ob_months_completed == 0 and entry.tier0_restricted
+            proto.constraints.add().at_most_one.literals.extend(cell)
+            if day_index + 1 < day_count:
                 # OB_L3 is the day before an OB_OC shift for the same resident.
-                model.Add(
-                    assign[(resident.id, day, ShiftType.OB_L3)]
-                    <= assign[(resident.id, next_day, ShiftType.OB_OC)]
-                )
+                implication = proto.constraints.add()
+                implication.enforcement_literal.append(cell[L3])
+                implication.bool_or.literals.append(grid[row][day_index + 1][OC])
             else:
-                model.Add(assign[(resident.id, day, ShiftType.OB_L3)] == 0)
+                zeros.append(cell[L3])
 
-            time_off_type = _is_time_off(day, resident.id, payload.time_off)
+            time_off_type = time_off.get((row, day_index))
             if time_off_type:
-                if _is_tier0_restricted(day, resident, constraints):
+                if tier0_restricted:
                     alerts.append(
                         {
-                            "date": day,
+                            "date": entry.date,
                             "message": "Tier0 resident cannot be assigned BT shifts on days 1-3.",
                             "severity": "HIGH",
                         }
                     )
                 else:
-                    day_vars = [assign[(resident.id, day, shift)] for shift in SHIFT_TYPES]
-                    model.Add(sum(day_vars) == 0)
-                    assignments.append(Assignment(resident_id=resident.id, date=day, shift_type=time_off_type))
+                    zeros.extend(cell)
+                    fixed_assignments.append(
+                        Assignment(resident_id=resident.id, date=entry.date, shift_type=time_off_type)
+                    )
 
-            if _is_tier0_restricted(day, resident, constraints):
-                model.Add(assign[(resident.id, day, ShiftType.OB_L3)] == 0)
-                model.Add(assign[(resident.id, day, ShiftType.OB_OC)] == 0)
-                model.Add(assign[(resident.id, day, ShiftType.OB_L4)] == 0)
-                model.Add(assign[(resident.id, day, ShiftType.OB_POSTCALL)] == 0)
+            if tier0_restricted:
+                zeros.extend((cell[L3], cell[OC], cell[L4], cell[POSTCALL]))
 
     # Coverage requirements with understaffing slack
     understaff_slack: list[cp_model.IntVar] = []
-    for day in days:
-        requirements = _coverage_requirements(day, holiday_set, constraints)
-
-        ob_oc_vars = [assign[(resident_id, day, ShiftType.OB_OC)] for resident_id in resident_ids]
-        ob_l3_vars = [assign[(resident_id, day, ShiftType.OB_L3)] for resident_id in resident_ids]
-        ob_l4_vars = [assign[(resident_id, day, ShiftType.OB_L4)] for resident_id in resident_ids]
-        ob_day_vars = [assign[(resident_id, day, ShiftType.OB_DAY)] for resident_id in resident_ids]
-
-        slack_oc = model.NewIntVar(0, requirements["ob_oc"], f"slack_oc_{day}")
-        model.Add(sum(ob_oc_vars) + slack_oc == requirements["ob_oc"])
-        understaff_slack.append(slack_oc)
-
-        if requirements["ob_l3"]:
-            slack_l3 = model.NewIntVar(0, requirements["ob_l3"], f"slack_l3_{day}")
-            model.Add(sum(ob_l3_vars) + slack_l3 == requirements["ob_l3"])
-            understaff_slack.append(slack_l3)
-        else:
-            model.Add(sum(ob_l3_vars) == 0)
-
-        if requirements["ob_l4"]:
-            slack_l4 = model.NewIntVar(0, requirements["ob_l4"], f"slack_l4_{day}")
-            model.Add(sum(ob_l4_vars) + slack_l4 == requirements["ob_l4"])
-            understaff_slack.append(slack_l4)
-        else:
-            model.Add(sum(ob_l4_vars) == 0)
-
-        if requirements["ob_day_min"]:
-            slack_day = model.NewIntVar(0, requirements["ob_day_min"], f"slack_day_{day}")
-            model.Add(sum(ob_day_vars) + slack_day == requirements["ob_day_min"])
-            model.Add(sum(ob_day_vars) <= requirements["ob_day_max"])
-            understaff_slack.append(slack_day)
-        else:
-            model.Add(sum(ob_day_vars) == 0)
+    for day_index, entry in enumerate(calendar):
+        day = entry.date
+        requirements = entry.coverage
+        for shift, key, name in COVERAGE_SLACKS:
+            required = requirements[key]
+            staffed = [grid[row][day_index][shift] for row in rows]
+            if not required and shift != OC:
+                zeros.extend(staffed)
+                continue
+            slack = model.NewIntVar(0, required, f"slack_{name}_{day}")
+            _add_linear(model, staffed + [slack.Index()], [1] * (len(staffed) + 1), required, required)
+            if shift == DAY:
+                _add_linear(model, staffed, [1] * len(staffed), 0, requirements["ob_day_max"])
+            understaff_slack.append(slack)
 
     # Postcall linkage
-    for day in days:
-        next_day = day + timedelta(days=1)
-        if next_day not in days:
-            continue
-        for resident_id in resident_ids:
-            trigger = assign[(resident_id, day, ShiftType.OB_OC)] + assign[
-                (resident_id, day, ShiftType.OB_L4)
-            ]
-            model.Add(assign[(resident_id, next_day, ShiftType.OB_POSTCALL)] == trigger)
+    for day_index in range(day_count - 1):
+        for row in rows:
+            today, tomorrow = grid[row][day_index], grid[row][day_index + 1]
+            _add_linear(model, [tomorrow[POSTCALL], today[OC], today[L4]], [1, -1, -1], 0, 0)
+
+    if boundary is not None:
+        # Continue the committed schedule: postcall and L3 -> OC cross the boundary.
+        for row, resident in enumerate(residents):
+            postcall = 1 if resident.id in boundary.postcall else 0
+            _add_linear(model, [grid[row][0][POSTCALL]], [1], postcall, postcall)
+            if resident.id in boundary.must_call:
+                _add_linear(model, [grid[row][0][OC]], [1], 1, 1)
 
     # Soft objectives: call targets
     penalty_terms: list[cp_model.IntVar] = []
     call_target_penalties: list[cp_model.IntVar] = []
-    for resident in residents:
-        call_vars = [assign[(resident.id, day, ShiftType.OB_OC)] for day in days]
-        call_count = model.NewIntVar(0, len(days), f"call_count_{resident.id}")
-        model.Add(call_count == sum(call_vars))
+    call_counts: dict[int, cp_model.IntVar] = {}
+    for row, resident in enumerate(residents):
+        call_vars = [cell[OC] for cell in grid[row]]
+        carried_calls = boundary.call_counts.get(resident.id, 0) if boundary else 0
+        call_count = model.NewIntVar(0, carried_calls + day_count, f"call_count_{resident.id}")
+        _add_count(model, call_count, call_vars, carried_calls)
+        call_counts[resident.id] = call_count
 
         call_targets = constraints.get("call_targets", {})
         tier_key = f"tier{resident.tier}"
         target = call_targets.get(tier_key)
         if not target:
             continue
-        low, high = target
+        low, high = _scaled_target(target, boundary.target_scale if boundary else 1.0)
 
-        under = model.NewIntVar(0, len(days), f"call_under_{resident.id}")
-        over = model.NewIntVar(0, len(days), f"call_over_{resident.id}")
+        under = model.NewIntVar(0, max(day_count, low), f"call_under_{resident.id}")
+        over = model.NewIntVar(0, carried_calls + day_count, f"call_over_{resident.id}")
         model.AddMaxEquality(under, [0, low - call_count])
         model.AddMaxEquality(over, [0, call_count - high])
         penalty_terms.extend([under, over])
         call_target_penalties.extend([under, over])
 
+    # Symmetry breaking: any schedule can be permuted within a class of
+    # interchangeable residents, so require non-increasing call counts by id.
+    symmetry_classes = _equivalence_classes(residents, payload, boundary)
+    if options.symmetry_breaking:
+        for members in symmetry_classes:
+            for first, second in zip(members, members[1:]):
+                model.Add(call_counts[first] >= call_counts[second])
+
     # Soft objectives: weekend balance
+    weekend_days = [day_index for day_index, entry in enumerate(calendar) if entry.is_weekend]
     weekend_counts = []
-    for resident in residents:
-        weekend_vars = [
-            assign[(resident.id, day, ShiftType.OB_OC)] for day in days if _is_weekend(day)
-        ]
-        count = model.NewIntVar(0, len(days), f"weekend_oc_{resident.id}")
-        model.Add(count == sum(weekend_vars))
+    for row, resident in enumerate(residents):
+        weekend_vars = [grid[row][day_index][OC] for day_index in weekend_days]
+        carried_weekends = boundary.weekend_counts.get(resident.id, 0) if boundary else 0
+        count = model.NewIntVar(0, carried_weekends + day_count, f"weekend_oc_{resident.id}")
+        _add_count(model, count, weekend_vars, carried_weekends)
         weekend_counts.append(count)
 
     if weekend_counts:
-        weekend_max = model.NewIntVar(0, len(days), "weekend_max")
-        weekend_min = model.NewIntVar(0, len(days), "weekend_min")
+        weekend_ub = day_count + max(boundary.weekend_counts.values(), default=0) if boundary else day_count
+        weekend_max = model.NewIntVar(0, weekend_ub, "weekend_max")
+        weekend_min = model.NewIntVar(0, weekend_ub, "weekend_min")
         model.AddMaxEquality(weekend_max, weekend_counts)
         model.AddMinEquality(weekend_min, weekend_counts)
-        weekend_spread = model.NewIntVar(0, len(days), "weekend_spread")
+        weekend_spread = model.NewIntVar(0, weekend_ub, "weekend_spread")
         model.Add(weekend_spread == weekend_max - weekend_min)
         penalty_terms.append(weekend_spread)
     else:
         weekend_spread = None
 
     # Soft objectives: requests
+    row_of = {resident.id: row for row, resident in enumerate(residents)}
     request_penalties: list[cp_model.IntVar] = []
-    for index, request in enumerate(payload.requests):
-        request_days = [
-            day
-            for day in days
-            if request.start_date <= day <= request.end_date
-        ]
+    for request_index, request in enumerate(payload.requests):
+        row = row_of.get(request.resident_id)
+        if row is None:
+            continue
         call_in_range = [
-            assign[(request.resident_id, day, ShiftType.OB_OC)] for day in request_days
+            model.GetIntVarFromProtoIndex(grid[row][day_index][OC])
+            for day_index, day in enumerate(days)
+            if request.start_date <= day <= request.end_date
         ]
         if not call_in_range:
             continue
+        if boundary and boundary.request_calls.get(request_index):
+            # Already met or already violated on committed days.
+            continue
+        calls = cp_model.LinearExpr.Sum(call_in_range)
 
         if request.request_type == RequestType.PREFER_CALL:
-            met = model.NewBoolVar(f"prefer_met_{index}")
-            model.Add(sum(call_in_range) >= 1).OnlyEnforceIf(met)
-            model.Add(sum(call_in_range) == 0).OnlyEnforceIf(met.Not())
-            penalty = model.NewIntVar(0, 1, f"prefer_penalty_{index}")
+            met = model.NewBoolVar(f"prefer_met_{request_index}")
+            model.Add(calls >= 1).OnlyEnforceIf(met)
+            model.Add(calls == 0).OnlyEnforceIf(met.Not())
+            penalty = model.NewIntVar(0, 1, f"prefer_penalty_{request_index}")
             model.Add(penalty == 1 - met)
         else:
-            violation = model.NewBoolVar(f"avoid_violation_{index}")
-            model.Add(sum(call_in_range) >= 1).OnlyEnforceIf(violation)
-            model.Add(sum(call_in_range) == 0).OnlyEnforceIf(violation.Not())
-            penalty = model.NewIntVar(0, 1, f"avoid_penalty_{index}")
+            violation = model.NewBoolVar(f"avoid_violation_{request_index}")
+            model.Add(calls >= 1).OnlyEnforceIf(violation)
+            model.Add(calls == 0).OnlyEnforceIf(violation.Not())
+            penalty = model.NewIntVar(0, 1, f"avoid_penalty_{request_index}")
             model.Add(penalty == violation)
 
         request_penalties.append(penalty)
         penalty_terms.append(penalty)
 
+    for variable in zeros:
+        proto.variables[variable].domain[:] = [0, 0]
+
     # Objective weights
     weights = constraints.get("weights", {})
     slack_weight = int(weights.get("understaff", 1000))
@@ -339,57 +867,75 @@ def generate_schedule(payload: ScheduleInput) -> GenerationOutput:
     weekend_weight = int(weights.get("weekend", 5))
     request_weight = int(weights.get("request", 10))
 
-    objective_terms = []
-    for slack in understaff_slack:
-        objective_terms.append(slack_weight * slack)
-    for penalty in call_target_penalties:
-        objective_terms.append(call_weight * penalty)
-    if weekend_spread is not None:
-        objective_terms.append(weekend_weight * weekend_spread)
-    for penalty in request_penalties:
-        objective_terms.append(request_weight * penalty)
-
-    model.Minimize(sum(objective_terms))
+    weekend_terms = [weekend_spread] if weekend_spread is not None else []
+    objective_terms = understaff_slack + call_target_penalties + weekend_terms + request_penalties
+    objective_weights = (
+        [slack_weight] * len(understaff_slack)
+        + [call_weight] * len(call_target_penalties)
+        + [weekend_weight] * len(weekend_terms)
+        + [request_weight] * len(request_penalties)
+    )
+    return ScheduleModel(
+        model=model,
+        calendar=calendar,
+        residents=residents,
+        grid=grid,
+        fixed_assignments=fixed_assignments,
+        alerts=alerts,
+        weighted_objective=cp_model.LinearExpr.WeightedSum(objective_terms, objective_weights)
+        if objective_terms
+        else 0,
+        stages=[
+            ("understaff", _total(understaff_slack), _upper_bound(understaff_slack)),
+            ("call_deviation", _total(call_target_penalties), _upper_bound(call_target_penalties)),
+            (
+                "balance",
+                weekend_weight * _total(weekend_terms) + request_weight * _total(request_penalties),
+                weekend_weight * _upper_bound(weekend_terms) + request_weight * _upper_bound(request_penalties),
+            ),
+        ],
+        weekend_spread=weekend_spread,
+        symmetry_classes=symmetry_classes,
+    )
 
-    solver = cp_model.CpSolver()
-    solver.parameters.max_time_in_seconds = 10
-    status = solver.Solve(model)
 
-    if status not in {cp_model.OPTIMAL, cp_model.FEASIBLE}:
-        alerts.append({"date": payload.start_date, "message": "Solver infeasible", "severity": "HIGH"})
-        return GenerationOutput(assignments, alerts, fairness, unmet_requests)
+def extract_output(built: ScheduleModel, solver: cp_model.CpSolver, payload: ScheduleInput) -> GenerationOutput:
+    """Read the solver's current solution into a ``GenerationOutput`` without stats."""
+    residents = built.residents
+    calendar = built.calendar
+    days = built.days
+    weekend_spread = built.weekend_spread
+    assignments = AssignmentTable(built.fixed_assignments)
+    alerts = list(built.alerts)
+    fairness: dict = {"ob_oc_counts": {}, "weekend_ob_oc_spread": 0}
+    values = solver.ResponseProto().solution
+    staffed = [[0] * len(SHIFT_TYPES) for _ in days]
 
     for resident in residents:
         fairness["ob_oc_counts"][resident.id] = 0
 
-    for resident in residents:
-        for day in days:
-            for shift in SHIFT_TYPES:
-                if solver.Value(assign[(resident.id, day, shift)]) == 1:
-                    assignments.append(Assignment(resident_id=resident.id, date=day, shift_type=shift))
+    for resident, row in zip(residents, built.grid):
+        for day_index, cell in enumerate(row):
+            for position, variable in enumerate(cell):
+                if values[variable] == 1:
+                    shift = SHIFT_TYPES[position]
+                    assignments.add(resident.id, days[day_index], shift)
+                    staffed[day_index][position] += 1
                     if shift == ShiftType.OB_OC:
                         fairness["ob_oc_counts"][resident.id] += 1
 
     if weekend_spread is not None:
         fairness["weekend_ob_oc_spread"] = solver.Value(weekend_spread)
 
-    for day in days:
-        requirements = _coverage_requirements(day, holiday_set, constraints)
+    for day_index, entry in enumerate(calendar):
+        day = entry.date
+        requirements = entry.coverage
         coverage = {
-            "ob_oc": 0,
-            "ob_l3": 0,
-            "ob_l4": 0,
-            "ob_day": 0,
+            "ob_oc": staffed[day_index][OC],
+            "ob_l3": staffed[day_index][L3],
+            "ob_l4": staffed[day_index][L4],
+            "ob_day": staffed[day_index][DAY],
         }
-        for resident_id in resident_ids:
-            if solver.Value(assign[(resident_id, day, ShiftType.OB_OC)]) == 1:
-                coverage["ob_oc"] += 1
-            if solver.Value(assign[(resident_id, day, ShiftType.OB_L3)]) == 1:
-                coverage["ob_l3"] += 1
-            if solver.Value(assign[(resident_id, day, ShiftType.OB_L4)]) == 1:
-                coverage["ob_l4"] += 1
-            if solver.Value(assign[(resident_id, day, ShiftType.OB_DAY)]) == 1:
-                coverage["ob_day"] += 1
 
         if coverage["ob_oc"] < requirements["ob_oc"]:
             alerts.append({"date": day, "message": "Understaffed OB_OC coverage.", "severity": "HIGH"})
@@ -400,31 +946,172 @@ def generate_schedule(payload: ScheduleInput) -> GenerationOutput:
         if requirements["ob_day_min"] and coverage["ob_day"] < requirements["ob_day_min"]:
             alerts.append({"date": day, "message": "Understaffed OB_DAY coverage.", "severity": "HIGH"})
 
-    for request in payload.requests:
-        request_days = [
-            day
-            for day in days
-            if request.start_date <= day <= request.end_date
-        ]
-        call_assignments = [
-            assignment
-            for assignment in assignments
-            if assignment.resident_id == request.resident_id
-            and assignment.shift_type == ShiftType.OB_OC
-            and assignment.date in request_days
+    unmet_requests = _request_outcomes(payload.requests, days, assignments)
+    return GenerationOutput(assignments, alerts, fairness, unmet_requests)
+
+
+# Filling in a hint may take this share of the time limit, and never more than a second.
+HINT_PROBE_SHARE = 0.1
+
+
+def _add_complete_hint(
+    built: ScheduleModel, schedule: dict[tuple[int, date], ShiftType], time_limit: float
+) -> bool:
+    """Hint every model variable from a feasible ``schedule`` of assignments.
+
+    CP-SAT only adopts a hint as its first incumbent when the hint is
+    complete, so the penalty and slack variables are filled in by solving a
+    copy of the model with the assignments fixed, for at most ``time_limit``
+    seconds. Returns whether it worked.
+    """
+    weighted = built.weighted_objective
+    probe = cp_model.CpModel()
+    probe.Proto().CopyFrom(built.model.Proto())
+    variables = probe.Proto().variables
+    days = built.days
+    for resident, row in zip(built.residents, built.grid):
+        for day, cell in zip(days, row):
+            shift = schedule.get((resident.id, day))
+            for position, variable in enumerate(cell):
+                value = int(SHIFT_TYPES[position] == shift)
+                domain = variables[variable].domain
+                if not domain[0] <= value <= domain[-1]:
+                    # The schedule breaks a rule build_model fixed in the domain.
+                    return False
+                domain[:] = [value, value]
+    probe.Minimize(weighted)
+    solver = cp_model.CpSolver()
+    solver.parameters.num_workers = 1
+    solver.parameters.max_time_in_seconds = time_limit
+    if solver.Solve(probe) not in {cp_model.OPTIMAL, cp_model.FEASIBLE}:
+        return False
+    hint = built.model.Proto().solution_hint
+    hint.Clear()
+    for index in range(len(probe.Proto().variables)):
+        hint.vars.append(index)
+        hint.values.append(solver.Value(probe.GetIntVarFromProtoIndex(index)))
+    return True
+
+
+def dump_model(path: Path, model: cp_model.CpModel) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(gzip.compress(model.Proto().SerializeToString()))
+
+
+def generate_schedule(
+    payload: ScheduleInput,
+    options: SolverOptions | None = None,
+    boundary: HorizonBoundary | None = None,
+    incumbent: Iterable[Assignment] | None = None,
+    best_bound: float | None = None,
+) -> GenerationOutput:
+    """Build and solve one model over the whole of ``payload``.
+
+    ``incumbent`` replaces the greedy hint to continue an earlier search from
+    its schedule. ``best_bound`` must have been proven on the same model;
+    it becomes a lower bound on the weighted objective, so the search can
+    stop as soon as it reaches it.
+    """
+    options = options or SolverOptions()
+    timer = PhaseTimer()
+
+    if not payload.residents:
+        alerts = [
+            {"date": day, "message": "No residents available for coverage.", "severity": "HIGH"}
+            for day in _daterange(payload.start_date, payload.end_date)
         ]
-        if request.request_type == RequestType.PREFER_CALL:
-            met = bool(call_assignments)
-        else:
-            met = not bool(call_assignments)
-        unmet_requests.append(
-            {
-                "resident_id": request.resident_id,
-                "request_type": request.request_type.value,
-                "start_date": request.start_date,
-                "end_date": request.end_date,
-                "met": met,
-            }
+        stats = {"status": "NO_RESIDENTS", "phases": timer.phases}
+        return GenerationOutput([], alerts, {"ob_oc_counts": {}, "weekend_ob_oc_spread": 0}, [], stats)
+
+    built = build_model(payload, options, boundary)
+    model = built.model
+    timer.lap("build_model")
+
+    incumbent_hint = None
+    hint_started = time.perf_counter()
+    probe_limit = min(1.0, HINT_PROBE_SHARE * options.time_limit_seconds)
+    if incumbent is not None:
+        schedule = {
+            (resident_id, day): shift
+            for resident_id, day, shift in assignment_rows(incumbent)
+            if shift in SHIFT_TYPES
+        }
+        incumbent_hint = _add_complete_hint(built, schedule, probe_limit)
+        timer.lap("incumbent_hint")
+    elif options.greedy_hint:
+        # Imported here: the greedy module builds on this one.
+        from .greedy import greedy_assignments
+
+        schedule = greedy_assignments(payload, built.calendar, boundary)
+        _add_complete_hint(built, schedule, probe_limit)
+        timer.lap("greedy_hint")
+    # The hint is paid for out of the time limit, so a rolling horizon does not overrun it window by window.
+    search_options = replace(
+        options, time_limit_seconds=max(0.0, options.time_limit_seconds - (time.perf_counter() - hint_started))
+    )
+    carried_bound = best_bound is not None and options.objective_mode != "lexicographic"
+    if carried_bound:
+        model.Add(built.weighted_objective >= math.ceil(best_bound - 1e-6))
+
+    if options.artifact_dir:
+        # Dumped with the weighted objective; lexicographic stages replace it.
+        model.Minimize(built.weighted_objective)
+        dump_model(Path(options.artifact_dir) / f"model-{payload.start_date.isoformat()}.pb.gz", model)
+        timer.lap("dump_model")
+
+    counter = _SolutionCounter()
+    log = SearchLog() if options.capture_log else None
+    label = f"{payload.start_date.isoformat()}..{payload.end_date.isoformat()}"
+    if options.objective_mode == "lexicographic":
+        solver, status, stage_stats = _solve_lexicographic(model, built.stages, search_options, counter, log, label)
+    else:
+        model.Minimize(built.weighted_objective)
+        solver = _new_solver(search_options, search_options.time_limit_seconds, log, label)
+        status, plateaued = _solve(model, solver, counter, options.plateau_seconds)
+        stage_stats = None
+    timer.lap("search")
+
+    stats = _solver_stats(model, solver, status, counter, len(built.residents), len(built.calendar))
+    stats["objective_mode"] = options.objective_mode
+    if stage_stats is None:
+        stats["stop_reason"] = _stop_reason(solver, status, plateaued)
+    else:
+        stats["stop_reason"] = overall_stop_reason(stage["stop_reason"] for stage in stage_stats)
+    if stage_stats is not None:
+        # The last stage's objective is not the weighted one; report that instead.
+        stats["stages"] = stage_stats
+        stats["objective"] = solver.Value(built.weighted_objective) if stats["objective"] is not None else None
+        stats["best_bound"] = None
+        # No gap at all when a stage has none: its bound leaned on an unproven earlier stage.
+        gaps = [stage["gap"] for stage in stage_stats if stage["objective"] is not None]
+        stats["gap"] = max(gaps) if gaps and None not in gaps else None
+        for key in ("wall_time", "num_conflicts", "num_branches"):
+            stats[key] = sum(stage[key] for stage in stage_stats)
+        # Seconds into the whole run, not into the last stage.
+        stats["last_solution_time"] = max(
+            (stage["last_solution_time"] for stage in stage_stats if stage["last_solution_time"] is not None),
+            default=None,
         )
+    stats["time_limit"] = options.time_limit_seconds
+    stats["relative_gap_limit"] = options.relative_gap_limit
+    stats["plateau_seconds"] = options.plateau_seconds
+    stats["num_workers"] = options.num_workers
+    stats["symmetry_classes"] = sorted((len(members) for members in built.symmetry_classes), reverse=True)
+    stats["symmetry_breaking"] = options.symmetry_breaking
+    stats["greedy_hint"] = options.greedy_hint and incumbent is None
+    if incumbent is not None:
+        stats["incumbent_hint"] = incumbent_hint
+        stats["carried_bound"] = best_bound if carried_bound else None
+    stats["phases"] = timer.phases
+    search_log = log.text() if log is not None else None
 
-    return GenerationOutput(assignments, alerts, fairness, unmet_requests)
+    if status not in {cp_model.OPTIMAL, cp_model.FEASIBLE}:
+        alerts = built.alerts + [{"date": payload.start_date, "message": "Solver infeasible", "severity": "HIGH"}]
+        fairness = {"ob_oc_counts": {}, "weekend_ob_oc_spread": 0}
+        return GenerationOutput(list(built.fixed_assignments), alerts, fairness, [], stats, search_log)
+
+    output = extract_output(built, solver, payload)
+    output.stats = stats
+    output.search_log = search_log
+    timer.lap("extract")
+    return output
@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Iterator
+
+
+class PhaseTimer:
+    """Accumulates wall-clock seconds per named phase.
+
+    ``lap(name)`` charges the time since the previous lap (or creation) to
+    ``name``; ``phase(name)`` times a ``with`` block.
+    """
+
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = {}
+        self._last = perf_counter()
+
+    def _record(self, name: str, elapsed: float) -> None:
+        self.phases[name] = round(self.phases.get(name, 0.0) + elapsed, 6)
+
+    def lap(self, name: str) -> None:
+        now = perf_counter()
+        self._record(name, now - self._last)
+        self._last = now
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = perf_counter()
+        try:
+            yield
+        finally:
+            now = perf_counter()
+            self._record(name, now - start)
+            self._last = now